@@ -0,0 +1,125 @@
+import os
+import re
+from appgen.core.extractor import extract_code_blocks_with_filenames
+from appgen.core.pipeline import Pipeline, Stage
+
+MAX_AGENT_FILES = 6
+DEFAULT_ENTRY_FILES = {"python": "main.py", "html": "index.html", "c++": "main.cpp"}
+FENCE_LANGUAGES = {".py": "python", ".html": "html", ".css": "css", ".js": "javascript", ".cpp": "cpp", ".h": "cpp", ".hpp": "cpp", ".md": "markdown"}
+FILE_LINE_RE = re.compile(r"^\s*(?:[-*]|\d+\.)?\s*`?(?P<path>[\w./-]+\.[A-Za-z0-9]+)`?\s*(?:[:\-–—]\s*(?P<purpose>.*))?$")
+APPROVED_RE = re.compile(r"^\W*approved\b", re.IGNORECASE)
+
+def parse_file_plan(plan, language):
+    """
+    Reads the 'FILES:' section of the architect's plan into [(path, purpose)].
+    Falls back to the language's usual entry file.
+    """
+    files, in_section = [], False
+    for line in plan.splitlines():
+        if re.match(r"^\W*files\W*$", line.strip(), re.IGNORECASE):
+            in_section = True
+            continue
+        if in_section:
+            match = FILE_LINE_RE.match(line)
+            if match and ".." not in match.group("path") and not os.path.isabs(match.group("path")):
+                files.append((match.group("path"), (match.group("purpose") or "").strip()))
+            elif line.strip() and files:
+                break
+    seen, unique = set(), []
+    for path, purpose in files:
+        if path not in seen:
+            seen.add(path)
+            unique.append((path, purpose))
+    if not unique:
+        unique = [(DEFAULT_ENTRY_FILES.get(language.lower(), "main.py"), "the whole application")]
+    return unique[:MAX_AGENT_FILES]
+
+def first_code(output):
+    blocks = extract_code_blocks_with_filenames(output)
+    return blocks[0]["code"] if blocks else output.strip()
+
+def fence_language(path):
+    return FENCE_LANGUAGES.get(os.path.splitext(path)[1].lower(), "")
+
+def build_agent_pipeline(query, language="Python", engine=None, use_cache=True):
+    """
+    Architect -> one developer per planned file, plus a test writer, all in
+    parallel -> one reviewer per file -> assembly into a single Markdown answer
+    with a '### filename:' heading per file (the format save_generated_app reads).
+    """
+    pipeline = Pipeline(engine, use_cache)
+
+    async def architect(pipe, inputs):
+        plan = await pipe.ask(
+            f"You are the software architect. Design a high-level architecture for: {query} (language: {language}). "
+            "Brief bullet points. End with a section that starts with the line 'FILES:' listing every source file "
+            f"to create as '- <path>: <purpose>' (at most {MAX_AGENT_FILES} files, entry point first)."
+        )
+        files = parse_file_plan(plan, language)
+        file_list = "\n".join(f"- {path}: {purpose}" for path, purpose in files)
+
+        for path, purpose in files:
+            pipe.add(Stage(f"dev:{path}", developer(path, purpose, file_list), deps=["architect"], label=f"Developer {path}"))
+            pipe.add(Stage(f"review:{path}", reviewer(path), deps=["architect", f"dev:{path}"], optional=True, label=f"Reviewer {path}"))
+        pipe.add(Stage("tests", test_writer(file_list), deps=["architect"], optional=True, label="Test writer"))
+        pipe.add(Stage(
+            "assemble", assemble, label="Assemble",
+            deps=[f"dev:{path}" for path, _ in files] + [f"review:{path}" for path, _ in files] + ["tests"],
+        ))
+        return {"plan": plan, "files": files}
+
+    def developer(path, purpose, file_list):
+        async def run(pipe, inputs):
+            plan = inputs["architect"]["plan"]
+            output = await pipe.ask(
+                f"You are a developer on a team building: {query} (language: {language}).\n"
+                f"Architecture plan:\n{plan}\n\nFiles in the project:\n{file_list}\n\n"
+                f"Write ONLY the complete code for '{path}' ({purpose}). Use the other files' names and "
+                "interfaces as planned. Return the code in a single fenced code block."
+            )
+            return first_code(output)
+        return run
+
+    def reviewer(path):
+        async def run(pipe, inputs):
+            code = inputs[f"dev:{path}"]
+            output = await pipe.ask(
+                f"You are a code reviewer. Review '{path}' from a {language} project for: {query}.\n"
+                f"Architecture plan:\n{inputs['architect']['plan']}\n\n"
+                f"```{fence_language(path)}\n{code}\n```\n\n"
+                "If it is correct, reply with the single word APPROVED. Otherwise reply with the full corrected "
+                "file in a single fenced code block, preceded by one line explaining the fix."
+            )
+            if APPROVED_RE.match(output) or not extract_code_blocks_with_filenames(output):
+                return {"approved": True, "code": code, "notes": "Approved"}
+            notes = next((line.strip() for line in output.splitlines() if line.strip() and not line.startswith(("```", "~~~"))), "Revised")
+            return {"approved": False, "code": first_code(output), "notes": notes}
+        return run
+
+    def test_writer(file_list):
+        async def run(pipe, inputs):
+            kind = "pytest unit tests in a single file 'test_app.py'" if language.lower() == "python" else \
+                "a concise manual test checklist in Markdown for 'TESTING.md'"
+            output = await pipe.ask(
+                f"You are a test engineer. For an app built as: {query} (language: {language}), with these files:\n"
+                f"{file_list}\n\nArchitecture plan:\n{inputs['architect']['plan']}\n\n"
+                f"Write {kind}. Return it in a single fenced code block."
+            )
+            name = "test_app.py" if language.lower() == "python" else "TESTING.md"
+            return {"path": name, "code": first_code(output)}
+        return run
+
+    async def assemble(pipe, inputs):
+        plan = pipe.stages["architect"].output
+        sections = []
+        for path, _ in plan["files"]:
+            review = inputs.get(f"review:{path}")
+            code = review["code"] if review else inputs[f"dev:{path}"]
+            sections.append(f"### filename: {path}\n```{fence_language(path)}\n{code}\n```")
+        tests = inputs.get("tests")
+        if tests:
+            sections.append(f"### filename: {tests['path']}\n```{fence_language(tests['path'])}\n{tests['code']}\n```")
+        return "\n\n".join(sections)
+
+    pipeline.add(Stage("architect", architect, label="Architect"))
+    return pipeline
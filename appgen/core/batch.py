@@ -0,0 +1,191 @@
+import asyncio
+import datetime
+import hashlib
+import json
+import os
+import re
+import time
+from rich.table import Table
+from appgen.utils.console import console
+from appgen.core.cache import response_cache, cache_enabled
+from appgen.core.copilot import build_suggestion_prompt, CopilotError
+from appgen.core.engine import CopilotEngine, COPILOT_CONCURRENCY
+from appgen.core.extractor import extract_code_blocks_with_filenames
+from appgen.core.registry import add_app_to_registry
+from appgen.utils.filesystem import write_app_blocks
+
+DEFAULT_MANIFEST = "generate_manifest.jsonl"
+
+# Spec keys mirror the get_copilot_suggestion arguments
+SPEC_DEFAULTS = {
+    "language": "Python",
+    "color_scheme": "Default",
+    "complex_app": False,
+    "architecture": "Standard",
+    "extras": [],
+}
+
+def load_specs(spec_file):
+    specs = []
+    with open(spec_file, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                spec = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{spec_file}:{line_no}: invalid JSON ({e})")
+            if not isinstance(spec, dict) or not str(spec.get("query", "")).strip():
+                raise ValueError(f"{spec_file}:{line_no}: each spec needs a non-empty 'query'")
+            specs.append(normalize_spec(spec))
+    return specs
+
+def normalize_spec(spec):
+    spec = {**SPEC_DEFAULTS, **spec}
+    spec["extras"] = list(spec.get("extras") or [])
+    spec["complex_app"] = bool(spec.get("complex_app"))
+    if "id" not in spec:
+        # Stable id so re-running the same file resumes instead of duplicating work
+        payload = json.dumps({k: spec[k] for k in ["query", *SPEC_DEFAULTS]}, sort_keys=True)
+        spec["id"] = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+    spec["id"] = str(spec["id"])
+    return spec
+
+def load_completed(manifest_path):
+    completed = set()
+    if not os.path.exists(manifest_path):
+        return completed
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("status") == "ok":
+                completed.add(record.get("id"))
+    return completed
+
+def app_name_for(spec, out_dir):
+    if spec.get("name"):
+        base = re.sub(r"[^\w\-]+", "_", str(spec["name"])).strip("_")
+    else:
+        words = re.findall(r"\w+", spec["query"].lower())[:4]
+        base = "_".join(words) or "app"
+        base = f"{base}_{spec['id'][:6]}"
+    name, n = base, 1
+    while os.path.exists(os.path.join(out_dir, name)):
+        n += 1
+        name = f"{base}_{n}"
+    return name
+
+def save_spec_result(spec, suggestion, out_dir):
+    """
+    Non-interactive equivalent of save_generated_app. Returns (status, path).
+    """
+    blocks = extract_code_blocks_with_filenames(suggestion)
+    if not blocks:
+        return "no_code", None
+
+    app_name = app_name_for(spec, out_dir)
+    saved_path = write_app_blocks(app_name, blocks, spec["language"], spec["complex_app"], app_dir=os.path.join(out_dir, app_name))
+    metadata = {
+        "query": spec["query"],
+        "color_scheme": spec["color_scheme"],
+        "architecture": spec["architecture"],
+        "extras": spec["extras"],
+        "batch_id": spec["id"],
+    }
+    add_app_to_registry(app_name, spec["query"], spec["language"], saved_path, spec["extras"], metadata)
+    return "ok", saved_path
+
+async def _run_specs(specs, engine, out_dir, manifest, use_cache):
+    counts = {"ok": 0, "error": 0, "no_code": 0}
+    # Saving picks a free folder name and writes the registry, so one save at a
+    # time; it runs on a thread to keep the event loop driving the other requests
+    save_lock = asyncio.Lock()
+
+    async def _save(spec, suggestion):
+        async with save_lock:
+            return await asyncio.to_thread(save_spec_result, spec, suggestion, out_dir)
+
+    async def _one(spec):
+        started = time.perf_counter()
+        record = {
+            "id": spec["id"],
+            "query": spec["query"],
+            "language": spec["language"],
+            "started_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        try:
+            prompt = build_suggestion_prompt(
+                spec["query"], spec["language"], spec["color_scheme"],
+                spec["complex_app"], spec["architecture"], spec["extras"]
+            )
+            suggestion = response_cache.get(prompt) if use_cache else None
+            record["cached"] = suggestion is not None
+            if suggestion is None:
+                suggestion = await engine.run(prompt)
+            status, path = await _save(spec, suggestion)
+            if status == "no_code" and record["cached"]:
+                # A cached answer without code would fail every resumed run; ask again
+                response_cache.discard(prompt)
+                suggestion = await engine.run(prompt)
+                record["cached"] = False
+                status, path = await _save(spec, suggestion)
+            if status == "no_code" and use_cache:
+                response_cache.discard(prompt)
+            elif status == "ok" and use_cache and not record["cached"]:
+                response_cache.put(prompt, suggestion)
+            record["status"], record["path"] = status, path
+        except CopilotError as e:
+            record["status"], record["error"] = "error", str(e)
+        except Exception as e:
+            record["status"], record["error"] = "error", f"{type(e).__name__}: {e}"
+        record["latency_s"] = round(time.perf_counter() - started, 3)
+
+        manifest.write(json.dumps(record) + "\n")
+        manifest.flush()
+        counts[record["status"]] += 1
+        style = "green" if record["status"] == "ok" else "red"
+        console.print(f"[{style}]{record['status']:>7}[/{style}] {spec['id']} {record['latency_s']:.1f}s  {spec['query'][:60]}")
+        return record
+
+    return await asyncio.gather(*[_one(spec) for spec in specs]), counts
+
+def run_batch(spec_file, workers=COPILOT_CONCURRENCY, out_dir=".", manifest_path=DEFAULT_MANIFEST, resume=True, use_cache=True):
+    """
+    Generates every spec in a JSONL file through a bounded worker pool.
+    Each finished item is appended to the manifest immediately, so an
+    interrupted run can be resumed by running the same command again.
+    """
+    specs = load_specs(spec_file)
+    completed = load_completed(manifest_path) if resume else set()
+    todo, seen = [], set(completed)
+    for spec in specs:
+        if spec["id"] not in seen:
+            seen.add(spec["id"])
+            todo.append(spec)
+    console.print(f"[cyan]{len(specs)} specs, {len(specs) - len(todo)} already done, {len(todo)} to generate with {workers} workers[/cyan]")
+    if not todo:
+        return 0
+
+    os.makedirs(out_dir, exist_ok=True)
+    engine = CopilotEngine(workers)
+    started = time.perf_counter()
+    with open(manifest_path, "a" if resume else "w", encoding="utf-8") as manifest:
+        records, counts = asyncio.run(_run_specs(todo, engine, out_dir, manifest, use_cache and cache_enabled()))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(r["latency_s"] for r in records)
+    table = Table(title="Batch Generation", show_header=True, header_style="bold magenta")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", style="yellow")
+    table.add_row("Succeeded", str(counts["ok"]))
+    table.add_row("No code in response", str(counts["no_code"]))
+    table.add_row("Failed", str(counts["error"]))
+    table.add_row("Wall time", f"{elapsed:.1f}s")
+    table.add_row("Median latency", f"{latencies[len(latencies) // 2]:.1f}s")
+    table.add_row("Manifest", os.path.abspath(manifest_path))
+    console.print(table)
+    return 0 if counts["error"] == 0 and counts["no_code"] == 0 else 1
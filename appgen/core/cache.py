@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from appgen.utils.filesystem import STATE_DIR
+
+CACHE_DIR = os.path.join(STATE_DIR, "copilot_cache")
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+COPILOT_BACKEND = "gh-copilot"
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalizes line endings and trailing whitespace so cosmetic differences share a key.
+    """
+    lines = prompt.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+def cache_key(prompt: str, backend=COPILOT_BACKEND) -> str:
+    digest = hashlib.sha256()
+    digest.update(backend.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_prompt(prompt).encode("utf-8"))
+    return digest.hexdigest()
+
+class ResponseCache:
+    """
+    Content-addressed on-disk cache of Copilot responses.
+
+    Each entry is one JSON file named after the prompt hash. The file mtime is
+    bumped on every hit, so evicting the oldest mtimes gives LRU order.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL_SECONDS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._total_bytes = None
+        self._lock = threading.Lock()
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, prompt, backend=COPILOT_BACKEND):
+        path = self._entry_path(cache_key(prompt, backend))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if entry.get("expires_at", 0) < time.time():
+            self._remove(path)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return entry.get("response")
+
+    def put(self, prompt, response, backend=COPILOT_BACKEND, ttl=None):
+        os.makedirs(self.directory, exist_ok=True)
+        key = cache_key(prompt, backend)
+        path = self._entry_path(key)
+        now = time.time()
+        entry = {
+            "key": key,
+            "backend": backend,
+            "created_at": now,
+            "expires_at": now + (self.ttl if ttl is None else ttl),
+            "response": response,
+        }
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+            new_size = os.path.getsize(path)
+        except OSError:
+            self._remove(tmp_path)
+            return
+
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += new_size - old_size
+        self._evict()
+
+    def discard(self, prompt, backend=COPILOT_BACKEND):
+        """
+        Drops one entry, e.g. a response that turned out to be unusable.
+        """
+        path = self._entry_path(cache_key(prompt, backend))
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        if self._remove(path):
+            with self._lock:
+                if self._total_bytes is not None:
+                    self._total_bytes -= size
+
+    def _scan(self):
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for item in it:
+                    if item.name.endswith(".json"):
+                        st = item.stat()
+                        entries.append((st.st_mtime, st.st_size, item.path))
+        except OSError:
+            pass
+        return entries
+
+    def _evict(self):
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._scan())
+            if self._total_bytes <= self.max_bytes:
+                return
+
+            # Only rescan when over budget; drop least recently used first
+            entries = sorted(self._scan())
+            self._total_bytes = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                if self._remove(path):
+                    self._total_bytes -= size
+                    self.evictions += 1
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def clear(self):
+        with self._lock:
+            for _, _, path in self._scan():
+                self._remove(path)
+            self._total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+def cache_enabled():
+    return os.environ.get("PROMPT2APP_NO_CACHE", "").lower() not in ("1", "true", "yes")
+
+response_cache = ResponseCache()
@@ -0,0 +1,187 @@
+import datetime
+import difflib
+import hashlib
+import json
+import os
+import re
+import time
+from appgen.core.context import (
+    pack_context, rank_app_files, summarize_file, query_terms, estimate_tokens, truncate_to_tokens,
+    CONTEXT_TOKEN_BUDGET
+)
+from appgen.core.copilot import call_copilot
+from appgen.utils.filesystem import state_path
+
+SESSIONS_DIR = "chat_sessions"
+# Turns quoted verbatim; older turns are folded into the rolling summary
+CHAT_RECENT_TURNS = 3
+CHAT_ANSWER_CHARS = 1500
+CHAT_SUMMARY_MAX_CHARS = 2000
+# Full text of files the question is about, on turns after the first
+CHAT_FOCUS_TOKENS = CONTEXT_TOKEN_BUDGET // 2
+CHAT_OUTLINE_TOKENS = CONTEXT_TOKEN_BUDGET // 3
+CHAT_HISTORY_LIMIT = 50
+
+SENTENCE_RE = re.compile(r"(.+?[.!?])(\s|$)", re.DOTALL)
+CODE_FENCE_RE = re.compile(r"(```|~~~).*?(\1|$)", re.DOTALL)
+
+def session_path(app_path):
+    key = hashlib.sha256(os.path.abspath(app_path).encode("utf-8")).hexdigest()[:16]
+    return state_path(SESSIONS_DIR, f"{key}.json")
+
+def first_sentence(text, limit=200):
+    text = " ".join(CODE_FENCE_RE.sub(" [code] ", text).split())
+    match = SENTENCE_RE.match(text)
+    sentence = match.group(1) if match else text
+    return sentence if len(sentence) <= limit else sentence[:limit - 3] + "..."
+
+class ChatSession:
+    """
+    A chat about one app. `gh copilot -p` keeps no conversation, so the
+    session carries it: a rolling summary of older turns, the last few turns
+    verbatim, and `sent_files`, the files whose full text was in the previous
+    prompt. The first turn packs the app like build_context. Later turns
+    resend the files the question is about in full, outline the rest, and
+    show how files from the previous prompt changed, so earlier answers
+    still make sense.
+    """
+
+    def __init__(self, app_path, language, summary="", turns=None, sent_files=None, created_at=None):
+        self.app_path = app_path
+        self.language = language
+        self.summary = summary
+        self.turns = turns or []
+        self.sent_files = sent_files or {}
+        self.created_at = created_at or datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    @classmethod
+    def load(cls, app_path, language):
+        try:
+            with open(session_path(app_path), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return cls(
+            app_path, language,
+            summary=data.get("summary", ""),
+            turns=data.get("turns", []),
+            sent_files=data.get("sent_files", {}),
+            created_at=data.get("created_at"),
+        )
+
+    def save(self):
+        data = {
+            "app_path": os.path.abspath(self.app_path),
+            "created_at": self.created_at,
+            "summary": self.summary,
+            "turns": self.turns[-CHAT_HISTORY_LIMIT:],
+            "sent_files": self.sent_files,
+        }
+        path = session_path(self.app_path)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def delete(self):
+        try:
+            os.remove(session_path(self.app_path))
+        except OSError:
+            pass
+
+    def _history(self):
+        lines = []
+        if self.summary:
+            lines.append(f"Earlier in this conversation:\n{self.summary}")
+        for turn in self.turns[-CHAT_RECENT_TURNS:]:
+            answer = turn["answer"]
+            if len(answer) > CHAT_ANSWER_CHARS:
+                answer = answer[:CHAT_ANSWER_CHARS] + "\n..."
+            lines.append(f"User: {turn['question']}\nAssistant: {answer}")
+        return "\n\n".join(lines)
+
+    def _code_update(self, question, ranked):
+        """
+        The code section for this turn and {rel: text} of the files it includes in full.
+        """
+        if not self.sent_files:
+            return pack_context(ranked)
+
+        # Files the question mentions; if it mentions none, the best ranked
+        # (entry points first), so every prompt carries real code
+        terms = query_terms(question)
+        relevant = [
+            (rel, text) for rel, text, _ in ranked
+            if any(term in rel.lower() or term in text.lower() for term in terms)
+        ] or [(rel, text) for rel, text, _ in ranked]
+        full, budget = {}, CHAT_FOCUS_TOKENS
+        for rel, text in relevant:
+            cost = estimate_tokens(text)
+            if cost <= budget:
+                full[rel] = text
+                budget -= cost
+
+        sections = []
+        rest = [(rel, text) for rel, text, _ in ranked if rel not in full]
+        if rest:
+            outline = "\n\n".join(f"--- {rel} (outline) ---\n{summarize_file(rel, text)}" for rel, text in rest)
+            sections.append(f"Outline of the other files:\n{truncate_to_tokens(outline, CHAT_OUTLINE_TOKENS)}")
+
+        # Diffs only against code that was in the previous prompt
+        files = {rel: text for rel, text, _ in ranked}
+        deltas = []
+        for rel, before in self.sent_files.items():
+            if rel not in files:
+                deltas.append(f"--- {rel} (deleted) ---")
+            elif before != files[rel]:
+                diff = difflib.unified_diff(
+                    before.splitlines(), files[rel].splitlines(), f"a/{rel}", f"b/{rel}", lineterm="", n=2
+                )
+                deltas.append("\n".join(diff))
+        if deltas:
+            sections.append("Changes since the previous message:\n" + "\n\n".join(deltas))
+
+        if full:
+            sections.append("Code relevant to this question:\n" + "\n\n".join(f"--- {rel} ---\n{text}" for rel, text in full.items()))
+        return "\n\n".join(sections), full
+
+    def build_prompt(self, question):
+        """
+        Returns (prompt, files) where files maps the files included in full to their text.
+        """
+        code, seen = self._code_update(question, rank_app_files(self.app_path, question))
+        history = self._history()
+        prompt = (
+            f"Context: You are an AI assistant helping a developer with their {self.language} app.\n"
+            f"Code:\n{code}\n\n"
+            + (f"{history}\n\n" if history else "")
+            + f"User Question: {question}\n"
+            "Answer helpful and concise."
+        )
+        return prompt, seen
+
+    def _fold_old_turns(self):
+        if len(self.turns) <= CHAT_RECENT_TURNS:
+            return
+        turn = self.turns[-CHAT_RECENT_TURNS - 1]
+        line = f"- Q: {first_sentence(turn['question'], 120)} A: {first_sentence(turn['answer'])}"
+        lines = (self.summary.splitlines() if self.summary else []) + [line]
+        while lines and sum(len(l) + 1 for l in lines) > CHAT_SUMMARY_MAX_CHARS:
+            lines.pop(0)
+        self.summary = "\n".join(lines)
+
+    def ask(self, question, spinner_text="Copilot typing..."):
+        """
+        Sends one turn and returns (answer, stats) with the prompt size and latency.
+        """
+        prompt, seen = self.build_prompt(question)
+        started = time.perf_counter()
+        answer = call_copilot(prompt, spinner_text)
+        latency = time.perf_counter() - started
+
+        stats = {"prompt_chars": len(prompt), "prompt_tokens": estimate_tokens(prompt), "latency": round(latency, 3)}
+        self.sent_files = seen
+        self.turns.append({"question": question, "answer": answer, **stats})
+        self._fold_old_turns()
+        self.save()
+        return answer, stats
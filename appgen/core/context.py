@@ -0,0 +1,208 @@
+import ast
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from appgen.utils.filesystem import app_root, iter_app_files
+from appgen.utils.tracing import span
+
+CONTEXT_EXTENSIONS = (".py", ".cpp", ".cc", ".cxx", ".h", ".hpp", ".html", ".js", ".css")
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("PROMPT2APP_CONTEXT_TOKENS", "3000"))
+# Rough average for source code; good enough to keep prompts inside a budget
+CHARS_PER_TOKEN = 4
+FILE_CACHE_MAX_ENTRIES = 256
+
+ENTRY_POINT_NAMES = {"main", "app", "index", "streamlit_app", "server", "run"}
+WORD_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]{2,}")
+STOP_WORDS = {"the", "and", "for", "with", "this", "that", "add", "make", "app", "code", "can", "you", "how", "what", "why", "please"}
+
+# Signature-level lines for languages without an ast in the standard library
+SIGNATURE_RES = {
+    ".cpp": re.compile(r"^\s*(#include.*|(class|struct|enum|namespace)\s+\w+.*|[\w:<>,*&\s]+\s[\*&]?[\w:~]+\s*\([^;]*\)\s*(const)?\s*\{?)\s*$"),
+    ".js": re.compile(r"^\s*(import .*|export .*|(async\s+)?function\s*\*?\s*\w+\s*\(.*|class\s+\w+.*|(const|let|var)\s+\w+\s*=\s*(async\s*)?(\(.*\)|\w+)\s*=>.*)$"),
+    ".css": re.compile(r"^\s*([^{}\s][^{}]*)\{"),
+}
+for _ext in (".cc", ".cxx", ".h", ".hpp"):
+    SIGNATURE_RES[_ext] = SIGNATURE_RES[".cpp"]
+HTML_OUTLINE_RE = re.compile(r"<(title|h[1-3])[^>]*>(.*?)</\1>|<(script|link)\b[^>]*>|\bid=\"([^\"]+)\"", re.IGNORECASE | re.DOTALL)
+
+_file_cache = OrderedDict()
+_file_cache_lock = threading.Lock()
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def read_text_cached(path):
+    """
+    Reads a text file, reusing the previous read while its mtime and size are unchanged.
+    """
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _file_cache_lock:
+        cached = _file_cache.get(path)
+        if cached and cached[0] == stamp:
+            _file_cache.move_to_end(path)
+            return cached[1]
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    with _file_cache_lock:
+        _file_cache[path] = (stamp, text)
+        _file_cache.move_to_end(path)
+        while len(_file_cache) > FILE_CACHE_MAX_ENTRIES:
+            _file_cache.popitem(last=False)
+    return text
+
+def query_terms(query):
+    return {w.lower() for w in WORD_RE.findall(query or "")} - STOP_WORDS
+
+def score_file(rel, text, terms):
+    """
+    Higher is more relevant: entry points first, then files mentioning the
+    query, with a small bonus for files that carry more of the app's logic.
+    """
+    stem = os.path.splitext(os.path.basename(rel))[0].lower()
+    score = 0.0
+    if stem in ENTRY_POINT_NAMES:
+        score += 10
+    if terms:
+        lowered = text.lower()
+        rel_lower = rel.lower()
+        for term in terms:
+            if term in rel_lower:
+                score += 5
+            score += min(lowered.count(term), 5)
+    score += min(math.log1p(len(text) / 1000), 3)
+    # Nested files are usually helpers
+    score -= rel.count(os.sep) * 0.5
+    return score
+
+def _python_summary(text):
+    try:
+        tree = ast.parse(text)
+    except SyntaxError:
+        return None
+    lines = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            lines.append(ast.get_source_segment(text, node) or "")
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            lines.extend(_python_signature(node, ""))
+        elif isinstance(node, ast.Assign) and all(isinstance(t, ast.Name) and t.id.isupper() for t in node.targets):
+            segment = ast.get_source_segment(text, node) or ""
+            lines.append(segment if len(segment) <= 120 else segment[:117] + "...")
+    return "\n".join(line for line in lines if line)
+
+def _python_signature(node, indent):
+    if isinstance(node, ast.ClassDef):
+        bases = ", ".join(ast.unparse(b) for b in node.bases)
+        lines = [f"{indent}class {node.name}({bases}):" if bases else f"{indent}class {node.name}:"]
+    else:
+        prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+        args = ast.unparse(node.args)
+        returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+        lines = [f"{indent}{prefix} {node.name}({args}){returns}: ..."]
+    doc = ast.get_docstring(node)
+    if doc:
+        lines.append(f'{indent}    """{doc.strip().splitlines()[0]}"""')
+    if isinstance(node, ast.ClassDef):
+        for child in node.body:
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                lines.extend(_python_signature(child, indent + "    "))
+    return lines
+
+def summarize_file(rel, text):
+    """
+    Signature-level outline of a file: imports, classes and function
+    signatures for code, titles, ids and assets for HTML.
+    """
+    ext = os.path.splitext(rel)[1].lower()
+    summary = None
+    if ext == ".py":
+        summary = _python_summary(text)
+    elif ext == ".html":
+        parts = []
+        for match in HTML_OUTLINE_RE.finditer(text):
+            if match.group(1):
+                parts.append(f"<{match.group(1)}>{' '.join(match.group(2).split())}</{match.group(1)}>")
+            elif match.group(3):
+                parts.append(" ".join(match.group(0).split()))
+            else:
+                parts.append(f"#{match.group(4)}")
+        summary = "\n".join(parts)
+    elif ext in SIGNATURE_RES:
+        pattern = SIGNATURE_RES[ext]
+        summary = "\n".join(line.rstrip(" {") for line in text.splitlines() if pattern.match(line))
+    if not summary:
+        # Unknown layout: keep the head of the file
+        summary = "\n".join(text.splitlines()[:20])
+    return summary
+
+def truncate_to_tokens(text, tokens):
+    limit = max(0, tokens * CHARS_PER_TOKEN)
+    if len(text) <= limit:
+        return text
+    cut = text.rfind("\n", 0, limit)
+    return text[:cut if cut > 0 else limit] + "\n..."
+
+def rank_app_files(app_path, query="", extensions=CONTEXT_EXTENSIONS):
+    """
+    Returns [(rel_path, text, score)] for the app's source files, most relevant first.
+    """
+    base = app_root(app_path)
+    entry = None if os.path.isdir(app_path) else os.path.abspath(app_path)
+    terms = query_terms(query)
+    ranked = []
+    for path in iter_app_files(base, extensions):
+        try:
+            text = read_text_cached(path)
+        except OSError:
+            continue
+        rel = os.path.relpath(path, base)
+        score = score_file(rel, text, terms)
+        if entry and os.path.abspath(path) == entry:
+            score += 10
+        ranked.append((rel, text, score))
+    ranked.sort(key=lambda item: (-item[2], item[0]))
+    return ranked
+
+def build_context(app_path, query="", budget_tokens=None, extensions=CONTEXT_EXTENSIONS):
+    """
+    Packs the most relevant files of an app into a prompt-sized block of text.
+
+    Files are taken in relevance order and included whole while they fit the
+    token budget; the rest are included as signature summaries, truncated if
+    even the summary does not fit. Each file starts with a '--- name ---' header.
+    """
+    with span("context.read") as attrs:
+        ranked = rank_app_files(app_path, query, extensions)
+        attrs["files"] = len(ranked)
+    return pack_context(ranked, budget_tokens)[0]
+
+def pack_context(ranked, budget_tokens=None):
+    """
+    The packing step of build_context for already ranked files. Returns
+    (text, full) where full maps the files included whole to their text.
+    """
+    budget = budget_tokens or CONTEXT_TOKEN_BUDGET
+    sections, omitted, full = [], [], {}
+    for rel, text, _ in ranked:
+        header = f"--- {rel} ---"
+        cost = estimate_tokens(header) + estimate_tokens(text) + 1
+        if cost <= budget:
+            sections.append(f"{header}\n{text}")
+            full[rel] = text
+            budget -= cost
+            continue
+        header = f"--- {rel} (summary) ---"
+        summary = summarize_file(rel, text)
+        available = budget - estimate_tokens(header) - 1
+        if available <= 16:
+            omitted.append(rel)
+            continue
+        summary = truncate_to_tokens(summary, available)
+        sections.append(f"{header}\n{summary}")
+        budget -= estimate_tokens(header) + estimate_tokens(summary) + 1
+    if omitted:
+        sections.append(f"--- omitted: {', '.join(omitted)} ---")
+    return "\n\n".join(sections), full
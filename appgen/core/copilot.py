@@ -1,30 +1,147 @@
 
+import asyncio
 import subprocess
+import threading
 from appgen.utils.console import console
+from appgen.core.cache import response_cache, cache_enabled
+from appgen.utils.tracing import span
 
 class CopilotError(Exception):
     pass
 
-def call_copilot(prompt: str, spinner_text="Consulting GitHub Copilot...") -> str:
-    with console.status(f"[cyan]{spinner_text}[/cyan]", spinner="dots"):
-        result = subprocess.run(
-            ["gh", "copilot", "-p", prompt, "--silent"],
-            capture_output=True,
+def call_copilot(prompt: str, spinner_text="Consulting GitHub Copilot...", use_cache=True) -> str:
+    use_cache = use_cache and cache_enabled()
+    with span("copilot.call", prompt_chars=len(prompt)) as attrs:
+        if use_cache:
+            cached = response_cache.get(prompt)
+            if cached is not None:
+                attrs["cached"] = True
+                console.print("[dim](cached response)[/dim]")
+                return cached
+
+        from appgen.core.engine import CopilotCancelled, default_engine
+
+        try:
+            with console.status(f"[cyan]{spinner_text}[/cyan]", spinner="dots"):
+                output = asyncio.run(default_engine.run(prompt))
+        except KeyboardInterrupt:
+            # asyncio.run has already cancelled the call and killed its gh process
+            attrs["outcome"] = "cancelled"
+            raise CopilotCancelled("Cancelled")
+
+        attrs["cached"] = False
+        if use_cache:
+            response_cache.put(prompt, output)
+        return output
+
+def call_copilot_many(prompts, spinner_text="Consulting GitHub Copilot...", max_concurrency=None, use_cache=True):
+    """
+    Runs several prompts concurrently and returns their outputs in input order.
+    Items that failed hold a CopilotError instead of a string.
+    """
+    from appgen.core.engine import CopilotEngine, default_engine
+
+    engine = CopilotEngine(max_concurrency) if max_concurrency else default_engine
+    use_cache = use_cache and cache_enabled()
+    results = [None] * len(prompts)
+    pending = []
+    for i, prompt in enumerate(prompts):
+        cached = response_cache.get(prompt) if use_cache else None
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending.append(i)
+
+    if pending:
+        done = [len(prompts) - len(pending)]
+        with console.status(f"[cyan]{spinner_text} ({done[0]}/{len(prompts)})[/cyan]", spinner="dots") as status:
+            def _on_result(_, result):
+                done[0] += 1
+                status.update(f"[cyan]{spinner_text} ({done[0]}/{len(prompts)})[/cyan]")
+
+            outputs = asyncio.run(engine.run_many([prompts[i] for i in pending], on_result=_on_result))
+
+        for i, output in zip(pending, outputs):
+            results[i] = output
+            if use_cache and isinstance(output, str):
+                response_cache.put(prompts[i], output)
+
+    return results
+
+def stream_copilot(prompt: str):
+    """
+    Yields Copilot's stdout line by line while it is still generating.
+    Raises CopilotError once the stream ends if the process failed. Streams
+    are not retried (lines were already yielded), but they share the engine's
+    timeout and circuit breaker.
+    """
+    from appgen.core.engine import CopilotTimeout, build_copilot_command, classify_error, default_engine
+
+    breaker = default_engine.breaker
+    breaker.before_call()
+    try:
+        proc = subprocess.Popen(
+            build_copilot_command(prompt),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
             encoding="utf-8",
-            shell=False
+            errors="replace",
+            bufsize=1
         )
+    except FileNotFoundError:
+        error = CopilotError("GitHub CLI (gh) not found on PATH")
+        breaker.record_failure(error)
+        raise error
+
+    # A hung CLI would block the line loop forever; the timer kills it instead
+    timed_out = threading.Event()
+    def _expire():
+        timed_out.set()
+        proc.kill()
+    timer = threading.Timer(default_engine.timeout, _expire) if default_engine.timeout else None
+    if timer:
+        timer.daemon = True
+        timer.start()
 
-    if result.returncode != 0:
-        raise CopilotError(result.stderr.strip())
+    # Drain stderr in the background so a chatty CLI cannot block stdout
+    stderr_chunks = []
+    drain = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True)
+    drain.start()
 
-    output = result.stdout.strip()
-    if not output:
-        raise CopilotError("Copilot returned empty output")
+    produced = False
+    try:
+        for line in proc.stdout:
+            if line.strip():
+                produced = True
+            yield line
+        proc.wait()
+    finally:
+        if timer:
+            timer.cancel()
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+            breaker.release()
+        drain.join(timeout=1)
 
-    return output
+    error = None
+    if timed_out.is_set():
+        error = CopilotTimeout(f"gh copilot timed out after {default_engine.timeout:g}s")
+    elif proc.returncode != 0:
+        error = CopilotError("".join(stderr_chunks).strip())
+    elif not produced:
+        error = CopilotError("Copilot returned empty output")
+    if error is None:
+        breaker.record_success()
+        return
+    if classify_error(error) == "fatal":
+        breaker.record_success()
+    else:
+        breaker.record_failure(error)
+    raise error
 
-def get_copilot_suggestion(query, language, color_scheme="default", complex_app=False, architecture="Standard", extras=None):
+def build_suggestion_prompt(query, language, color_scheme="default", complex_app=False, architecture="Standard", extras=None):
     extras = extras or []
     
     lang_instruction = ""
@@ -67,5 +184,11 @@ def get_copilot_suggestion(query, language, color_scheme="default", complex_app=
         f"- Structure: {complexity_instruction}\n\n"
         "Generate the code exactly matching requests."
     )
-    
-    return call_copilot(full_prompt, f"Consulting Copilot ({language}, {architecture})...")
+    return full_prompt
+
+def get_copilot_suggestion(query, language, color_scheme="default", complex_app=False, architecture="Standard", extras=None, use_cache=True):
+    full_prompt = build_suggestion_prompt(query, language, color_scheme, complex_app, architecture, extras)
+    return call_copilot(full_prompt, f"Consulting Copilot ({language}, {architecture})...", use_cache=use_cache)
+
+def stream_copilot_suggestion(query, language, color_scheme="default", complex_app=False, architecture="Standard", extras=None):
+    return stream_copilot(build_suggestion_prompt(query, language, color_scheme, complex_app, architecture, extras))
@@ -0,0 +1,359 @@
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from appgen.core.copilot import CopilotError
+from appgen.utils.stats import percentile
+from appgen.utils.tracing import span
+
+COPILOT_CONCURRENCY = int(os.environ.get("PROMPT2APP_COPILOT_CONCURRENCY", "4"))
+# Seconds before a gh copilot process is killed; 0 disables the timeout
+COPILOT_TIMEOUT = float(os.environ.get("PROMPT2APP_COPILOT_TIMEOUT", "90"))
+# Seconds a call may take across all attempts, queueing and backoff included;
+# 0 disables the deadline
+COPILOT_DEADLINE = float(os.environ.get("PROMPT2APP_COPILOT_DEADLINE", "150"))
+COPILOT_RETRIES = int(os.environ.get("PROMPT2APP_COPILOT_RETRIES", "2"))
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 20.0
+# Hedging launches a duplicate request when the first is slower than the
+# recent p95 latency; off by default because it can double Copilot usage
+COPILOT_HEDGE = os.environ.get("PROMPT2APP_COPILOT_HEDGE", "").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_SAMPLES = 10
+HEDGE_MIN_DELAY = 2.0
+LATENCY_WINDOW = 200
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_COOLDOWN = 30.0
+
+# Failures that say nothing about the prompt: worth retrying
+RETRYABLE_RE = re.compile(
+    r"timed? ?out|rate.?limit|too many requests|\b429\b|(?:http|status|error)\W*5\d\d\b|temporar|unavailable|"
+    r"connection|network|reset by peer|broken pipe|\beof\b|\btls\b|\bdns\b|empty output",
+    re.IGNORECASE,
+)
+# Failures caused by the request itself; repeating it would fail the same way
+FATAL_RE = re.compile(r"invalid|too long|too large|bad request|\b400\b|content (?:filter|policy)|not allowed", re.IGNORECASE)
+# Failures that mean the CLI cannot work at all until the user fixes something
+UNAVAILABLE_RE = re.compile(
+    r"not found on path|gh auth login|not logged in|authenticat|\b401\b|\b403\b|unknown command|"
+    r"not installed|subscription|not enabled",
+    re.IGNORECASE,
+)
+
+class CopilotCancelled(CopilotError):
+    pass
+
+class CopilotTimeout(CopilotError):
+    pass
+
+class CopilotCircuitOpen(CopilotError):
+    pass
+
+def classify_error(error):
+    """
+    'retryable', 'unavailable' (the CLI itself is broken; fail fast) or 'fatal'
+    (specific to this request, e.g. a rejected prompt).
+    """
+    if isinstance(error, CopilotTimeout):
+        return "retryable"
+    if isinstance(error, (CopilotCancelled, CopilotCircuitOpen)):
+        return "fatal"
+    message = str(error)
+    if UNAVAILABLE_RE.search(message):
+        return "unavailable"
+    if RETRYABLE_RE.search(message):
+        return "retryable"
+    if FATAL_RE.search(message):
+        return "fatal"
+    # Unknown failures are usually transient CLI hiccups
+    return "retryable"
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """
+    Exponential backoff with full jitter: uniform in [0, min(cap, base * 2^attempt)].
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+def build_copilot_command(prompt: str):
+    return ["gh", "copilot", "-p", prompt, "--silent"]
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive CLI failures and rejects calls for
+    `cooldown` seconds; then lets a single trial call through (half-open),
+    which closes the circuit on success or reopens it on failure.
+    """
+
+    def __init__(self, threshold=CIRCUIT_FAILURE_THRESHOLD, cooldown=CIRCUIT_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.last_error = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == "closed":
+                return
+            remaining = self.opened_at + self.cooldown - time.monotonic()
+            if self.state == "open" and remaining <= 0:
+                self.state, self._trial = "half-open", False
+            if self.state == "half-open" and not self._trial:
+                self._trial = True
+                return
+            raise CopilotCircuitOpen(
+                f"Copilot CLI looks unavailable after {self.failures} consecutive failures "
+                f"(last: {self.last_error}); retrying in {max(0, remaining):.0f}s"
+            )
+
+    def record_success(self):
+        with self._lock:
+            self.state, self.failures, self._trial = "closed", 0, False
+
+    def release(self):
+        """
+        Frees the half-open trial slot when the trial call was cancelled.
+        """
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)[:120] or error.__class__.__name__
+            if self.state == "half-open" or self.failures >= self.threshold:
+                self.state, self.opened_at, self._trial = "open", time.monotonic(), False
+
+class CopilotEngine:
+    """
+    Runs many `gh copilot` subprocesses concurrently under a concurrency limit.
+
+    Every call gets a timeout that kills the child and an overall deadline
+    that bounds its retries, retries retryable failures with jittered
+    exponential backoff, optionally hedges slow requests, and goes through a
+    circuit breaker that fails fast while the CLI is down.
+
+    One engine can be shared across event loops; the semaphore is recreated
+    for each loop because asyncio primitives are bound to the loop that uses them.
+    """
+
+    def __init__(self, max_concurrency=COPILOT_CONCURRENCY, timeout=COPILOT_TIMEOUT, retries=COPILOT_RETRIES,
+                 hedge=COPILOT_HEDGE, breaker=None, deadline=COPILOT_DEADLINE):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.timeout = timeout or None
+        self.deadline = deadline or None
+        self.retries = max(0, int(retries))
+        self.hedge = hedge
+        self.breaker = breaker or CircuitBreaker()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self._semaphore = None
+        self._semaphore_loop = None
+        self._loop = None
+        self._procs = set()
+        self._tasks = set()
+        self._lock = threading.Lock()
+
+    def _get_semaphore(self):
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def hedge_delay(self):
+        """
+        Seconds to wait before hedging, or None when hedging is off or there
+        is not enough latency history yet.
+        """
+        if not self.hedge or len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        return max(HEDGE_MIN_DELAY, percentile(list(self.latencies), HEDGE_PERCENTILE))
+
+    def _call_timeout(self, deadline):
+        """
+        Timeout for the next gh process: the per-call timeout, cut short by the
+        deadline. Raises CopilotTimeout when the deadline has already passed.
+        """
+        if deadline is None:
+            return self.timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise CopilotTimeout(f"gh copilot gave no answer within the {self.deadline:g}s deadline")
+        return min(self.timeout, remaining) if self.timeout else remaining
+
+    async def run(self, prompt: str) -> str:
+        deadline = time.monotonic() + self.deadline if self.deadline else None
+        for attempt in range(self.retries + 1):
+            self.breaker.before_call()
+            try:
+                output = await self._attempt(prompt, attempt, deadline)
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except CopilotError as e:
+                kind = classify_error(e)
+                if kind == "fatal":
+                    # The CLI answered, it just rejected this request
+                    self.breaker.record_success()
+                else:
+                    self.breaker.record_failure(e)
+                if kind != "retryable" or attempt == self.retries:
+                    raise
+                delay = backoff_delay(attempt)
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    # A retry could not finish in time; report the real failure
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return output
+
+    async def _attempt(self, prompt, attempt, deadline=None):
+        queued = time.perf_counter()
+        async with self._get_semaphore():
+            with span("copilot.exec", prompt_chars=len(prompt), attempt=attempt) as attrs:
+                attrs["queued_ms"] = round((time.perf_counter() - queued) * 1000, 3)
+                started = time.perf_counter()
+                output = await self._exec_hedged(prompt, attrs, deadline)
+                self.latencies.append(time.perf_counter() - started)
+                attrs["output_chars"] = len(output)
+                return output
+
+    async def _exec_hedged(self, prompt, attrs, deadline=None):
+        """
+        Runs the request; if it is still running after hedge_delay(), starts a
+        duplicate and returns whichever succeeds first, killing the other.
+        The duplicate takes its own concurrency slot and is skipped when none
+        is free, so hedging never runs more gh processes than the limit.
+        """
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._exec(prompt, self._call_timeout(deadline))
+
+        primary = asyncio.ensure_future(self._exec(prompt, self._call_timeout(deadline)))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+            semaphore = self._get_semaphore()
+            if semaphore.locked():
+                attrs["hedge_skipped"] = True
+                return await primary
+            attrs["hedged"] = True
+            pending.add(asyncio.ensure_future(self._exec_in_slot(prompt, self._call_timeout(deadline))))
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        attrs["hedge_won"] = task is not primary
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _exec_in_slot(self, prompt, timeout):
+        async with self._get_semaphore():
+            return await self._exec(prompt, timeout)
+
+    async def _exec(self, prompt: str, timeout=None) -> str:
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *build_copilot_command(prompt),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except FileNotFoundError:
+            raise CopilotError("GitHub CLI (gh) not found on PATH")
+
+        with self._lock:
+            self._procs.add(proc)
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError) as e:
+            # Never leave an orphaned gh process behind a cancelled or hung call
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            if isinstance(e, asyncio.TimeoutError):
+                raise CopilotTimeout(f"gh copilot timed out after {round(timeout, 1):g}s")
+            raise
+        finally:
+            with self._lock:
+                self._procs.discard(proc)
+
+        if proc.returncode != 0:
+            error = CopilotError(stderr.decode("utf-8", errors="replace").strip() or f"gh exited with code {proc.returncode}")
+            error.returncode = proc.returncode
+            raise error
+
+        output = stdout.decode("utf-8", errors="replace").strip()
+        if not output:
+            raise CopilotError("Copilot returned empty output")
+        return output
+
+    async def run_many(self, prompts, on_result=None):
+        """
+        Runs all prompts concurrently and returns results in input order.
+
+        Failed items hold their CopilotError instead of a string; cancelled items
+        hold a CopilotCancelled. `on_result(index, result)` fires as each finishes.
+        """
+        self._loop = asyncio.get_running_loop()
+
+        async def _one(index, prompt):
+            try:
+                result = await self.run(prompt)
+            except asyncio.CancelledError:
+                result = CopilotCancelled("Cancelled")
+            except CopilotError as e:
+                result = e
+            except Exception as e:
+                result = CopilotError(str(e))
+            if on_result:
+                on_result(index, result)
+            return result
+
+        tasks = [asyncio.ensure_future(_one(i, p)) for i, p in enumerate(prompts)]
+        with self._lock:
+            self._tasks.update(tasks)
+        try:
+            return list(await asyncio.gather(*tasks))
+        finally:
+            with self._lock:
+                self._tasks.difference_update(tasks)
+
+    def _cancel_all(self):
+        with self._lock:
+            tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+
+    def cancel(self):
+        """
+        Cancels every in-flight batch item. Safe to call from any thread.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._cancel_all()
+        else:
+            loop.call_soon_threadsafe(self._cancel_all)
+
+default_engine = CopilotEngine()
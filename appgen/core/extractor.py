@@ -1,20 +1,193 @@
-
 import re
 
+# Filename hints that may appear on the line(s) right before a fence
+_NAME = r"[`'\"]?(?P<file>[\w.\-/\\]+\.\w+)[`'\"]?"
+_ANY_NAME = r"[`'\"]?(?P<file>[^\s`'\"*]+)[`'\"]?"
+EXPLICIT_HINTS = [
+    re.compile(r"^#{1,6}\s*(?:file(?:name)?|path)\s*[:=]\s*" + _ANY_NAME + r"\s*$", re.IGNORECASE),
+    re.compile(r"^(?:\*\*)?(?:file(?:name)?|path)\s*[:=]\s*(?:\*\*)?\s*" + _ANY_NAME + r"\s*(?:\*\*)?\s*$", re.IGNORECASE),
+]
+IMPLICIT_HINTS = [
+    re.compile(r"^#{1,6}\s*" + _NAME + r"\s*:?\s*$"),
+    re.compile(r"^\*\*" + _NAME + r":?\*\*:?\s*$"),
+    re.compile(r"^" + _NAME + r":\s*$"),
+]
+
+# Hints written inside the info string, e.g. ```python title="app.py" or ```python:app.py
+INFO_NAME_RE = re.compile(r"""(?:title|file(?:name)?|path)\s*=\s*["']?(?P<file>[^"'\s]+)""", re.IGNORECASE)
+INFO_COLON_RE = re.compile(r"^(?P<lang>[\w+#-]+):(?P<file>[\w.\-/\\]+\.\w+)$")
+
+# Hint on the first line of the code itself, e.g. "# filename: app.py" or "// file: main.cpp"
+CODE_HINT_RE = re.compile(
+    r"^\s*(?:#|//|<!--|/\*)\s*(?:file(?:name)?|path)\s*:\s*(?P<file>[\w.\-/\\]+\.\w+)",
+    re.IGNORECASE
+)
+
+class CodeBlockParser:
+    """
+    Single-pass state machine that pulls fenced code blocks out of Markdown.
+
+    Text can be fed in arbitrary chunks; each call returns the blocks whose
+    closing fence has been seen, so work is linear in the input size.
+    Handles ``` and ~~~ fences of any length (a block only closes on a fence
+    of the same character that is at least as long) and several filename hints.
+    """
+
+    def __init__(self):
+        self._partial = []
+        self._pending_file = None
+        self._block = None
+        self._fence = None
+        self._indent = 0
+
+    def feed(self, text: str):
+        if "\n" not in text:
+            self._partial.append(text)
+            return []
+
+        self._partial.append(text)
+        lines = "".join(self._partial).split("\n")
+        self._partial = [lines.pop()]
+
+        blocks = []
+        for line in lines:
+            block = self._feed_line(line)
+            if block:
+                blocks.append(block)
+        return blocks
+
+    def close(self):
+        """
+        Flushes the last line. An unterminated block is closed by the end of input.
+        """
+        blocks = []
+        tail = "".join(self._partial)
+        self._partial = []
+        if tail:
+            block = self._feed_line(tail)
+            if block:
+                blocks.append(block)
+        if self._block is not None:
+            blocks.append(self._finish())
+        self._pending_file = None
+        return blocks
+
+    def _feed_line(self, line):
+        if line.endswith("\r"):
+            line = line[:-1]
+
+        if self._block is not None:
+            stripped = line.lstrip()
+            if stripped[:1] == self._fence[0] and self._is_closing(stripped):
+                return self._finish()
+            if self._indent:
+                # Remove up to the fence's own indentation from content lines
+                lead = len(line) - len(stripped)
+                line = line[min(lead, self._indent):]
+            self._block["lines"].append(line)
+            return None
+
+        stripped = line.lstrip()
+        if stripped[:3] in ("```", "~~~"):
+            if self._open(stripped, len(line) - len(stripped)):
+                return None
+
+        if not stripped:
+            return None
+        hint = self._match_hint(stripped.rstrip())
+        self._pending_file = hint
+        return None
+
+    def _open(self, stripped, indent):
+        char = stripped[0]
+        length = len(stripped) - len(stripped.lstrip(char))
+        info = stripped[length:].strip()
+        # Backtick fences may not contain backticks in their info string
+        if char == "`" and "`" in info:
+            return False
+
+        language, filename = self._parse_info(info)
+        self._fence = char * length
+        self._indent = indent
+        self._block = {
+            "filename": filename or self._pending_file,
+            "language": language or "text",
+            "lines": [],
+        }
+        self._pending_file = None
+        return True
+
+    def _is_closing(self, stripped):
+        fence = self._fence
+        if not stripped.startswith(fence):
+            return False
+        rest = stripped.lstrip(fence[0])
+        return not rest.strip()
+
+    def _finish(self):
+        block = self._block
+        lines = block.pop("lines")
+        self._block = None
+        self._fence = None
+        self._indent = 0
+
+        start, end = 0, len(lines)
+        while start < end and not lines[start].strip():
+            start += 1
+        while end > start and not lines[end - 1].strip():
+            end -= 1
+        lines = lines[start:end]
+
+        if not block["filename"] and lines:
+            hint = CODE_HINT_RE.match(lines[0])
+            if hint:
+                block["filename"] = hint.group("file")
+
+        block["code"] = "\n".join(line.rstrip() for line in lines)
+        return block
+
+    @staticmethod
+    def _parse_info(info):
+        if not info:
+            return "", None
+        filename = None
+        named = INFO_NAME_RE.search(info)
+        if named:
+            filename = named.group("file")
+
+        first = info.split()[0].strip("{}").lstrip(".")
+        colon = INFO_COLON_RE.match(first)
+        if colon:
+            return colon.group("lang"), filename or colon.group("file")
+        if "=" in first:
+            return "", filename
+        return first, filename
+
+    @staticmethod
+    def _match_hint(line):
+        if ":" in line or "=" in line:
+            for pattern in EXPLICIT_HINTS:
+                match = pattern.match(line)
+                if match:
+                    return match.group("file")
+        if "." in line and len(line) < 200:
+            for pattern in IMPLICIT_HINTS:
+                match = pattern.match(line)
+                if match:
+                    return match.group("file")
+        return None
+
+def iter_code_blocks(chunks):
+    """
+    Yields {filename, language, code} records from an iterable of text chunks.
+    """
+    parser = CodeBlockParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
 def extract_code_blocks_with_filenames(md: str):
     """
     Robust code block extraction handling filenames and multiple blocks.
     """
-    pattern = re.compile(
-        r"(?:###\s*filename:\s*(?P<file>[^\n]+)\n)?\s*```(?P<lang>\w*)\n(?P<code>.*?)```",
-        re.DOTALL | re.IGNORECASE
-    )
-
-    blocks = []
-    for match in pattern.finditer(md):
-        blocks.append({
-            "filename": match.group("file"),
-            "language": match.group("lang") or "text",
-            "code": match.group("code").strip()
-        })
-    return blocks
+    return list(iter_code_blocks([md]))
@@ -0,0 +1,327 @@
+import ast
+import hashlib
+import json
+import os
+import re
+from html.parser import HTMLParser
+from appgen.utils.filesystem import state_path, app_root, iter_app_files
+
+METRICS_CACHE_FILE = "metrics_cache.json"
+METRICS_CACHE_MAX_ENTRIES = 5000
+# Bump when a metric's definition changes so cached results are recomputed
+METRICS_VERSION = 1
+METRICS_EXTENSIONS = (".py", ".cpp", ".cc", ".cxx", ".h", ".hpp", ".js", ".css", ".html", ".htm")
+# Runs of this many identical (normalized, non-blank) lines count as duplication
+DUPLICATE_WINDOW = 6
+
+# Thresholds above which a value is highlighted: (warning, bad)
+THRESHOLDS = {
+    "max_complexity": (10, 20),
+    "max_function_length": (50, 100),
+    "max_nesting": (4, 6),
+    "duplication": (10.0, 25.0),
+    "fan_out": (10, 20),
+}
+
+BRACE_DECISION_RE = re.compile(r"\b(?:if|for|while|case|catch)\b|&&|\|\||\?(?!\?)")
+BRACE_FUNCTION_RE = re.compile(r"(?:\bfunction\b[^(]*|[\w:~<>\]]*\s*)\([^;{}]*\)\s*(?:const\s*)?(?:noexcept\s*)?(?:->\s*[\w:<>]+\s*)?(?:=>\s*)?\{")
+BRACE_KEYWORDS = {"if", "for", "while", "switch", "catch", "return", "else", "do"}
+CPP_INCLUDE_RE = re.compile(r'^\s*#\s*include\s*[<"]([^>"]+)[>"]')
+JS_IMPORT_RE = re.compile(r"""^\s*(?:import\b.*?from\s*['"]([^'"]+)['"]|import\s*['"]([^'"]+)['"]|.*\brequire\(\s*['"]([^'"]+)['"]\s*\))""")
+CSS_IMPORT_RE = re.compile(r"""^\s*@import\s+(?:url\()?['"]?([^'")\s;]+)""")
+
+def _window_hashes(lines):
+    """
+    Short hashes of every DUPLICATE_WINDOW-line window of normalized code lines.
+    """
+    norm = [" ".join(line.split()) for line in lines]
+    return [
+        hashlib.sha1("\n".join(norm[i:i + DUPLICATE_WINDOW]).encode("utf-8")).hexdigest()[:12]
+        for i in range(len(norm) - DUPLICATE_WINDOW + 1)
+    ]
+
+def _function_metrics(name, line, length, complexity, nesting):
+    return {"name": name, "line": line, "length": length, "complexity": complexity, "nesting": nesting}
+
+class ComplexityVisitor(ast.NodeVisitor):
+    """
+    McCabe-style complexity and control-flow nesting of one function body.
+    Nested functions and classes are measured on their own.
+    """
+
+    DECISIONS = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.IfExp, ast.ExceptHandler, ast.Assert)
+    BLOCKS = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.With, ast.AsyncWith, ast.Try)
+
+    def __init__(self):
+        self.complexity = 1
+        self.depth = 0
+        self.max_depth = 0
+
+    def generic_visit(self, node):
+        if isinstance(node, self.DECISIONS):
+            self.complexity += 1
+        elif isinstance(node, ast.BoolOp):
+            self.complexity += len(node.values) - 1
+        elif isinstance(node, ast.comprehension):
+            self.complexity += 1 + len(node.ifs)
+        elif hasattr(ast, "match_case") and isinstance(node, ast.match_case):
+            self.complexity += 1
+
+        block = isinstance(node, self.BLOCKS)
+        if block:
+            self.depth += 1
+            self.max_depth = max(self.max_depth, self.depth)
+        super().generic_visit(node)
+        if block:
+            self.depth -= 1
+
+    def visit_FunctionDef(self, node):
+        pass
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+    visit_ClassDef = visit_FunctionDef
+    visit_Lambda = visit_FunctionDef
+
+def python_metrics(text):
+    lines = text.splitlines()
+    code_lines = [line for line in lines if line.strip() and not line.strip().startswith("#")]
+    comment_lines = sum(1 for line in lines if line.strip().startswith("#"))
+    try:
+        tree = ast.parse(text)
+    except SyntaxError as e:
+        return {"error": f"Syntax error on line {e.lineno}", "loc": len(code_lines), "comments": comment_lines}
+
+    functions, modules = [], set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            visitor = ComplexityVisitor()
+            for child in node.body:
+                visitor.visit(child)
+            length = (getattr(node, "end_lineno", node.lineno) or node.lineno) - node.lineno + 1
+            functions.append(_function_metrics(node.name, node.lineno, length, visitor.complexity, visitor.max_depth))
+            if ast.get_docstring(node):
+                comment_lines += ast.get_docstring(node).count("\n") + 1
+        elif isinstance(node, ast.Import):
+            modules.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            modules.add("." * node.level + (node.module or "").split(".")[0])
+    if ast.get_docstring(tree):
+        comment_lines += ast.get_docstring(tree).count("\n") + 1
+
+    return {"loc": len(code_lines), "comments": comment_lines, "functions": functions,
+            "fan_out": len(modules), "windows": _window_hashes(code_lines)}
+
+def _strip_brace_comments(lines):
+    """
+    Splits C-style sources into [(line number, code)] with comments removed,
+    and a comment-line count.
+    """
+    code, comments, in_block = [], 0, False
+    for number, line in enumerate(lines, 1):
+        stripped, had_comment = "", in_block
+        i = 0
+        while i < len(line):
+            if in_block:
+                end = line.find("*/", i)
+                if end < 0:
+                    i = len(line)
+                else:
+                    in_block, i = False, end + 2
+            elif line.startswith("/*", i):
+                in_block, had_comment, i = True, True, i + 2
+            elif line.startswith("//", i):
+                had_comment = True
+                break
+            else:
+                stripped += line[i]
+                i += 1
+        if had_comment:
+            comments += 1
+        if stripped.strip():
+            code.append((number, stripped))
+    return code, comments
+
+def brace_metrics(text, import_re):
+    """
+    Line-based metrics for C++, JavaScript and CSS: functions are found by a
+    '(...) {' header and measured up to their matching brace.
+    """
+    code, comments = _strip_brace_comments(text.splitlines())
+    functions, modules, stack, depth = [], set(), [], 0
+    for number, line in code:
+        match = import_re.match(line)
+        if match:
+            modules.add(next(group for group in match.groups() if group))
+        header = BRACE_FUNCTION_RE.search(line)
+        name = None
+        if header:
+            words = re.findall(r"[A-Za-z_~][\w:~]*", line[:header.start() + header.group(0).index("(")])
+            name = words[-1] if words else "<anonymous>"
+            if name.split("::")[-1] in BRACE_KEYWORDS:
+                name = None
+        for open_func in stack:
+            open_func["complexity"] += len(BRACE_DECISION_RE.findall(line))
+        for position, char in enumerate(line):
+            if char == "{":
+                depth += 1
+                if name is not None and position == header.end() - 1:
+                    # Decisions on the header line itself belong to the new function
+                    complexity = 1 + len(BRACE_DECISION_RE.findall(line[header.end():]))
+                    stack.append({"name": name, "line": number, "depth": depth, "complexity": complexity, "nesting": 0})
+                    name = None
+                for open_func in stack:
+                    open_func["nesting"] = max(open_func["nesting"], depth - open_func["depth"])
+            elif char == "}":
+                if stack and stack[-1]["depth"] == depth:
+                    func = stack.pop()
+                    functions.append(_function_metrics(func["name"], func["line"], number - func["line"] + 1,
+                                                       func["complexity"], func["nesting"]))
+                depth = max(0, depth - 1)
+    return {"loc": len(code), "comments": comments, "functions": functions,
+            "fan_out": len(modules), "windows": _window_hashes([line for _, line in code])}
+
+class DepthParser(HTMLParser):
+    VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+
+    def __init__(self):
+        super().__init__()
+        self.depth = 0
+        self.max_depth = 0
+        self.assets = set()
+        self.comments = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "script" and attrs.get("src"):
+            self.assets.add(attrs["src"])
+        elif tag == "link" and attrs.get("href"):
+            self.assets.add(attrs["href"])
+        if tag not in self.VOID:
+            self.depth += 1
+            self.max_depth = max(self.max_depth, self.depth)
+
+    def handle_endtag(self, tag):
+        if tag not in self.VOID:
+            self.depth = max(0, self.depth - 1)
+
+    def handle_comment(self, data):
+        self.comments += data.count("\n") + 1
+
+def html_metrics(text):
+    parser = DepthParser()
+    parser.feed(text)
+    parser.close()
+    code = [line for line in text.splitlines() if line.strip()]
+    return {"loc": len(code), "comments": parser.comments, "functions": [], "fan_out": len(parser.assets),
+            "nesting": parser.max_depth, "windows": _window_hashes(code)}
+
+def file_metrics(name, raw):
+    """
+    Metrics for one file's bytes; the kind is picked from the extension.
+    """
+    text = raw.decode("utf-8", errors="replace")
+    ext = os.path.splitext(name)[1].lower()
+    if ext == ".py":
+        return python_metrics(text)
+    if ext in (".html", ".htm"):
+        return html_metrics(text)
+    if ext == ".js":
+        return brace_metrics(text, JS_IMPORT_RE)
+    if ext == ".css":
+        return brace_metrics(text, CSS_IMPORT_RE)
+    return brace_metrics(text, CPP_INCLUDE_RE)
+
+def _load_cache():
+    try:
+        with open(state_path(METRICS_CACHE_FILE), "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if cache.get("version") == METRICS_VERSION else {"version": METRICS_VERSION, "entries": {}}
+    except (OSError, ValueError, AttributeError):
+        return {"version": METRICS_VERSION, "entries": {}}
+
+def _save_cache(cache):
+    entries = cache["entries"]
+    while len(entries) > METRICS_CACHE_MAX_ENTRIES:
+        del entries[next(iter(entries))]
+    try:
+        with open(state_path(METRICS_CACHE_FILE), "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+    except OSError:
+        pass
+
+def summarize_metrics(rel, metrics, duplicated_lines=0):
+    """
+    Flattens one file's metrics into a table row.
+    """
+    functions = metrics.get("functions", [])
+    loc = metrics.get("loc", 0)
+    complexities = [f["complexity"] for f in functions]
+    return {
+        "file": rel,
+        "error": metrics.get("error"),
+        "loc": loc,
+        "comment_ratio": 100.0 * metrics.get("comments", 0) / max(1, loc + metrics.get("comments", 0)),
+        "functions": len(functions),
+        "max_complexity": max(complexities, default=0),
+        "avg_complexity": sum(complexities) / len(complexities) if complexities else 0.0,
+        "max_function_length": max((f["length"] for f in functions), default=0),
+        "max_nesting": max([f["nesting"] for f in functions] + [metrics.get("nesting", 0)]),
+        "duplication": 100.0 * duplicated_lines / max(1, loc),
+        "fan_out": metrics.get("fan_out", 0),
+        "worst_function": max(functions, key=lambda f: f["complexity"])["name"] if functions else None,
+    }
+
+def compute_app_metrics(app_path, use_cache=True):
+    """
+    Per-file metrics for an app, as a list of row dicts (see summarize_metrics).
+    Raw metrics are cached by content hash, so unchanged files are not re-parsed;
+    duplication is computed across the whole app from cached line-window hashes.
+    """
+    base = app_root(app_path)
+    cache = _load_cache() if use_cache else {"version": METRICS_VERSION, "entries": {}}
+    entries, dirty = cache["entries"], False
+
+    per_file = []
+    for path in iter_app_files(base, METRICS_EXTENSIONS):
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+        except OSError as e:
+            per_file.append((os.path.relpath(path, base), {"error": f"Could not read file: {e}"}))
+            continue
+        key = f"{os.path.splitext(path)[1].lower()}:{hashlib.sha256(raw).hexdigest()}"
+        if key not in entries:
+            entries[key] = file_metrics(path, raw)
+            dirty = True
+        per_file.append((os.path.relpath(path, base), entries[key]))
+    if use_cache and dirty:
+        _save_cache(cache)
+
+    counts = {}
+    for _, metrics in per_file:
+        for digest in metrics.get("windows", []):
+            counts[digest] = counts.get(digest, 0) + 1
+    rows = []
+    for rel, metrics in per_file:
+        covered = set()
+        for start, digest in enumerate(metrics.get("windows", [])):
+            if counts[digest] > 1:
+                covered.update(range(start, start + DUPLICATE_WINDOW))
+        rows.append(summarize_metrics(rel, metrics, len(covered)))
+    return rows
+
+def metrics_digest(rows):
+    """
+    Compact plain-text form of the metrics, used as context for a Copilot review.
+    """
+    lines = ["file | loc | comment% | functions | max CC | avg CC | max fn length | max nesting | dup% | imports"]
+    for row in rows:
+        if row["error"]:
+            lines.append(f"{row['file']} | {row['error']}")
+            continue
+        lines.append(
+            f"{row['file']} | {row['loc']} | {row['comment_ratio']:.0f} | {row['functions']} | {row['max_complexity']} | "
+            f"{row['avg_complexity']:.1f} | {row['max_function_length']} | {row['max_nesting']} | "
+            f"{row['duplication']:.0f} | {row['fan_out']}"
+        )
+    return "\n".join(lines)
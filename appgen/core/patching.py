@@ -0,0 +1,204 @@
+import os
+import re
+from appgen.utils.filesystem import iter_app_files
+
+HUNK_HEADER_RE = re.compile(r"^@@(?: -(\d+)(?:,\d+)? \+\d+(?:,\d+)? )?\s*@@")
+# Context lines that may be dropped from either end of a hunk when it does not apply cleanly
+DEFAULT_FUZZ = 2
+
+class PatchError(Exception):
+    pass
+
+def _strip_prefix(path):
+    path = path.split("\t")[0].strip()
+    if path == "/dev/null":
+        return None
+    if path.startswith(("a/", "b/")):
+        path = path[2:]
+    return path
+
+def looks_like_diff(text):
+    return any(HUNK_HEADER_RE.match(line) for line in text.splitlines())
+
+def parse_unified_diff(text, default_path=None):
+    """
+    Parses unified diff text into [{"old_path", "new_path", "hunks"}].
+
+    Line counts in hunk headers are ignored, since generated diffs often get
+    them wrong; a hunk runs until the next hunk or file header.
+    A diff without ---/+++ headers applies to `default_path`.
+    """
+    patches, current, hunk = [], None, None
+    lines = text.splitlines()
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ "):
+            current = {"old_path": _strip_prefix(line[4:]), "new_path": _strip_prefix(lines[i + 1][4:]), "hunks": []}
+            patches.append(current)
+            hunk = None
+            i += 2
+            continue
+        match = HUNK_HEADER_RE.match(line)
+        if match:
+            if current is None:
+                current = {"old_path": default_path, "new_path": default_path, "hunks": []}
+                patches.append(current)
+            hunk = {"old_start": int(match.group(1) or 1), "lines": []}
+            current["hunks"].append(hunk)
+        elif hunk is not None:
+            if line.startswith(("+", "-", " ")):
+                hunk["lines"].append((line[0], line[1:]))
+            elif line == "":
+                # Editors and extractors drop the space of empty context lines
+                hunk["lines"].append((" ", ""))
+            elif line.startswith("\\"):
+                pass  # "\ No newline at end of file"
+            elif not line.startswith(("diff ", "index ")):
+                hunk = None
+        i += 1
+
+    for patch in patches:
+        for h in patch["hunks"]:
+            while h["lines"] and h["lines"][-1] == (" ", ""):
+                h["lines"].pop()
+        patch["hunks"] = [h for h in patch["hunks"] if any(tag != " " for tag, _ in h["lines"])]
+        if not (patch["old_path"] or patch["new_path"]):
+            raise PatchError("Diff does not name the file it changes.")
+    return [p for p in patches if p["hunks"]]
+
+def _find_block(lines, block, expected, lo, normalize):
+    """
+    Index where `block` occurs in lines[lo:], closest to `expected`, or None.
+    """
+    if not block:
+        return max(lo, min(expected, len(lines)))
+    norm_lines = [normalize(l) for l in lines]
+    norm_block = [normalize(l) for l in block]
+    size = len(block)
+    candidates = [
+        start for start in range(lo, len(lines) - size + 1)
+        if norm_lines[start] == norm_block[0] and norm_lines[start:start + size] == norm_block
+    ]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda start: abs(start - expected))
+
+def _normalizers():
+    yield lambda line: line
+    yield lambda line: line.rstrip()
+    yield lambda line: " ".join(line.split())
+
+def apply_hunks(text, hunks, fuzz=DEFAULT_FUZZ, path="file"):
+    """
+    Applies parsed hunks to text. Each hunk is located near its expected line,
+    tolerating moved code, whitespace differences and up to `fuzz` mismatched
+    context lines at either end. Raises PatchError on a conflict.
+    """
+    lines = text.splitlines()
+    trailing_newline = text.endswith("\n") or not text
+    offset, lo = 0, 0
+    for number, hunk in enumerate(hunks, 1):
+        body = hunk["lines"]
+        placed = None
+        for trim in range(fuzz + 1):
+            head = min(trim, _leading_context(body))
+            tail = min(trim, _trailing_context(body))
+            trimmed = body[head:len(body) - tail]
+            before = [l for tag, l in trimmed if tag != "+"]
+            after = [l for tag, l in trimmed if tag != "-"]
+            expected = max(0, hunk["old_start"] - 1 + offset + head)
+            for normalize in _normalizers():
+                start = _find_block(lines, before, expected, lo, normalize)
+                if start is not None:
+                    placed = (start, before, after)
+                    break
+            if placed:
+                break
+        if not placed:
+            raise PatchError(f"{path}: hunk {number} does not match the current code (conflict).")
+        start, before, after = placed
+        lines[start:start + len(before)] = after
+        offset += len(after) - len(before)
+        # Later hunks may not rewrite what an earlier hunk produced
+        lo = start + len(after)
+    return "\n".join(lines) + ("\n" if trailing_newline and lines else "")
+
+def _leading_context(body):
+    count = 0
+    for tag, _ in body:
+        if tag != " ":
+            break
+        count += 1
+    return count
+
+def _trailing_context(body):
+    count = 0
+    for tag, _ in reversed(body):
+        if tag != " ":
+            break
+        count += 1
+    return count
+
+def _safe_join(app_dir, rel, resolve=True):
+    full = os.path.abspath(os.path.join(app_dir, rel))
+    root = os.path.abspath(app_dir)
+    if os.path.commonpath([full, root]) != root:
+        raise PatchError(f"{rel}: path points outside the app folder.")
+    if resolve and not os.path.exists(full):
+        # Diffs sometimes drop the folder part; accept a unique file name match
+        matches = [p for p in iter_app_files(root) if os.path.basename(p) == os.path.basename(rel)]
+        if len(matches) == 1:
+            return os.path.abspath(matches[0])
+    return full
+
+def plan_patches(app_dir, patches, fuzz=DEFAULT_FUZZ):
+    """
+    Applies every patch in memory and returns {path: new_text or None (delete)}.
+    Nothing is written, so a conflict in any file leaves the app untouched.
+    """
+    planned = {}
+    for patch in patches:
+        target = patch["new_path"] or patch["old_path"]
+        full = _safe_join(app_dir, target, resolve=patch["old_path"] is not None)
+        if patch["new_path"] is None:
+            planned[_safe_join(app_dir, patch["old_path"])] = None
+            continue
+        source_path = _safe_join(app_dir, patch["old_path"]) if patch["old_path"] else None
+        if source_path in planned:
+            original = planned[source_path] or ""
+        elif source_path and os.path.exists(source_path):
+            with open(source_path, "r", encoding="utf-8") as f:
+                original = f.read()
+        elif patch["old_path"] is None:
+            original = ""
+        else:
+            raise PatchError(f"{patch['old_path']}: file does not exist.")
+        planned[full] = apply_hunks(original, patch["hunks"], fuzz, target)
+        if source_path and source_path != full:
+            planned[source_path] = None
+    return planned
+
+def write_planned(planned):
+    changed = []
+    for path, text in planned.items():
+        if text is None:
+            if os.path.exists(path):
+                os.remove(path)
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        changed.append(path)
+    return changed
+
+def patches_from_blocks(blocks, default_path=None):
+    """
+    Collects unified diffs from extracted code blocks (```diff or any block
+    containing hunks). Returns [] when the response contains no diffs.
+    """
+    patches = []
+    for block in blocks:
+        if block["language"].lower() in ("diff", "patch") or looks_like_diff(block["code"]):
+            patches.extend(parse_unified_diff(block["code"], block["filename"] or default_path))
+    return patches
@@ -0,0 +1,165 @@
+import asyncio
+import contextvars
+import time
+from appgen.core.cache import response_cache, cache_enabled
+from appgen.core.copilot import CopilotError
+from appgen.core.engine import default_engine
+
+STAGE_RETRIES = 2
+
+# True while a stage is rerunning after a failure; each stage runs in its own
+# task, so concurrent stages each see their own value
+_retrying = contextvars.ContextVar("pipeline_retrying", default=False)
+
+class Stage:
+    """
+    One node of a pipeline. `run(pipeline, inputs)` is a coroutine function
+    receiving the outputs of its dependencies by stage name; it may add new
+    stages to the pipeline (e.g. one per planned file). Optional stages may
+    fail without blocking their dependents, which then get None as input.
+    """
+
+    def __init__(self, name, run, deps=(), retries=STAGE_RETRIES, optional=False, label=None):
+        self.name = name
+        self.run = run
+        self.deps = list(deps)
+        self.retries = retries
+        self.optional = optional
+        self.label = label or name
+        self.status = "pending"
+        self.output = None
+        self.error = None
+        self.attempts = 0
+        self.seconds = 0.0
+        self.started_at = None
+        self.finished_at = None
+
+class Pipeline:
+    """
+    Runs stages as a dependency graph: every stage whose dependencies are
+    finished runs concurrently with the others (Copilot calls are bounded by
+    the engine's concurrency limit). Failed stages are retried on the spot;
+    calling run() again afterwards only reruns what failed or was blocked,
+    reusing every finished output.
+    """
+
+    def __init__(self, engine=None, use_cache=True):
+        self.engine = engine or default_engine
+        self.use_cache = use_cache and cache_enabled()
+        self.stages = {}
+        self.started = None
+        self.wall_seconds = 0.0
+
+    def add(self, stage):
+        if stage.name in self.stages:
+            raise ValueError(f"Duplicate stage '{stage.name}'")
+        self.stages[stage.name] = stage
+        return stage
+
+    async def ask(self, prompt):
+        """
+        One Copilot call through the shared engine and response cache. A stage
+        being retried skips the cached answer, which may be what made it fail,
+        and replaces it with the fresh one.
+        """
+        if self.use_cache and not _retrying.get():
+            cached = response_cache.get(prompt)
+            if cached is not None:
+                return cached
+        output = await self.engine.run(prompt)
+        if self.use_cache:
+            response_cache.put(prompt, output)
+        return output
+
+    def _resolved(self, dep):
+        stage = self.stages.get(dep)
+        if stage is None:
+            return False
+        return stage.status == "done" or (stage.optional and stage.status in ("failed", "skipped"))
+
+    def _blocked(self, stage):
+        for dep in stage.deps:
+            upstream = self.stages.get(dep)
+            if upstream is not None and upstream.status in ("failed", "skipped") and not upstream.optional:
+                return True
+        return False
+
+    async def _execute(self, stage, on_event):
+        stage.started_at = time.perf_counter() - self.started
+        inputs = {dep: self.stages[dep].output for dep in stage.deps}
+        for attempt in range(stage.retries + 1):
+            stage.attempts += 1
+            _retrying.set(stage.attempts > 1)
+            started = time.perf_counter()
+            try:
+                stage.output = await stage.run(self, inputs)
+                stage.seconds += time.perf_counter() - started
+                stage.status, stage.error = "done", None
+                break
+            except asyncio.CancelledError:
+                stage.seconds += time.perf_counter() - started
+                stage.status, stage.error = "failed", "cancelled"
+                raise
+            except Exception as e:
+                stage.seconds += time.perf_counter() - started
+                stage.error = str(e) or e.__class__.__name__
+                if attempt < stage.retries:
+                    on_event(stage, "retry")
+                else:
+                    stage.status = "failed"
+        stage.finished_at = time.perf_counter() - self.started
+        on_event(stage, stage.status)
+
+    async def run_async(self, on_event=None):
+        on_event = on_event or (lambda stage, event: None)
+        for stage in self.stages.values():
+            if stage.status in ("failed", "skipped"):
+                stage.status = "pending"
+        self.started = time.perf_counter()
+        running = {}
+        while True:
+            # Stages downstream of a required failure can never run
+            changed = True
+            while changed:
+                changed = False
+                for stage in list(self.stages.values()):
+                    if stage.status == "pending" and self._blocked(stage):
+                        stage.status = "skipped"
+                        on_event(stage, "skipped")
+                        changed = True
+
+            for stage in list(self.stages.values()):
+                if stage.status == "pending" and all(self._resolved(dep) for dep in stage.deps):
+                    stage.status = "running"
+                    task = asyncio.ensure_future(self._execute(stage, on_event))
+                    running[task] = stage
+                    on_event(stage, "start")
+
+            if not running:
+                for stage in self.stages.values():
+                    if stage.status == "pending":
+                        stage.status, stage.error = "skipped", "missing dependency"
+                        on_event(stage, "skipped")
+                break
+            done, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                running.pop(task)
+                task.result()
+        self.wall_seconds = time.perf_counter() - self.started
+        return self.ok
+
+    def run(self, on_event=None):
+        return asyncio.run(self.run_async(on_event))
+
+    @property
+    def ok(self):
+        return all(s.status == "done" or (s.optional and s.status in ("failed", "skipped")) for s in self.stages.values())
+
+    def failed(self):
+        return [s for s in self.stages.values() if s.status in ("failed", "skipped")]
+
+    def output(self, name):
+        stage = self.stages.get(name)
+        if stage is None or stage.status != "done":
+            raise CopilotError(f"Stage '{name}' did not finish")
+        return stage.output
@@ -1,26 +1,165 @@
-
 import json
 import os
+import sqlite3
+import threading
 import uuid
 import datetime
+from appgen.utils.tracing import span
 
 APPS_REGISTRY_FILE = "apps_registry.json"
+APPS_REGISTRY_DB = "apps_registry.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS apps (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    description TEXT,
+    language TEXT,
+    path TEXT,
+    features TEXT,
+    metadata TEXT,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_apps_name ON apps(name);
+CREATE INDEX IF NOT EXISTS idx_apps_language ON apps(language);
+CREATE INDEX IF NOT EXISTS idx_apps_created_at ON apps(created_at);
+"""
+
+COLUMNS = ("id", "name", "description", "language", "path", "features", "metadata", "created_at")
+JSON_COLUMNS = ("features", "metadata")
+
+_connection = None
+_connection_path = None
+_lock = threading.RLock()
+_listeners = []
+
+def add_registry_listener(callback):
+    """
+    Registers callback(action, app) to hear about "add", "update", "delete" and "reset".
+    """
+    _listeners.append(callback)
+
+def _notify(action, app):
+    for callback in list(_listeners):
+        callback(action, app)
+
+def get_connection():
+    """
+    Returns the shared registry connection, creating the database and
+    migrating a legacy apps_registry.json on first use.
+    """
+    global _connection, _connection_path
+    with _lock:
+        db_path = os.path.abspath(APPS_REGISTRY_DB)
+        if _connection is not None and _connection_path == db_path:
+            return _connection
+        if _connection is not None:
+            _connection.close()
+
+        conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        _migrate_json(conn)
+        _connection, _connection_path = conn, db_path
+        return conn
+
+def legacy_app_id(entry):
+    """
+    Id for a legacy entry that has none. Derived from fields that never change,
+    so every process migrating the same file assigns the same id.
+    """
+    fields = [entry.get("name"), entry.get("path"), entry.get("created_at")]
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, "prompt2app:" + json.dumps(fields)))
+
+def _migrate_json(conn):
+    if not os.path.exists(APPS_REGISTRY_FILE):
+        return
+    try:
+        with open(APPS_REGISTRY_FILE, "r") as f:
+            legacy = json.load(f)
+    except (OSError, ValueError):
+        return
+    if not isinstance(legacy, list):
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for entry in legacy:
+            entry = dict(entry)
+            entry.setdefault("id", legacy_app_id(entry))
+            conn.execute(
+                f"INSERT OR IGNORE INTO apps ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                _to_row(entry)
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    # Keep the original file around, but never import it twice
+    try:
+        os.replace(APPS_REGISTRY_FILE, APPS_REGISTRY_FILE + ".migrated")
+    except OSError:
+        pass
+
+def _to_row(entry):
+    row = []
+    for column in COLUMNS:
+        value = entry.get(column)
+        if column in JSON_COLUMNS:
+            value = json.dumps(value or ([] if column == "features" else {}))
+        row.append(value)
+    return row
+
+def _from_row(row):
+    entry = {column: row[column] for column in COLUMNS}
+    for column in JSON_COLUMNS:
+        try:
+            entry[column] = json.loads(entry[column]) if entry[column] else ([] if column == "features" else {})
+        except ValueError:
+            entry[column] = [] if column == "features" else {}
+    return entry
+
+def _query(sql, params=()):
+    with _lock:
+        return get_connection().execute(sql, params).fetchall()
+
+def _execute(sql, params=()):
+    with _lock:
+        return get_connection().execute(sql, params).rowcount
 
 def load_apps_registry():
-    if os.path.exists(APPS_REGISTRY_FILE):
+    with span("registry.load") as attrs:
         try:
-            with open(APPS_REGISTRY_FILE, "r") as f:
-                return json.load(f)
-        except:
+            apps = [_from_row(row) for row in _query(f"SELECT {', '.join(COLUMNS)} FROM apps ORDER BY seq")]
+        except sqlite3.Error:
+            attrs["outcome"] = "error"
             return []
-    return []
+        attrs["apps"] = len(apps)
+        return apps
 
 def save_apps_registry(registry):
-    with open(APPS_REGISTRY_FILE, "w") as f:
-        json.dump(registry, f, indent=4)
+    """
+    Replaces the whole registry. Prefer add/update/delete for single entries.
+    """
+    with _lock:
+        conn = get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM apps")
+            conn.executemany(
+                f"INSERT INTO apps ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                [_to_row(entry) for entry in registry]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    _notify("reset", None)
 
 def add_app_to_registry(name, description, language, path, features=None, metadata=None):
-    registry = load_apps_registry()
     app_entry = {
         "id": str(uuid.uuid4()),
         "name": name,
@@ -31,5 +170,54 @@ def add_app_to_registry(name, description, language, path, features=None, metada
         "metadata": metadata or {},
         "created_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
-    registry.append(app_entry)
-    save_apps_registry(registry)
+    _execute(
+        f"INSERT INTO apps ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+        _to_row(app_entry)
+    )
+    _notify("add", app_entry)
+    return app_entry
+
+def get_app(app_id):
+    rows = _query(f"SELECT {', '.join(COLUMNS)} FROM apps WHERE id = ?", (app_id,))
+    return _from_row(rows[0]) if rows else None
+
+def find_apps(name=None, language=None, limit=None):
+    clauses, params = [], []
+    if name is not None:
+        clauses.append("name = ?")
+        params.append(name)
+    if language is not None:
+        clauses.append("language = ?")
+        params.append(language)
+    sql = f"SELECT {', '.join(COLUMNS)} FROM apps"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY created_at DESC"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    return [_from_row(row) for row in _query(sql, params)]
+
+def update_app_in_registry(app_id, **fields):
+    fields = {k: v for k, v in fields.items() if k in COLUMNS and k != "id"}
+    if not fields:
+        return False
+    if "path" in fields:
+        fields["path"] = os.path.abspath(fields["path"])
+    assignments = ", ".join(f"{column} = ?" for column in fields)
+    values = [json.dumps(v) if k in JSON_COLUMNS else v for k, v in fields.items()]
+    updated = _execute(f"UPDATE apps SET {assignments} WHERE id = ?", values + [app_id]) > 0
+    if updated:
+        _notify("update", get_app(app_id))
+    return updated
+
+def delete_app_from_registry(app_id):
+    deleted = _execute("DELETE FROM apps WHERE id = ?", (app_id,)) > 0
+    if deleted:
+        _notify("delete", {"id": app_id})
+    return deleted
+
+def count_apps():
+    try:
+        return _query("SELECT COUNT(*) FROM apps")[0][0]
+    except sqlite3.Error:
+        return 0
@@ -1,30 +1,70 @@
-
-import os
 from rich.panel import Panel
 from rich.markdown import Markdown
+from rich.markup import escape
+from rich.prompt import Confirm
+from rich.table import Table
 from appgen.core.copilot import call_copilot
+from appgen.core.context import build_context
+from appgen.core.metrics import THRESHOLDS, compute_app_metrics, metrics_digest
 from appgen.utils.console import console
 
+def _styled(value, key, text=None):
+    text = text if text is not None else str(value)
+    warn, bad = THRESHOLDS[key]
+    if value > bad:
+        return f"[red]{text}[/red]"
+    if value > warn:
+        return f"[yellow]{text}[/yellow]"
+    return text
+
+def show_metrics_table(rows):
+    table = Table(title="Code Metrics", show_header=True, header_style="bold magenta")
+    table.add_column("File", style="cyan")
+    table.add_column("LOC", justify="right")
+    table.add_column("Comments %", justify="right")
+    table.add_column("Funcs", justify="right")
+    table.add_column("Max CC", justify="right")
+    table.add_column("Avg CC", justify="right")
+    table.add_column("Max Len", justify="right")
+    table.add_column("Nesting", justify="right")
+    table.add_column("Dup %", justify="right")
+    table.add_column("Imports", justify="right")
+    for row in rows:
+        if row["error"]:
+            table.add_row(escape(row["file"]), f"[red]{escape(row['error'])}[/red]", *[""] * 8)
+            continue
+        table.add_row(
+            escape(row["file"]), str(row["loc"]), f"{row['comment_ratio']:.0f}", str(row["functions"]),
+            _styled(row["max_complexity"], "max_complexity"), f"{row['avg_complexity']:.1f}",
+            _styled(row["max_function_length"], "max_function_length"), _styled(row["max_nesting"], "max_nesting"),
+            _styled(row["duplication"], "duplication", f"{row['duplication']:.0f}"), _styled(row["fan_out"], "fan_out"),
+        )
+    console.print(table)
+
 def score_app_code(app_path, language):
+    """
+    Shows local, deterministic metrics right away; the Copilot review is an
+    optional second pass that gets the metrics as context.
+    """
     try:
-        # Determine code content
-        code_snippet = ""
-        if os.path.isdir(app_path):
-             files = [f for f in os.listdir(app_path) if f.endswith(('.py', '.cpp', '.html', '.js', '.css'))]
-             for f in files[:2]:
-                 with open(os.path.join(app_path, f), 'r', encoding='utf-8') as fh:
-                     code_snippet += f"\n--- {f} ---\n{fh.read()[:1000]}"
-        else:
-            with open(app_path, 'r', encoding='utf-8') as f:
-                code_snippet = f.read()[:2000]
+        rows = compute_app_metrics(app_path)
+        if not rows:
+            console.print("[yellow]No source files to measure.[/yellow]")
+            return
+        show_metrics_table(rows)
 
+        if not Confirm.ask("Ask Copilot for a review based on these metrics?", default=False):
+            return
+        code_snippet = build_context(app_path)
         prompt = (
             f"Review this {language} code. "
             "Provide a score from 1-10 for: 1. Readability 2. Security 3. Performance. "
-            "Briefly explain each score."
+            "Briefly explain each score. Locally measured metrics are given below (CC is cyclomatic complexity); "
+            "use them instead of estimating size or complexity yourself."
+            f"\n\nMetrics:\n{metrics_digest(rows)}"
             f"\n\nCode:\n{code_snippet}"
         )
-        
+
         review = call_copilot(prompt, "Scoring Code Quality...")
         console.print(Panel(Markdown(review or "No review generated."), title="Code Quality Score", border_style="magenta"))
 
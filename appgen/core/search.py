@@ -0,0 +1,203 @@
+import bisect
+import datetime
+import math
+import re
+import threading
+from collections import defaultdict
+
+TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+# Relative importance of each field when ranking matches
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "language": 2.0,
+    "description": 1.5,
+    "query": 1.5,
+    "features": 1.0,
+}
+FUZZY_THRESHOLD = 0.4
+RECENCY_WEIGHT = 1.0
+RECENCY_HALF_LIFE_DAYS = 30.0
+
+def tokenize(text):
+    return TOKEN_RE.findall(str(text or "").lower())
+
+def trigrams(token):
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def app_fields(app):
+    meta = app.get("metadata") or {}
+    return {
+        "name": app.get("name", ""),
+        "language": app.get("language", ""),
+        "description": app.get("description", ""),
+        "query": meta.get("query", "") if isinstance(meta, dict) else "",
+        "features": " ".join(app.get("features") or []),
+    }
+
+def _parse_created(value):
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return datetime.datetime.min
+
+class AppSearchIndex:
+    """
+    In-memory inverted index over registry entries.
+
+    Token postings give exact and prefix matches (so partially typed words
+    already match); a trigram index over the vocabulary adds typo tolerance.
+    Entries are added and removed incrementally.
+    """
+
+    def __init__(self, apps=()):
+        self._apps = {}
+        self._created = {}
+        self._postings = defaultdict(dict)
+        self._doc_tokens = {}
+        self._token_trigrams = defaultdict(set)
+        self._vocab = []
+        self._vocab_dirty = False
+        self._lock = threading.RLock()
+        for app in apps:
+            self.add(app)
+
+    def __len__(self):
+        return len(self._apps)
+
+    def add(self, app):
+        with self._lock:
+            app_id = app["id"]
+            if app_id in self._apps:
+                self.remove(app_id)
+            weights = {}
+            for field, text in app_fields(app).items():
+                for token in tokenize(text):
+                    weights[token] = max(weights.get(token, 0.0), FIELD_WEIGHTS[field])
+            for token, weight in weights.items():
+                if token not in self._postings:
+                    self._vocab_dirty = True
+                    for gram in trigrams(token):
+                        self._token_trigrams[gram].add(token)
+                self._postings[token][app_id] = weight
+            self._apps[app_id] = app
+            self._created[app_id] = _parse_created(app.get("created_at"))
+            self._doc_tokens[app_id] = set(weights)
+
+    def remove(self, app_id):
+        with self._lock:
+            for token in self._doc_tokens.pop(app_id, ()):
+                postings = self._postings.get(token)
+                if postings is None:
+                    continue
+                postings.pop(app_id, None)
+                if not postings:
+                    del self._postings[token]
+                    for gram in trigrams(token):
+                        self._token_trigrams[gram].discard(token)
+                    self._vocab_dirty = True
+            self._apps.pop(app_id, None)
+            self._created.pop(app_id, None)
+
+    def _prefix_matches(self, prefix):
+        if self._vocab_dirty:
+            self._vocab = sorted(self._postings)
+            self._vocab_dirty = False
+        start = bisect.bisect_left(self._vocab, prefix)
+        matches = []
+        for token in self._vocab[start:]:
+            if not token.startswith(prefix):
+                break
+            matches.append(token)
+        return matches
+
+    def _fuzzy_matches(self, token):
+        grams = trigrams(token)
+        shared = defaultdict(int)
+        for gram in grams:
+            for candidate in self._token_trigrams.get(gram, ()):
+                shared[candidate] += 1
+        matches = {}
+        for candidate, count in shared.items():
+            similarity = count / (len(grams) + len(trigrams(candidate)) - count)
+            if similarity >= FUZZY_THRESHOLD:
+                matches[candidate] = similarity
+        return matches
+
+    def _term_scores(self, token):
+        # Exact match scores 1.0, prefix 0.8 scaled by coverage, typo-level matches by similarity
+        similarities = {}
+        for candidate in self._prefix_matches(token):
+            similarities[candidate] = 1.0 if candidate == token else 0.8 * len(token) / len(candidate)
+        for candidate, similarity in self._fuzzy_matches(token).items():
+            similarities[candidate] = max(similarities.get(candidate, 0.0), 0.7 * similarity)
+
+        scores = {}
+        for candidate, similarity in similarities.items():
+            for app_id, weight in self._postings[candidate].items():
+                score = similarity * weight
+                if score > scores.get(app_id, 0.0):
+                    scores[app_id] = score
+        return scores
+
+    def _recency(self, app_id, now):
+        created = self._created.get(app_id, datetime.datetime.min)
+        if created == datetime.datetime.min:
+            return 0.0
+        age_days = max((now - created).total_seconds() / 86400.0, 0.0)
+        return math.pow(0.5, age_days / RECENCY_HALF_LIFE_DAYS)
+
+    def search(self, query="", limit=None, offset=0):
+        """
+        Returns matching apps ranked by relevance plus a recency boost.
+        Every query term must match; an empty query lists newest apps first.
+        """
+        with self._lock:
+            now = datetime.datetime.now()
+            terms = tokenize(query)
+            if not terms:
+                ranked = sorted(self._apps, key=lambda app_id: self._created[app_id], reverse=True)
+            else:
+                totals = None
+                for term in terms:
+                    scores = self._term_scores(term)
+                    if totals is None:
+                        totals = scores
+                    else:
+                        totals = {app_id: totals[app_id] + score for app_id, score in scores.items() if app_id in totals}
+                    if not totals:
+                        return []
+                ranked = sorted(
+                    totals,
+                    key=lambda app_id: totals[app_id] / len(terms) + RECENCY_WEIGHT * self._recency(app_id, now),
+                    reverse=True
+                )
+            end = None if limit is None else offset + limit
+            return [self._apps[app_id] for app_id in ranked[offset:end]]
+
+_index = None
+_index_lock = threading.Lock()
+
+def _on_registry_change(action, app):
+    global _index
+    if action == "reset":
+        from appgen.core.registry import load_apps_registry
+        _index = AppSearchIndex(load_apps_registry())
+    elif action == "delete":
+        _index.remove(app["id"])
+    else:
+        _index.add(app)
+
+def get_search_index():
+    """
+    Builds the shared index from the registry on first use and keeps it
+    current through registry change notifications.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            from appgen.core.registry import load_apps_registry, add_registry_listener
+            _index = AppSearchIndex(load_apps_registry())
+            add_registry_listener(_on_registry_change)
+        return _index
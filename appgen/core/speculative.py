@@ -0,0 +1,202 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from html.parser import HTMLParser
+from appgen.core.cache import response_cache, cache_enabled
+from appgen.core.copilot import build_suggestion_prompt
+from appgen.core.engine import default_engine
+from appgen.core.extractor import extract_code_blocks_with_filenames
+from appgen.runners.cpp_build import CXX
+from appgen.utils.health import analyze_python_source
+
+DEFAULT_CANDIDATES = int(os.environ.get("PROMPT2APP_CANDIDATES", "3"))
+# Each candidate is a full Copilot generation
+MAX_CANDIDATES = 8
+SYNTAX_CHECK_TIMEOUT = 30
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr", "!doctype"}
+# Elements whose end tag HTML lets authors omit
+OPTIONAL_END = {"p", "li", "dt", "dd", "tr", "td", "th", "thead", "tbody", "tfoot", "option", "optgroup", "colgroup", "html", "head", "body"}
+
+def candidate_prompt(base_prompt, index, count):
+    """
+    Candidates need different prompts, or Copilot (and the cache) would hand back the same answer.
+    """
+    if count == 1:
+        return base_prompt
+    return f"{base_prompt}\n\n(Candidate {index + 1} of {count}: write your own independent implementation.)"
+
+class WellFormedChecker(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.stack = []
+        self.problems = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in VOID_ELEMENTS:
+            self.stack.append((tag, self.getpos()[0]))
+
+    def handle_startendtag(self, tag, attrs):
+        pass
+
+    def handle_endtag(self, tag):
+        if tag in VOID_ELEMENTS:
+            return
+        open_tags = [name for name, _ in self.stack]
+        if tag not in open_tags:
+            self.problems.append(f"line {self.getpos()[0]}: stray </{tag}>")
+            return
+        while self.stack:
+            name, line = self.stack.pop()
+            if name == tag:
+                break
+            if name not in OPTIONAL_END:
+                self.problems.append(f"line {line}: <{name}> is never closed")
+
+def check_html(code):
+    checker = WellFormedChecker()
+    checker.feed(code)
+    checker.close()
+    problems = list(checker.problems)
+    problems.extend(f"line {line}: <{name}> is never closed" for name, line in checker.stack if name not in OPTIONAL_END)
+    return problems
+
+def check_python(code):
+    """
+    Returns (errors, warnings) for one Python source, from ast and the health rules.
+    """
+    findings = analyze_python_source(code)
+    errors = [f"line {f['line']}: {f['message']}" for f in findings if f["severity"] == "error"]
+    warnings = [f"line {f['line']}: {f['message']}" for f in findings if f["severity"] == "warning"]
+    return errors, warnings
+
+async def check_cpp(files):
+    """
+    Runs `g++ -fsyntax-only` over every .cpp file in a temporary copy of the
+    candidate. Returns (errors, available); available is False without a compiler.
+    """
+    if not shutil.which(CXX):
+        return [], False
+    errors = []
+    with tempfile.TemporaryDirectory(prefix="p2a_candidate_") as tmp:
+        for name, code in files.items():
+            path = os.path.join(tmp, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(code)
+        for name in files:
+            if not name.endswith((".cpp", ".cc", ".cxx")):
+                continue
+            proc = await asyncio.create_subprocess_exec(
+                CXX, "-fsyntax-only", "-std=c++17", f"-I{tmp}", os.path.join(tmp, name),
+                stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                _, stderr = await asyncio.wait_for(proc.communicate(), SYNTAX_CHECK_TIMEOUT)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                proc.kill()
+                await proc.wait()
+                raise
+            if proc.returncode != 0:
+                first = next((l for l in stderr.decode("utf-8", errors="replace").splitlines() if "error" in l), "compile error")
+                errors.append(f"{name}: {first.replace(tmp + os.sep, '')}")
+    return errors, True
+
+def _candidate_files(blocks, language):
+    default = {"python": ".py", "html": ".html", "c++": ".cpp"}.get(language.lower(), ".txt")
+    files = {}
+    for i, block in enumerate(blocks):
+        name = block["filename"]
+        if not name or os.path.isabs(name) or ".." in name:
+            lang = block["language"].lower()
+            ext = {"python": ".py", "py": ".py", "html": ".html", "cpp": ".cpp", "c++": ".cpp", "css": ".css", "javascript": ".js", "js": ".js"}.get(lang, default)
+            name = f"file_{i}{ext}"
+        files[name] = block["code"]
+    return files
+
+async def check_candidate(suggestion, language):
+    """
+    Cheap local checks of one generated answer. Returns a dict with
+    errors, warnings, a pass flag and a rank score (lower is better).
+    """
+    blocks = extract_code_blocks_with_filenames(suggestion)
+    if not blocks:
+        return {"passed": False, "errors": ["no code blocks"], "warnings": [], "score": 1000, "checked": False}
+
+    files = _candidate_files(blocks, language)
+    errors, warnings, checked = [], [], True
+    for name, code in files.items():
+        if name.endswith(".py"):
+            e, w = check_python(code)
+            errors += [f"{name} {m}" for m in e]
+            warnings += [f"{name} {m}" for m in w]
+        elif name.endswith((".html", ".htm")):
+            warnings += [f"{name} {m}" for m in check_html(code)]
+    if any(name.endswith((".cpp", ".cc", ".cxx")) for name in files):
+        cpp_errors, available = await check_cpp(files)
+        errors += cpp_errors
+        checked = checked and available
+
+    # Errors dominate; among equals, prefer fewer warnings, then more code files
+    score = len(errors) * 100 + len(warnings) * 5 - min(len(files), 5)
+    return {"passed": not errors, "errors": errors, "warnings": warnings, "score": score, "checked": checked}
+
+def clearly_passing(check):
+    return check["passed"] and check["checked"] and not check["warnings"]
+
+async def _generate(prompts, language, engine, use_cache, on_update):
+    results = [None] * len(prompts)
+
+    async def one(index):
+        started = time.perf_counter()
+        cached = response_cache.get(prompts[index]) if use_cache else None
+        suggestion = cached if cached is not None else await engine.run(prompts[index])
+        if use_cache and cached is None:
+            response_cache.put(prompts[index], suggestion)
+        latency = time.perf_counter() - started
+        check = await check_candidate(suggestion, language)
+        return {"index": index, "suggestion": suggestion, "check": check, "latency": latency, "status": "ok"}
+
+    tasks = {asyncio.ensure_future(one(i)): i for i in range(len(prompts))}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winner = False
+            for task in done:
+                index = tasks[task]
+                try:
+                    results[index] = task.result()
+                    winner = winner or clearly_passing(results[index]["check"])
+                except Exception as e:
+                    results[index] = {"index": index, "suggestion": None, "check": None, "latency": None, "status": f"failed: {e}"}
+                on_update(results[index])
+            if winner and pending:
+                # A clean candidate is good enough; stop paying for the rest
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                for task in pending:
+                    index = tasks[task]
+                    results[index] = {"index": index, "suggestion": None, "check": None, "latency": None, "status": "cancelled"}
+                    on_update(results[index])
+                pending = set()
+    finally:
+        for task in pending:
+            task.cancel()
+    return results
+
+def generate_candidates(query, language, color_scheme="default", complex_app=False, architecture="Standard", extras=None,
+                        count=DEFAULT_CANDIDATES, engine=None, use_cache=True, on_update=None):
+    """
+    Requests `count` candidate apps concurrently, checks each locally as it
+    arrives and cancels the rest once one passes cleanly. Returns all
+    candidates, best first; failed or cancelled ones come last.
+    """
+    base = build_suggestion_prompt(query, language, color_scheme, complex_app, architecture, extras)
+    prompts = [candidate_prompt(base, i, count) for i in range(count)]
+    results = asyncio.run(_generate(
+        prompts, language, engine or default_engine, use_cache and cache_enabled(), on_update or (lambda result: None)
+    ))
+    return sorted(results, key=lambda r: (r["check"] is None, r["check"]["score"] if r["check"] else 0, r["latency"] or 0))
@@ -0,0 +1,156 @@
+import datetime
+import hashlib
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from rich.table import Table
+from appgen.utils.console import console
+from appgen.utils.stats import summarize
+from appgen.runners.cpp_build import BUILD_DIR
+from appgen.utils.filesystem import app_root
+from appgen.runners.cpp_runner import compile_cpp_app
+
+BENCH_DIR = os.path.join(BUILD_DIR, "bench")
+BENCH_RUN_TIMEOUT = 60
+BENCH_HISTORY = 10
+
+def _run_once(exe_path, stdin_bytes, cwd, timeout):
+    """
+    Runs the binary once and returns (wall_seconds, max_rss_mb, returncode).
+    Max RSS comes from wait4 rusage, so it is per child and not process-wide;
+    platforms without waitid/wait4 report None.
+    """
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [exe_path], cwd=cwd,
+        stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    if not (hasattr(os, "waitid") and hasattr(os, "wait4")):
+        try:
+            proc.communicate(stdin_bytes, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        return time.perf_counter() - started, None, proc.returncode
+
+    # The pid stays reserved until it is reaped, so the timer may only signal
+    # it before the wait4 below: the timer is stopped and joined first
+    killer = threading.Timer(timeout, os.kill, (proc.pid, signal.SIGKILL))
+    killer.start()
+    try:
+        try:
+            proc.stdin.write(stdin_bytes)
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        # Wait for the exit without reaping the child
+        os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOWAIT)
+        wall = time.perf_counter() - started
+    finally:
+        killer.cancel()
+        killer.join()
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return wall, rss_mb, proc.returncode
+
+def _history_path(app_path):
+    key = hashlib.sha256(os.path.abspath(app_root(app_path)).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(BENCH_DIR, f"{key}.json")
+
+def load_history(app_path):
+    try:
+        with open(_history_path(app_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_history(app_path, history):
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    with open(_history_path(app_path), "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+
+def benchmark_cpp_app(file_path, profiles, runs=10, stdin_text="", warmup=1, timeout=BENCH_RUN_TIMEOUT):
+    """
+    Builds the app once per profile, then runs each binary `runs` times with the
+    same stdin and records wall time and max RSS distributions. Results are
+    appended to a per-app history so later runs can be compared with earlier ones.
+    """
+    stdin_bytes = stdin_text.encode("utf-8")
+    app_dir = app_root(file_path)
+    history = load_history(file_path)
+    results = {}
+
+    for profile in profiles:
+        report = compile_cpp_app(file_path, profile)
+        if not report["ok"]:
+            continue
+
+        walls, rss, failures = [], [], 0
+        with console.status(f"[cyan]Benchmarking {profile} ({runs} runs)...[/cyan]", spinner="dots"):
+            for _ in range(warmup):
+                _run_once(report["exe"], stdin_bytes, app_dir, timeout)
+            for _ in range(runs):
+                wall, rss_mb, returncode = _run_once(report["exe"], stdin_bytes, app_dir, timeout)
+                walls.append(wall * 1000)
+                if rss_mb is not None:
+                    rss.append(rss_mb)
+                if returncode != 0:
+                    failures += 1
+
+        results[profile] = {
+            "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "runs": runs,
+            "failures": failures,
+            "wall_ms": summarize(walls),
+            "max_rss_mb": summarize(rss),
+        }
+
+    previous = {profile: (history.get(profile) or [None])[-1] for profile in results}
+    for profile, result in results.items():
+        history.setdefault(profile, []).append(result)
+        history[profile] = history[profile][-BENCH_HISTORY:]
+    _save_history(file_path, history)
+    return results, previous
+
+def _fmt(value, digits=1):
+    return "-" if value is None else f"{value:.{digits}f}"
+
+def show_benchmark_results(results, previous):
+    if not results:
+        console.print("[red]No profile built successfully; nothing to benchmark.[/red]")
+        return
+
+    baseline_profile = "debug" if "debug" in results else next(iter(results))
+    baseline = results[baseline_profile]["wall_ms"]["p50"]
+
+    table = Table(title="C++ Benchmark", show_header=True, header_style="bold magenta")
+    table.add_column("Profile", style="cyan")
+    table.add_column("Mean ms", justify="right")
+    table.add_column("p50 ms", justify="right")
+    table.add_column("p95 ms", justify="right")
+    table.add_column("Max RSS p50 MB", justify="right")
+    table.add_column("Max RSS p95 MB", justify="right")
+    table.add_column(f"vs {baseline_profile}", justify="right", style="green")
+    table.add_column("vs last run", justify="right", style="yellow")
+
+    for profile, result in results.items():
+        wall, rss = result["wall_ms"], result["max_rss_mb"]
+        speedup = f"{baseline / wall['p50']:.2f}x" if baseline and wall["p50"] else "-"
+        before = previous.get(profile)
+        if before and before["wall_ms"]["p50"] and wall["p50"]:
+            change = (wall["p50"] - before["wall_ms"]["p50"]) / before["wall_ms"]["p50"] * 100
+            delta = f"{change:+.1f}%"
+        else:
+            delta = "new"
+        name = profile if not result["failures"] else f"{profile} ({result['failures']} failed)"
+        table.add_row(
+            name, _fmt(wall["mean"]), _fmt(wall["p50"]), _fmt(wall["p95"]),
+            _fmt(rss["p50"]), _fmt(rss["p95"]), speedup, delta
+        )
+    console.print(table)
@@ -0,0 +1,223 @@
+import functools
+import hashlib
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from appgen.utils.filesystem import STATE_DIR, app_root, iter_app_files
+from appgen.utils.tracing import span
+
+BUILD_DIR = os.path.join(STATE_DIR, "cpp_build")
+CXX = os.environ.get("CXX", "g++")
+SOURCE_EXTENSIONS = (".cpp", ".cc", ".cxx", ".c++")
+# Folder inside the app that receives its executables
+APP_BUILD_DIR = "build"
+
+# Compiler and linker flags per optimization profile
+BUILD_PROFILES = {
+    "debug": {"flags": ["-O0", "-g"], "link_flags": []},
+    "release": {"flags": ["-O2"], "link_flags": []},
+    "native": {"flags": ["-O3", "-march=native"], "link_flags": []},
+    "lto": {"flags": ["-O2", "-flto"], "link_flags": ["-flto"]},
+}
+DEFAULT_PROFILE = os.environ.get("PROMPT2APP_CPP_PROFILE", "release")
+
+INCLUDE_RE = re.compile(r'^\s*#\s*include\s*"([^"]+)"', re.MULTILINE)
+
+@functools.lru_cache(maxsize=None)
+def compiler_id(cxx=CXX):
+    """
+    First line of `cxx --version`, so a compiler upgrade invalidates cached objects.
+    """
+    try:
+        result = subprocess.run([cxx, "--version"], capture_output=True, text=True)
+        return result.stdout.splitlines()[0] if result.stdout else cxx
+    except OSError:
+        return cxx
+
+def _file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def local_headers(path, include_dirs, seen=None):
+    """
+    Recursively collects the project headers a file pulls in with #include "...".
+    System headers (<...>) are covered by the compiler id instead.
+    """
+    seen = set() if seen is None else seen
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            text = f.read()
+    except OSError:
+        return seen
+    for name in INCLUDE_RE.findall(text):
+        for base in [os.path.dirname(path), *include_dirs]:
+            candidate = os.path.normpath(os.path.join(base, name))
+            if os.path.isfile(candidate):
+                if candidate not in seen:
+                    seen.add(candidate)
+                    local_headers(candidate, include_dirs, seen)
+                break
+    return seen
+
+def translation_unit_key(source, rel, flags, include_dirs, cxx=CXX):
+    """
+    Cache key of one object file. The app-relative path is part of it, so two
+    sources with identical content never share (and overwrite) an object.
+    """
+    digest = hashlib.sha256()
+    digest.update(compiler_id(cxx).encode("utf-8"))
+    digest.update(rel.replace(os.sep, "/").encode("utf-8"))
+    digest.update("\0".join(flags).encode("utf-8"))
+    digest.update(_file_digest(source).encode("ascii"))
+    for header in sorted(local_headers(source, include_dirs)):
+        digest.update(os.path.basename(header).encode("utf-8"))
+        digest.update(_file_digest(header).encode("ascii"))
+    return digest.hexdigest()
+
+def executable_path(app_path, app_dir, profile=None):
+    """
+    Executables go to the app's build/ folder, which backups, exports and
+    context building all skip.
+    """
+    if os.path.isfile(app_path):
+        name = os.path.splitext(os.path.basename(app_path))[0]
+    else:
+        name = os.path.basename(os.path.normpath(app_dir))
+    stem = os.path.join(app_dir, APP_BUILD_DIR, name)
+    # The default profile keeps the plain name; other profiles get a suffix so they can coexist
+    if profile and profile != DEFAULT_PROFILE:
+        stem = f"{stem}_{profile}"
+    return stem + (".exe" if sys.platform == "win32" else "")
+
+def _compile(cxx, source, obj_path, flags, include_dirs):
+    started = time.perf_counter()
+    tmp_path = f"{obj_path}.{os.getpid()}.tmp"
+    cmd = [cxx, *flags, *[f"-I{d}" for d in include_dirs], "-c", source, "-o", tmp_path]
+    with span("cpp.compile", source=os.path.basename(source)) as attrs:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            attrs["outcome"] = "error"
+    if result.returncode == 0:
+        os.replace(tmp_path, obj_path)
+    elif os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    return source, result.returncode == 0, result.stderr, time.perf_counter() - started
+
+def build_cpp_app(app_path, flags=None, link_flags=None, jobs=None, cxx=CXX, exe_path=None):
+    """
+    Incrementally builds every C++ source of an app.
+
+    Each translation unit is cached as an object file keyed by its content, the
+    local headers it includes, the flags and the compiler version. Changed units
+    compile in parallel, then everything is linked (linking is skipped when no
+    input changed). Returns a dict describing the build.
+    """
+    flags = list(flags or [])
+    link_flags = list(link_flags or [])
+    app_dir = app_root(app_path)
+    include_dirs = [app_dir]
+    sources = list(iter_app_files(app_dir, SOURCE_EXTENSIONS)) if os.path.isdir(app_dir) else [app_path]
+    if not sources:
+        sources = [os.path.abspath(app_path)]
+
+    obj_dir = os.path.join(BUILD_DIR, "objects")
+    os.makedirs(obj_dir, exist_ok=True)
+    exe_path = exe_path or executable_path(app_path, app_dir)
+    os.makedirs(os.path.dirname(os.path.abspath(exe_path)), exist_ok=True)
+
+    report = {
+        "exe": exe_path,
+        "ok": False,
+        "sources": len(sources),
+        "hits": 0,
+        "compiled": [],
+        "compile_times": {},
+        "compile_seconds": 0.0,
+        "link_seconds": 0.0,
+        "linked": False,
+        "errors": "",
+    }
+
+    objects, todo = [], []
+    for source in sources:
+        key = translation_unit_key(source, os.path.relpath(source, app_dir), flags, include_dirs, cxx)
+        obj_path = os.path.join(obj_dir, f"{key}.o")
+        objects.append(obj_path)
+        if os.path.exists(obj_path):
+            report["hits"] += 1
+        else:
+            todo.append((source, obj_path))
+
+    started = time.perf_counter()
+    if todo:
+        workers = max(1, min(jobs or os.cpu_count() or 1, len(todo)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda item: _compile(cxx, item[0], item[1], flags, include_dirs), todo))
+        errors = []
+        for source, ok, stderr, seconds in results:
+            rel = os.path.relpath(source, app_dir)
+            report["compile_times"][rel] = round(seconds, 3)
+            if ok:
+                report["compiled"].append(rel)
+            else:
+                errors.append(stderr.strip())
+        if errors:
+            report["errors"] = "\n".join(errors)
+            report["compile_seconds"] = time.perf_counter() - started
+            return report
+    report["compile_seconds"] = time.perf_counter() - started
+
+    # Skip linking when the exact same objects and flags produced the current executable
+    link_key = hashlib.sha256("\0".join([*objects, *flags, *link_flags, cxx]).encode("utf-8")).hexdigest()
+    stamp_dir = os.path.join(BUILD_DIR, "links")
+    os.makedirs(stamp_dir, exist_ok=True)
+    stamp_path = os.path.join(stamp_dir, hashlib.sha256(os.path.abspath(exe_path).encode("utf-8")).hexdigest())
+    try:
+        with open(stamp_path, "r") as f:
+            up_to_date = f.read() == link_key and os.path.exists(exe_path)
+    except OSError:
+        up_to_date = False
+
+    if not up_to_date:
+        started = time.perf_counter()
+        with span("cpp.link", objects=len(objects)) as attrs:
+            result = subprocess.run([cxx, *flags, *objects, *link_flags, "-o", exe_path], capture_output=True, text=True)
+            if result.returncode != 0:
+                attrs["outcome"] = "error"
+        report["link_seconds"] = time.perf_counter() - started
+        if result.returncode != 0:
+            report["errors"] = result.stderr.strip()
+            return report
+        with open(stamp_path, "w") as f:
+            f.write(link_key)
+        report["linked"] = True
+
+    report["ok"] = True
+    return report
+
+def build_cpp_profile(app_path, profile=DEFAULT_PROFILE, jobs=None):
+    if profile not in BUILD_PROFILES:
+        raise ValueError(f"Unknown build profile '{profile}'. Choose from: {', '.join(BUILD_PROFILES)}")
+    settings = BUILD_PROFILES[profile]
+    app_dir = app_root(app_path)
+    report = build_cpp_app(
+        app_path,
+        flags=settings["flags"],
+        link_flags=settings["link_flags"],
+        jobs=jobs,
+        exe_path=executable_path(app_path, app_dir, profile)
+    )
+    report["profile"] = profile
+    return report
+
+def format_build_report(report):
+    compiled = len(report["compiled"])
+    line = (
+        f"{report.get('profile', 'custom')} build, {report['sources']} source(s): {report['hits']} cached, {compiled} compiled"
+        f" in {report['compile_seconds']:.2f}s"
+    )
+    line += f", linked in {report['link_seconds']:.2f}s" if report["linked"] else ", link up to date"
+    return line
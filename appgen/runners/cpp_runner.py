@@ -1,17 +1,15 @@
 
+import os
 import subprocess
 import sys
 import shutil
 import webbrowser
+from rich.panel import Panel
+from rich.text import Text
 from rich.prompt import Confirm
 from appgen.utils.console import console
-
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from appgen.utils.tracing import span
+from appgen.runners.cpp_build import CXX, DEFAULT_PROFILE, build_cpp_profile, format_build_report
 
 def run_online_cpp_programiz(code_content):
     """
@@ -23,6 +21,19 @@ def run_online_cpp_programiz(code_content):
         webbrowser.open(PROGRAMIZ_URL)
         return
 
+    # Selenium is heavy and optional, so it is only imported when automation is requested
+    try:
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service as ChromeService
+        from webdriver_manager.chrome import ChromeDriverManager
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+    except ImportError:
+        console.print("[yellow]selenium/webdriver-manager not installed. Opening the website instead...[/yellow]")
+        webbrowser.open(PROGRAMIZ_URL)
+        return
+
     console.print("[cyan]Launching Selenium automation for Programiz C++ Compiler...[/cyan]")
     console.print("[dim]This requires Chrome browser installed.[/dim]")
     
@@ -64,27 +75,39 @@ def run_online_cpp_programiz(code_content):
         console.print("[yellow]Falling back to opening the website only...[/yellow]")
         webbrowser.open(PROGRAMIZ_URL)
 
-def run_cpp_app(file_path):
-    if shutil.which("g++"):
-        # Compiler exists, try to run
-        exe_path = file_path.replace(".cpp", ".exe" if sys.platform == "win32" else "")
+def compile_cpp_app(file_path, profile=DEFAULT_PROFILE):
+    """
+    Builds the app with the given profile and prints the build report.
+    """
+    console.print(f"[cyan]Compiling locally ({profile})...[/cyan]")
+    report = build_cpp_profile(file_path, profile)
+    console.print(f"[dim]{format_build_report(report)}[/dim]")
+    for source, seconds in report["compile_times"].items():
+        console.print(f"[dim]  {source}: {seconds:.2f}s[/dim]")
+    if not report["ok"]:
+        console.print(Panel(Text(report["errors"] or "Unknown error"), title="Compilation failed", border_style="red"))
+    return report
+
+def run_cpp_app(file_path, profile=DEFAULT_PROFILE):
+    if shutil.which(CXX):
         app_dir = os.path.dirname(os.path.abspath(file_path))
-        
-        console.print("[cyan]Compiling locally...[/cyan]")
-        # Compiling in the same directory
-        compile_result = subprocess.run(["g++", file_path, "-o", exe_path], capture_output=True, text=True)
-        
-        if compile_result.returncode == 0:
+        report = compile_cpp_app(file_path, profile)
+
+        if report["ok"]:
+            exe_path = report["exe"]
             console.print("[cyan]Running in new console...[/cyan]")
             if sys.platform == "win32":
                 os.system(f'start cmd /k "{exe_path}"')
             else:
-                subprocess.run([exe_path], cwd=app_dir)
+                with span("app.run", language="c++", interactive=True):
+                    subprocess.run([exe_path], cwd=app_dir)
             return
 
+        console.print("[yellow]Using Programiz Online Compiler instead...[/yellow]")
+    else:
+        console.print("[yellow]Local C++ compiler not found. Using Programiz Online Compiler...[/yellow]")
+
     # If no compiler or compilation failed, use Online Automation
-    console.print("[yellow]Local C++ compiler not found. Using Programiz Online Compiler...[/yellow]")
-    
     try:
         with open(file_path, "r", encoding="utf-8") as f:
             code_content = f.read()
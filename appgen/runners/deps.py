@@ -0,0 +1,212 @@
+import ast
+import hashlib
+import json
+import os
+import re
+import sys
+import sysconfig
+from appgen.utils.filesystem import state_path, app_root, iter_app_files
+from appgen.runners.venvs import canonical_name
+
+DEPS_CACHE_FILE = "deps_cache.json"
+DEPS_CACHE_MAX_ENTRIES = 5000
+
+REQUIREMENTS_COMMENT_RE = re.compile(r"#\s*requirements:\s*(.*)", re.IGNORECASE)
+
+# Import names whose distribution on PyPI is named differently
+IMPORT_TO_DIST = {
+    "cv2": "opencv-python",
+    "PIL": "Pillow",
+    "sklearn": "scikit-learn",
+    "skimage": "scikit-image",
+    "yaml": "PyYAML",
+    "bs4": "beautifulsoup4",
+    "dotenv": "python-dotenv",
+    "dateutil": "python-dateutil",
+    "Crypto": "pycryptodome",
+    "jwt": "PyJWT",
+    "serial": "pyserial",
+    "usb": "pyusb",
+    "OpenGL": "PyOpenGL",
+    "attr": "attrs",
+    "magic": "python-magic",
+    "docx": "python-docx",
+    "pptx": "python-pptx",
+    "fitz": "PyMuPDF",
+    "gi": "PyGObject",
+    "win32api": "pywin32",
+    "win32con": "pywin32",
+    "telegram": "python-telegram-bot",
+    "discord": "discord.py",
+    "Levenshtein": "python-Levenshtein",
+    "MySQLdb": "mysqlclient",
+    "psycopg2": "psycopg2-binary",
+    "google.generativeai": "google-generativeai",
+    "google.protobuf": "protobuf",
+    "googleapiclient": "google-api-python-client",
+    "speech_recognition": "SpeechRecognition",
+    "wx": "wxPython",
+    "zmq": "pyzmq",
+    "websocket": "websocket-client",
+    "st_aggrid": "streamlit-aggrid",
+    "streamlit_option_menu": "streamlit-option-menu",
+}
+
+def _stdlib_modules():
+    names = getattr(sys, "stdlib_module_names", None)
+    if names:
+        return set(names) | set(sys.builtin_module_names)
+    # Python < 3.10: list the standard library directory instead
+    names = set(sys.builtin_module_names)
+    stdlib_dir = sysconfig.get_paths()["stdlib"]
+    for entry in os.listdir(stdlib_dir):
+        name, ext = os.path.splitext(entry)
+        if ext in (".py", "") and name.isidentifier():
+            names.add(name)
+    lib_dynload = os.path.join(stdlib_dir, "lib-dynload")
+    if os.path.isdir(lib_dynload):
+        names.update(entry.split(".")[0] for entry in os.listdir(lib_dynload))
+    return names
+
+STDLIB_MODULES = _stdlib_modules()
+
+class ImportCollector(ast.NodeVisitor):
+    """
+    Collects absolute imports. Imports guarded by `except ImportError`
+    are optional and are not installed automatically.
+    """
+
+    def __init__(self):
+        self.required = set()
+        self.optional = set()
+        self._guarded = 0
+
+    def _add(self, name):
+        (self.optional if self._guarded else self.required).add(name)
+
+    def visit_Try(self, node):
+        guards_import = any(
+            handler.type is None or any(
+                isinstance(n, ast.Name) and n.id in ("ImportError", "ModuleNotFoundError", "Exception")
+                for n in ast.walk(handler.type)
+            )
+            for handler in node.handlers
+        )
+        self._guarded += guards_import
+        for stmt in node.body:
+            self.visit(stmt)
+        self._guarded -= guards_import
+        for part in (node.handlers, node.orelse, node.finalbody):
+            for stmt in part:
+                self.visit(stmt)
+
+    visit_TryStar = visit_Try
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self._add(alias.name)
+
+    def visit_ImportFrom(self, node):
+        if node.level == 0 and node.module:
+            self._add(node.module)
+
+def python_files(app_path):
+    return list(iter_app_files(app_path, (".py",)))
+
+def local_modules(app_dir, files):
+    """
+    Top-level names that resolve to the app's own modules or packages.
+    """
+    names = set()
+    for path in files:
+        rel = os.path.relpath(path, app_dir)
+        parts = rel.split(os.sep)
+        names.add(os.path.splitext(parts[0])[0])
+    return names
+
+def _load_cache():
+    try:
+        with open(state_path(DEPS_CACHE_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_cache(cache):
+    # Dicts keep insertion order, so the oldest entries go first
+    while len(cache) > DEPS_CACHE_MAX_ENTRIES:
+        del cache[next(iter(cache))]
+    try:
+        with open(state_path(DEPS_CACHE_FILE), "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+    except OSError:
+        pass
+
+def scan_file(source):
+    collector = ImportCollector()
+    try:
+        collector.visit(ast.parse(source))
+    except SyntaxError:
+        pass
+    declared = []
+    match = REQUIREMENTS_COMMENT_RE.search(source)
+    if match:
+        declared = [r.strip() for r in match.group(1).split(",") if r.strip()]
+    return {
+        "required": sorted(collector.required),
+        "optional": sorted(collector.optional),
+        "declared": declared,
+    }
+
+def distribution_for(module):
+    """
+    Maps an import path such as 'cv2' or 'google.protobuf.message' to a PyPI name.
+    """
+    parts = module.split(".")
+    for i in range(len(parts), 0, -1):
+        dist = IMPORT_TO_DIST.get(".".join(parts[:i]))
+        if dist:
+            return dist
+    return parts[0]
+
+def resolve_requirements(app_path):
+    """
+    Returns the distributions an app needs: declared '# requirements:' entries
+    plus third-party imports found with ast across every .py file.
+    Per-file results are cached by content hash.
+    """
+    app_dir = app_root(app_path)
+    files = python_files(app_dir)
+    locals_ = local_modules(app_dir, files)
+    cache = _load_cache()
+    dirty = False
+
+    declared, imported = [], set()
+    for path in files:
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+        except OSError:
+            continue
+        digest = hashlib.sha256(raw).hexdigest()
+        entry = cache.get(digest)
+        if entry is None:
+            entry = scan_file(raw.decode("utf-8", errors="replace"))
+            cache[digest] = entry
+            dirty = True
+        declared.extend(entry["declared"])
+        imported.update(entry["required"])
+
+    if dirty:
+        _save_cache(cache)
+
+    requirements = {}
+    for req in declared:
+        name = re.split(r"[\s\[<>=!~;]", req, 1)[0]
+        requirements.setdefault(canonical_name(name), req)
+    for module in sorted(imported):
+        top = module.split(".")[0]
+        if top in STDLIB_MODULES or top in locals_ or top == "__future__":
+            continue
+        dist = distribution_for(module)
+        requirements.setdefault(canonical_name(dist), dist)
+    return sorted(requirements.values(), key=str.lower)
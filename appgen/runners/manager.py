@@ -3,13 +3,12 @@ import os
 import sys
 from appgen.utils.console import console
 from appgen.utils.health import confirm_dangerous_execution
-from appgen.runners.python_runner import run_python_app
-from appgen.runners.html_runner import run_html_app
-from appgen.runners.cpp_runner import run_cpp_app
 
 def run_app(app_entry):
     """
     Runs the app based on its language.
+    Runners are imported on first use so heavy dependencies (selenium for C++)
+    never slow down startup.
     """
     if not confirm_dangerous_execution():
         return
@@ -21,10 +20,13 @@ def run_app(app_entry):
     
     try:
         if language == "python" or file_path.endswith(".py"):
+            from appgen.runners.python_runner import run_python_app
             run_python_app(file_path)
         elif language == "html" or file_path.endswith(".html"):
+            from appgen.runners.html_runner import run_html_app
             run_html_app(file_path)
         elif language == "c++" or file_path.endswith(".cpp"):
+            from appgen.runners.cpp_runner import run_cpp_app
             run_cpp_app(file_path)
         else:
             console.print(f"[yellow]Unknown runner for language {language}. Opening file...[/yellow]")
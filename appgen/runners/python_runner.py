@@ -1,35 +1,32 @@
-
 import subprocess
 import sys
-import re
+import os
 from appgen.utils.console import console
+from appgen.utils.tracing import span
+from appgen.runners.deps import resolve_requirements
+from appgen.runners.venvs import ensure_env, env_python
 
 def run_python_app(file_path):
-    # Try to install dependencies first
     with open(file_path, "r", encoding="utf-8") as f:
         content = f.read()
-        
-    # Look for requirements comment
-    req_match = re.search(r"#\s*requirements:\s*(.*)", content, re.IGNORECASE)
-    if req_match:
-        reqs = [r.strip() for r in req_match.group(1).split(",") if r.strip()]
-        if reqs:
-            console.print(f"[cyan]Installing dependencies: {', '.join(reqs)}[/cyan]")
-            subprocess.run([sys.executable, "-m", "pip", "install"] + reqs, check=False)
-    
-    # Fallback: Naive import detection
-    imports = re.findall(r"^import (\w+)|^from (\w+)", content, re.MULTILINE)
-    detected_pkgs = set()
-    for imp in imports:
-        pkg = imp[0] or imp[1]
-        if pkg and pkg not in sys.builtin_module_names and pkg not in ['streamlit']:
-                detected_pkgs.add(pkg)
-    
-    import os
+
     app_dir = os.path.dirname(os.path.abspath(file_path))
-    
+
+    # Declared '# requirements:' plus third-party imports from every file of the app
+    reqs = resolve_requirements(app_dir)
+    if reqs:
+        console.print(f"[dim]Dependencies: {', '.join(reqs)}[/dim]")
+
+    # Apps with dependencies run in an isolated environment shared by every
+    # app with the same requirement set; dependency-free apps use this interpreter
+    python = sys.executable
+    if reqs:
+        python = env_python(ensure_env(reqs))
+
     # Heuristic: if it imports streamlit, run with streamlit
-    if "import streamlit" in content:
-        subprocess.run(["streamlit", "run", file_path], check=True, cwd=app_dir)
-    else:
-        subprocess.run([sys.executable, file_path], check=True, cwd=app_dir)
+    streamlit = "import streamlit" in content
+    with span("app.run", language="python", streamlit=streamlit, interactive=True):
+        if streamlit:
+            subprocess.run([python, "-m", "streamlit", "run", file_path], check=True, cwd=app_dir)
+        else:
+            subprocess.run([python, file_path], check=True, cwd=app_dir)
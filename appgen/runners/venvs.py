@@ -0,0 +1,198 @@
+import datetime
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from importlib import metadata
+from packaging.specifiers import InvalidSpecifier, SpecifierSet
+from appgen.utils.console import console
+from appgen.utils.filesystem import STATE_DIR
+from appgen.utils.tracing import span
+
+ENVS_DIR = os.path.join(STATE_DIR, "envs")
+WHEEL_CACHE_DIR = os.path.join(STATE_DIR, "wheel_cache")
+ENV_MARKER = "prompt2app_env.json"
+ENV_MAX_IDLE_DAYS = 30
+# A folder without a marker this young may be a venv another process is still creating
+ENV_BUILD_GRACE_SECONDS = 3600
+GC_INTERVAL_SECONDS = 24 * 3600
+
+REQUIREMENT_RE = re.compile(r"^\s*(?P<name>[A-Za-z0-9][A-Za-z0-9._-]*)\s*(?P<extras>\[[^\]]*\])?\s*(?P<spec>.*)$")
+
+def canonical_name(name):
+    # PEP 503 normalization: case-insensitive, runs of -_. are equivalent
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+def normalize_requirements(reqs):
+    normalized = set()
+    for req in reqs:
+        match = REQUIREMENT_RE.match(req)
+        if not match:
+            continue
+        spec = match.group("spec").replace(" ", "")
+        normalized.add(f"{canonical_name(match.group('name'))}{(match.group('extras') or '').lower()}{spec}")
+    return sorted(normalized)
+
+def requirements_hash(reqs):
+    payload = "\n".join(normalize_requirements(reqs))
+    payload += f"\npython={sys.version_info.major}.{sys.version_info.minor}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+def env_python(env_dir):
+    if sys.platform == "win32":
+        return os.path.join(env_dir, "Scripts", "python.exe")
+    return os.path.join(env_dir, "bin", "python")
+
+def env_site_packages(env_dir):
+    if sys.platform == "win32":
+        return [os.path.join(env_dir, "Lib", "site-packages")]
+    return glob.glob(os.path.join(env_dir, "lib", "python*", "site-packages"))
+
+def installed_distributions(env_dir=None):
+    """
+    Maps canonical distribution names to versions by reading dist-info
+    metadata directly, so no pip process is needed. With env_dir only that
+    environment is read; one without site-packages has nothing installed.
+    """
+    if env_dir:
+        path = env_site_packages(env_dir)
+        if not path:
+            return {}
+        dists = metadata.distributions(path=path)
+    else:
+        dists = metadata.distributions()
+    found = {}
+    for dist in dists:
+        name = dist.metadata.get("Name")
+        if name:
+            found[canonical_name(name)] = dist.version
+    return found
+
+def satisfies(version, spec):
+    """
+    True when an installed version meets a requirement's version specifier.
+    Anything that is not a version specifier (e.g. a URL) counts as met.
+    """
+    spec = spec.split(";", 1)[0].replace(" ", "")
+    if not spec:
+        return True
+    try:
+        return SpecifierSet(spec).contains(version, prereleases=True)
+    except InvalidSpecifier:
+        return True
+
+def missing_requirements(reqs, env_dir=None):
+    installed = installed_distributions(env_dir)
+    missing = []
+    for req in reqs:
+        match = REQUIREMENT_RE.match(req)
+        if not match:
+            continue
+        version = installed.get(canonical_name(match.group("name")))
+        if version is None or not satisfies(version, match.group("spec")):
+            missing.append(req)
+    return missing
+
+def _read_marker(env_dir):
+    try:
+        with open(os.path.join(env_dir, ENV_MARKER), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_marker(env_dir, marker):
+    marker["last_used"] = time.time()
+    with open(os.path.join(env_dir, ENV_MARKER), "w", encoding="utf-8") as f:
+        json.dump(marker, f, indent=2)
+
+def install_into_env(env_dir, packages):
+    os.makedirs(WHEEL_CACHE_DIR, exist_ok=True)
+    console.print(f"[cyan]Installing dependencies: {', '.join(packages)}[/cyan]")
+    with span("pip.install", packages=len(packages)) as attrs:
+        result = subprocess.run(
+            [env_python(env_dir), "-m", "pip", "install", "--disable-pip-version-check",
+             "--cache-dir", os.path.abspath(WHEEL_CACHE_DIR), *packages],
+            check=False
+        )
+        attrs["returncode"] = result.returncode
+        if result.returncode != 0:
+            attrs["outcome"] = "error"
+    return result.returncode == 0
+
+def ensure_env(reqs):
+    """
+    Returns an isolated environment containing reqs. Environments are shared
+    by every app with the same normalized requirement set and built only once.
+    """
+    key = requirements_hash(reqs)
+    env_dir = os.path.abspath(os.path.join(ENVS_DIR, key))
+    marker = _read_marker(env_dir)
+
+    if marker is None or not os.path.exists(env_python(env_dir)):
+        shutil.rmtree(env_dir, ignore_errors=True)
+        os.makedirs(ENVS_DIR, exist_ok=True)
+        console.print(f"[cyan]Creating environment {key} for this dependency set...[/cyan]")
+        with span("venv.create"):
+            subprocess.run([sys.executable, "-m", "venv", env_dir], check=True)
+        marker = {
+            "requirements": normalize_requirements(reqs),
+            "python": sys.version.split()[0],
+            "created_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        # Mark the env as in use before the (slow) install so gc_envs keeps it
+        _write_marker(env_dir, {**marker, "status": "building"})
+
+    missing = missing_requirements(reqs, env_dir)
+    if missing and not install_into_env(env_dir, missing):
+        console.print("[yellow]Some dependencies failed to install; the app may not start.[/yellow]")
+    elif not missing:
+        console.print(f"[dim]Reusing environment {key} (all dependencies present)[/dim]")
+
+    _write_marker(env_dir, {**marker, "status": "ready"})
+    maybe_gc_envs()
+    return env_dir
+
+def gc_envs(max_idle_days=ENV_MAX_IDLE_DAYS):
+    """
+    Deletes environments that were not used for max_idle_days, and folders
+    left without a marker by a venv creation that never finished.
+    """
+    removed = []
+    if not os.path.isdir(ENVS_DIR):
+        return removed
+    now = time.time()
+    cutoff = now - max_idle_days * 86400
+    for name in os.listdir(ENVS_DIR):
+        env_dir = os.path.join(ENVS_DIR, name)
+        if not os.path.isdir(env_dir):
+            continue
+        marker = _read_marker(env_dir)
+        if marker is None:
+            try:
+                if now - os.path.getmtime(env_dir) < ENV_BUILD_GRACE_SECONDS:
+                    continue
+            except OSError:
+                continue
+        if marker is None or marker.get("last_used", 0) < cutoff:
+            shutil.rmtree(env_dir, ignore_errors=True)
+            removed.append(name)
+    return removed
+
+def maybe_gc_envs():
+    stamp = os.path.join(ENVS_DIR, ".last_gc")
+    try:
+        if time.time() - os.path.getmtime(stamp) < GC_INTERVAL_SECONDS:
+            return
+    except OSError:
+        pass
+    removed = gc_envs()
+    if removed:
+        console.print(f"[dim]Removed {len(removed)} unused environment(s).[/dim]")
+    os.makedirs(ENVS_DIR, exist_ok=True)
+    with open(stamp, "w") as f:
+        f.write(str(time.time()))
@@ -5,62 +5,66 @@ import shutil
 import questionary
 from rich.panel import Panel
 from rich.text import Text
-from rich.prompt import Prompt, Confirm
+from rich.markup import escape
+from rich.prompt import Prompt, IntPrompt, Confirm
 from rich.markdown import Markdown
 from rich.table import Table
 from rich.syntax import Syntax
 
 from appgen.utils.console import console
-from appgen.core.registry import load_apps_registry, add_app_to_registry
-from appgen.core.copilot import get_copilot_suggestion, call_copilot, CopilotError
-from appgen.core.extractor import extract_code_blocks_with_filenames
+from appgen.ui.picker import pick_app
+from appgen.core.registry import count_apps, add_app_to_registry
+from appgen.core.copilot import get_copilot_suggestion, stream_copilot_suggestion, call_copilot, CopilotError
+from appgen.core.extractor import extract_code_blocks_with_filenames, CodeBlockParser
+from appgen.core.context import build_context, CONTEXT_TOKEN_BUDGET
+from appgen.core.chat import ChatSession
+from appgen.core.agents import build_agent_pipeline
+from appgen.core.speculative import generate_candidates, DEFAULT_CANDIDATES, MAX_CANDIDATES
+from appgen.core.patching import PatchError, looks_like_diff, patches_from_blocks, plan_patches, write_planned
 from appgen.core.scorer import score_app_code
 from appgen.runners.manager import run_app
-from appgen.utils.health import perform_health_check
+from appgen.utils.health import perform_health_check, perform_performance_lint
 from appgen.utils.backup import create_backup
-from appgen.utils.filesystem import export_app_zip
+from appgen.utils.snapshots import list_snapshots, diff_snapshots, restore_snapshot, apply_retention, SnapshotError
+from appgen.utils.filesystem import state_path, app_root, block_filename, write_app_file, write_app_blocks
+from appgen.utils.export import export_app_zip
+from appgen.utils.tracing import read_spans, latency_stats, is_interactive, trace_path, clear_traces
+
+# Refinement rewrites code, so it gets more room than read-only actions
+REFINE_TOKEN_BUDGET = CONTEXT_TOKEN_BUDGET * 2
 
 def chat_with_copilot(app_path, language):
     """
     Interactive chat session with Copilot about the generated app.
     """
-    console.print(Panel(f"[bold cyan]Chatting with Copilot about {os.path.basename(app_path)}[/bold cyan]\nType 'exit' to stop.", border_style="cyan"))
-    
-    # Load context
-    try:
-        code_context = ""
-        if os.path.isdir(app_path):
-             files = [f for f in os.listdir(app_path) if f.endswith(('.py', '.cpp', '.html', '.js', '.css'))]
-             for f in files[:3]: # Limit context
-                 with open(os.path.join(app_path, f), 'r', encoding='utf-8') as fh:
-                     code_context += f"\n--- {f} ---\n{fh.read()[:2000]}"
-        else:
-            with open(app_path, "r", encoding="utf-8") as f:
-                code_context = f.read()[:3000]
-    except Exception as e:
-        console.print(f"[red]Error loading context: {e}[/red]")
-        return
+    console.print(Panel(f"[bold cyan]Chatting with Copilot about {os.path.basename(app_path)}[/bold cyan]\nType 'exit' to stop, 'new' to start over.", border_style="cyan"))
+
+    session = ChatSession.load(app_path, language)
+    if session and session.turns and Confirm.ask(f"Resume previous chat ({len(session.turns)} messages, started {session.created_at})?", default=True):
+        last = session.turns[-1]
+        console.print(f"[dim]Last question: {escape(last['question'])}[/dim]")
+    else:
+        session = ChatSession(app_path, language)
 
     while True:
         user_msg = Prompt.ask("\n[bold green]You[/bold green]")
         if user_msg.lower() in ['exit', 'quit']:
             break
-            
-        full_prompt = (
-            f"Context: You are an AI assistant helping a developer with their {language} app.\n"
-            f"Code:\n{code_context}\n\n"
-            f"User Question: {user_msg}\n"
-            "Answer helpful and concise."
-        )
-        
+        if user_msg.lower() == 'new':
+            session.delete()
+            session = ChatSession(app_path, language)
+            console.print("[dim]Started a new chat session.[/dim]")
+            continue
+
         try:
-            response = call_copilot(full_prompt, "Copilot typing...")
+            response, stats = session.ask(user_msg)
             console.print(Panel(Markdown(response), title="Copilot", border_style="blue"))
+            console.print(f"[dim]Prompt ~{stats['prompt_tokens']:,} tokens ({stats['prompt_chars']:,} chars), {stats['latency']:.2f}s[/dim]")
             
             # Check if response contains code to apply
             blocks = extract_code_blocks_with_filenames(response)
             if blocks and Confirm.ask("Copilot suggested code changes. Apply them?"):
-                create_backup(app_path)
+                create_backup(app_path, label="before chat change")
                 if os.path.isdir(app_path):
                      for block in blocks:
                          fname = block['filename']
@@ -76,27 +80,20 @@ def chat_with_copilot(app_path, language):
                 if Confirm.ask("Run updated app?"):
                     run_app({"name": os.path.basename(app_path), "path": app_path, "language": language})
                     
-        except CopilotError as e:
+        except (CopilotError, OSError) as e:
             console.print(f"[red]Error: {e}[/red]")
 
 def explain_app_code(app_path, language):
     try:
-        if os.path.isdir(app_path):
-            # Read main file or first file
-            files = os.listdir(app_path)
-            main_file = next((f for f in files if f.startswith("main") or f.startswith("index")), files[0] if files else None)
-            if not main_file: return "No files found."
-            path = os.path.join(app_path, main_file)
-        else:
-            path = app_path
-            
-        with open(path, "r", encoding="utf-8") as f:
-            code = f.read()
-            
+        code = build_context(app_path)
+        if not code:
+            console.print("[yellow]No files found.[/yellow]")
+            return
+
         prompt = (
             f"Explain this {language} code for a beginner. "
             "Cover: 1. Architecture 2. Main functions 3. How to run it 4. Where to customize it. "
-            f"\n\nCode:\n{code[:3000]}"
+            f"\n\nCode:\n{code}"
         )
         explanation = call_copilot(prompt, "Generating explanation...")
         console.print(Panel(Markdown(explanation or "No explanation generated."), title="App Explanation", border_style="blue"))
@@ -106,16 +103,7 @@ def explain_app_code(app_path, language):
 
 def generate_readme(app_path, language):
     try:
-        # Determine code content
-        code_snippet = ""
-        if os.path.isdir(app_path):
-             files = [f for f in os.listdir(app_path) if f.endswith(('.py', '.cpp', '.html', '.js', '.css'))]
-             for f in files[:2]: # Take first 2 files
-                 with open(os.path.join(app_path, f), 'r', encoding='utf-8') as fh:
-                     code_snippet += f"\n--- {f} ---\n{fh.read()[:1000]}"
-        else:
-            with open(app_path, 'r', encoding='utf-8') as f:
-                code_snippet = f.read()[:2000]
+        code_snippet = build_context(app_path, query="features usage install run")
 
         prompt = (
             f"Generate a professional README.md for this {language} application. "
@@ -134,7 +122,7 @@ def generate_readme(app_path, language):
                  readme_content = blocks[0]['code']
 
         if readme_content:
-            save_path = os.path.join(app_path if os.path.isdir(app_path) else os.path.dirname(app_path), "README.md")
+            save_path = os.path.join(app_root(app_path), "README.md")
             with open(save_path, "w", encoding="utf-8") as f:
                 f.write(readme_content)
             console.print(f"[green]README.md generated at {save_path}[/green]")
@@ -163,7 +151,8 @@ def regenerate_app(app_entry):
             meta.get("color_scheme"), 
             False, 
             meta.get("architecture"), 
-            meta.get("extras")
+            meta.get("extras"),
+            use_cache=False
         )
         console.print("[yellow]Regeneration complete. (Implementation note: Save logic reused from create_new_app would be better here)[/yellow]")
         console.print(Panel(Markdown(suggestion), border_style="green"))
@@ -178,52 +167,157 @@ def why_architecture(app_path, language):
     )
     # We need to read code context first
     try:
-        code_snippet = ""
-        if os.path.isdir(app_path):
-             files = [f for f in os.listdir(app_path) if f.endswith(('.py', '.cpp', '.html', '.js', '.css'))]
-             for f in files[:2]:
-                 with open(os.path.join(app_path, f), 'r', encoding='utf-8') as fh:
-                     code_snippet += f"\n--- {f} ---\n{fh.read()[:1000]}"
-        else:
-            with open(app_path, 'r', encoding='utf-8') as f:
-                code_snippet = f.read()[:2000]
-        
+        code_snippet = build_context(app_path)
+
         full_prompt = f"{prompt}\n\nCode Context:\n{code_snippet}"
         explanation = call_copilot(full_prompt, "Analyzing Architecture...")
         console.print(Panel(Markdown(explanation or "No explanation generated."), title="Architecture Analysis", border_style="magenta"))
     except Exception as e:
         console.print(f"[red]Error: {e}[/red]")
 
-def multi_copilot_simulation(query):
+def show_pipeline_report(pipeline):
+    table = Table(title=f"Multi-Agent Pipeline ({pipeline.wall_seconds:.1f}s wall)", show_header=True, header_style="bold magenta")
+    table.add_column("Stage", style="cyan")
+    table.add_column("Status")
+    table.add_column("Attempts", justify="right")
+    table.add_column("Start s", justify="right")
+    table.add_column("Time s", justify="right")
+    styles = {"done": "green", "failed": "red", "skipped": "yellow"}
+    for stage in pipeline.stages.values():
+        status = f"[{styles.get(stage.status, 'white')}]{stage.status}[/]"
+        if stage.error and stage.status != "done":
+            status += f" [dim]({escape(stage.error[:60])})[/dim]"
+        start = f"{stage.started_at:.1f}" if stage.started_at is not None else "-"
+        table.add_row(stage.label, status, str(stage.attempts), start, f"{stage.seconds:.1f}")
+    console.print(table)
+
+def multi_copilot_simulation(query, language="Python"):
     console.print("[bold cyan]Activating Multi-Copilot Simulation Mode...[/bold cyan]")
-    
-    # 1. Architect Agent
-    with console.status("[blue]Architect Agent: Designing solution...[/blue]"):
-        time.sleep(1.5)
-        arch_prompt = f"Design a high-level architecture for: {query}. Brief bullet points."
-        try:
-            arch_plan = call_copilot(arch_prompt, "Architect Agent thinking...")
-        except:
-            arch_plan = "Standard Architecture Plan"
-        console.print(Panel(Markdown(arch_plan), title="Architect Agent Plan", border_style="blue"))
-        
-    # 2. Developer Agent
-    with console.status("[green]Developer Agent: Writing code based on plan...[/green]"):
-        dev_prompt = f"Write the code for {query} following this plan: {arch_plan}"
-        try:
-            code_suggestion = call_copilot(dev_prompt, "Developer Agent coding...")
-        except CopilotError as e:
-            console.print(f"[red]Developer Agent failed: {e}[/red]")
+    pipeline = build_agent_pipeline(query, language)
+
+    while True:
+        with console.status("[cyan]Multi-agent pipeline starting...[/cyan]", spinner="dots") as status:
+            def on_event(stage, event):
+                if event == "done" and stage.name == "architect":
+                    console.print(Panel(Markdown(stage.output["plan"]), title="Architect Agent Plan", border_style="blue"))
+                elif event == "done" and stage.name.startswith("review:"):
+                    style = "magenta" if stage.output["approved"] else "yellow"
+                    console.print(f"[{style}]{escape(stage.label)}: {escape(stage.output['notes'][:120])}[/{style}]")
+                elif event == "retry":
+                    console.print(f"[yellow]{escape(stage.label)} failed ({escape(stage.error[:80])}), retrying...[/yellow]")
+                running = [s.label for s in pipeline.stages.values() if s.status == "running"]
+                finished = sum(s.status == "done" for s in pipeline.stages.values())
+                status.update(f"[cyan]Running: {escape(', '.join(running)) or '-'} ({finished}/{len(pipeline.stages)} done)[/cyan]")
+
+            pipeline.run(on_event)
+
+        show_pipeline_report(pipeline)
+        if pipeline.ok:
+            return pipeline.output("assemble")
+        if not Confirm.ask("Some stages failed. Retry only the failed stages?"):
             return None
-            
-    # 3. Reviewer Agent
-    with console.status("[magenta]Reviewer Agent: Critiquing code...[/magenta]"):
-        time.sleep(1)
-        # We simulate this step or actually call it if we want to burn tokens/time
-        # For speed, let's just present the code as "Reviewed"
-        console.print("[magenta]Reviewer Agent: Code looks solid. Approved.[/magenta]")
-        
-    return code_suggestion
+
+def ask_int(prompt, default, low, high):
+    """
+    IntPrompt that keeps asking until the answer is between low and high.
+    """
+    while True:
+        value = IntPrompt.ask(f"{prompt} ({low}-{high})", default=default)
+        if low <= value <= high:
+            return value
+        console.print(f"[red]Please enter a number between {low} and {high}.[/red]")
+
+MAX_BENCH_RUNS = 1000
+
+def benchmark_app(app_entry):
+    language = app_entry.get("language", "").lower()
+    if language != "c++" and not app_entry["path"].endswith(".cpp"):
+        console.print("[yellow]Benchmarking is available for C++ apps only.[/yellow]")
+        return
+
+    from appgen.runners.cpp_build import BUILD_PROFILES, CXX, DEFAULT_PROFILE
+    from appgen.runners.cpp_bench import benchmark_cpp_app, show_benchmark_results
+
+    if not shutil.which(CXX):
+        console.print(f"[yellow]Local C++ compiler '{escape(CXX)}' not found; benchmarking needs one (set CXX to use another).[/yellow]")
+        return
+
+    profiles = questionary.checkbox(
+        "Build profiles to compare:",
+        choices=[questionary.Choice(p, checked=p in ("debug", DEFAULT_PROFILE)) for p in BUILD_PROFILES]
+    ).ask()
+    if not profiles:
+        return
+    runs = ask_int("Runs per profile", 10, 1, MAX_BENCH_RUNS)
+    stdin_file = Prompt.ask("File to feed as stdin (empty for none)", default="")
+    stdin_text = ""
+    if stdin_file:
+        try:
+            with open(stdin_file, "r", encoding="utf-8") as f:
+                stdin_text = f.read()
+        except OSError as e:
+            console.print(f"[red]Could not read {escape(stdin_file)}: {escape(str(e))}[/red]")
+            return
+
+    results, previous = benchmark_cpp_app(app_entry["path"], profiles, runs=runs, stdin_text=stdin_text)
+    show_benchmark_results(results, previous)
+
+def manage_snapshots(app_entry):
+    app_path = app_entry["path"]
+    snapshots = list_snapshots(app_path)
+    if not snapshots:
+        console.print("[yellow]No snapshots yet. Use 'Create Backup' to take one.[/yellow]")
+        return
+
+    table = Table(title=f"Snapshots of {app_entry['name']}", show_header=True, header_style="bold magenta")
+    table.add_column("ID", style="cyan")
+    table.add_column("Created")
+    table.add_column("Files", justify="right")
+    table.add_column("Size KB", justify="right")
+    table.add_column("Label", style="dim")
+    for snap in reversed(snapshots):
+        table.add_row(snap["id"], snap["created_at"], str(len(snap["files"])), f"{snap['total_bytes'] / 1024:.1f}", snap.get("label", ""))
+    console.print(table)
+
+    action = questionary.select(
+        "Snapshot action:",
+        choices=["Diff with current files", "Diff two snapshots", "Restore", "Apply retention policy", "Back"]
+    ).ask()
+    if action in (None, "Back"):
+        return
+
+    ids = [snap["id"] for snap in reversed(snapshots)]
+    try:
+        if action == "Diff with current files":
+            snapshot_id = questionary.select("Snapshot:", choices=ids).ask()
+            if snapshot_id:
+                show_snapshot_diff(diff_snapshots(app_path, snapshot_id))
+        elif action == "Diff two snapshots":
+            old_id = questionary.select("Older snapshot:", choices=ids).ask()
+            new_id = questionary.select("Newer snapshot:", choices=ids).ask()
+            if old_id and new_id:
+                show_snapshot_diff(diff_snapshots(app_path, old_id, new_id))
+        elif action == "Restore":
+            snapshot_id = questionary.select("Restore which snapshot?", choices=ids).ask()
+            if snapshot_id and Confirm.ask(f"Restore {app_entry['name']} to {snapshot_id}? (current files are snapshotted first)"):
+                result = restore_snapshot(app_path, snapshot_id)
+                console.print(
+                    f"[green]Restored {snapshot_id}: {len(result['written'])} file(s) written, "
+                    f"{len(result['removed'])} removed. Previous state saved as {result['safety']}.[/green]"
+                )
+        elif action == "Apply retention policy":
+            removed = apply_retention(app_path)
+            console.print(f"[green]Removed {len(removed)} snapshot(s).[/green]")
+    except (SnapshotError, OSError) as e:
+        console.print(f"[red]Snapshot operation failed: {e}[/red]")
+
+def show_snapshot_diff(diff):
+    if not (diff["added"] or diff["removed"] or diff["modified"]):
+        console.print("[green]No differences.[/green]")
+        return
+    console.print(f"[green]Added: {len(diff['added'])}[/green]  [red]Removed: {len(diff['removed'])}[/red]  [yellow]Modified: {len(diff['modified'])}[/yellow]")
+    if diff["patch"]:
+        console.print(Syntax(diff["patch"], "diff", theme="monokai"))
 
 # Action Dispatcher
 APP_ACTIONS = {
@@ -232,31 +326,24 @@ APP_ACTIONS = {
     "Explain This App": lambda app: explain_app_code(app["path"], app["language"]),
     "App Preview (Safe Mode)": lambda app: app_preview(app["path"], app["language"]),
     "Health Check": lambda app: perform_health_check(app["path"], app["language"]),
+    "Performance Lint": lambda app: perform_performance_lint(app["path"], app["language"]),
     "Code Quality Score": lambda app: score_app_code(app["path"], app["language"]),
     "Generate README": lambda app: generate_readme(app["path"], app["language"]),
-    "Create Backup": lambda app: create_backup(app["path"]),
+    "Create Backup": lambda app: create_backup(app["path"], label="manual"),
+    "Snapshots (List/Diff/Restore)": lambda app: manage_snapshots(app),
     "Export to ZIP": lambda app: export_app_zip(app["path"]),
     "Regenerate (Same Prompt)": lambda app: regenerate_app(app),
     "Why This Architecture?": lambda app: why_architecture(app["path"], app["language"]),
+    "Benchmark (C++)": lambda app: benchmark_app(app),
 }
 
 def view_run_menu():
-    registry = load_apps_registry()
-    if not registry:
+    if not count_apps():
         console.print("[yellow]No apps found.[/yellow]")
         return
 
-    # Use Questionary for selection
-    choices = []
-    for app in registry:
-        label = f"{app['name']} ({app['language']}) - {app['description'][:30]}"
-        choices.append(questionary.Choice(title=label, value=app))
-    
-    choices.append(questionary.Choice(title="Back", value="back"))
-
-    selected_app = questionary.select("Select an App:", choices=choices).ask()
-    
-    if selected_app == "back":
+    selected_app = pick_app("Select an App:")
+    if selected_app is None:
         return
 
     action = questionary.select(
@@ -271,6 +358,20 @@ def view_run_menu():
     if action_fn:
         action_fn(selected_app)
 
+def finish_saved_app(app_name, saved_path, user_query, lang_choice, color_scheme, architecture, extras):
+    metadata = {
+        "query": user_query,
+        "color_scheme": color_scheme,
+        "architecture": architecture,
+        "extras": extras
+    }
+    add_app_to_registry(app_name, user_query, lang_choice, saved_path, extras, metadata)
+
+    if Confirm.ask("Chat with Copilot about this app?"):
+        chat_with_copilot(saved_path, lang_choice)
+    elif Confirm.ask("Run now?"):
+        run_app({"name": app_name, "path": os.path.abspath(saved_path), "language": lang_choice})
+
 def save_generated_app(suggestion, user_query, lang_choice, color_scheme, is_complex, architecture, extras):
     console.print(Panel(Markdown(suggestion), border_style="green"))
     blocks = extract_code_blocks_with_filenames(suggestion)
@@ -278,48 +379,120 @@ def save_generated_app(suggestion, user_query, lang_choice, color_scheme, is_com
     if blocks:
         if Confirm.ask("Save this app?"):
             app_name = Prompt.ask("App Name", default=f"app_{int(time.time())}")
-            
-            os.makedirs(app_name, exist_ok=True)
-            saved_path = ""
-            
-            if is_complex or len(blocks) > 1:
-                for i, block in enumerate(blocks):
-                    fname = block['filename']
-                    if not fname:
-                        ext = ".txt"
-                        if "python" in block['language'].lower(): ext = ".py"
-                        elif "html" in block['language'].lower(): ext = ".html"
-                        fname = f"file_{i}{ext}"
-                    
-                    full_path = os.path.join(app_name, fname)
-                    with open(full_path, "w", encoding="utf-8") as f: f.write(block['code'])
-                    if i==0: saved_path = full_path
-            else:
-                # Single file
-                block = blocks[0]
-                ext = ".py"
-                if "html" in lang_choice.lower(): ext = ".html"
-                elif "c++" in lang_choice.lower(): ext = ".cpp"
-                fname = f"{app_name}{ext}"
-                full_path = os.path.join(app_name, fname)
-                with open(full_path, "w", encoding="utf-8") as f: f.write(block['code'])
-                saved_path = full_path
-            
-            metadata = {
-                "query": user_query,
-                "color_scheme": color_scheme,
-                "architecture": architecture,
-                "extras": extras
-            }
-            add_app_to_registry(app_name, user_query, lang_choice, saved_path, extras, metadata)
-            
-            if Confirm.ask("Chat with Copilot about this app?"):
-                chat_with_copilot(saved_path, lang_choice)
-            elif Confirm.ask("Run now?"):
-                run_app({"name": app_name, "path": os.path.abspath(saved_path), "language": lang_choice})
+            saved_path = write_app_blocks(app_name, blocks, lang_choice, is_complex)
+            finish_saved_app(app_name, saved_path, user_query, lang_choice, color_scheme, architecture, extras)
     else:
         console.print("[yellow]No code found in response.[/yellow]")
 
+def stream_generated_app(user_query, lang_choice, color_scheme, is_complex, architecture, extras):
+    """
+    Renders Copilot output as it arrives and writes each code block to a staging
+    directory as soon as its closing fence is seen.
+    """
+    staging_dir = state_path("staging", f"stream_{int(time.time() * 1000)}")
+    os.makedirs(staging_dir, exist_ok=True)
+    extractor = CodeBlockParser()
+    staged = []
+
+    def _stage(block):
+        fname = block_filename(block, len(staged), lang_choice)
+        write_app_file(staging_dir, fname, block['code'])
+        staged[:] = [item for item in staged if item["filename"] != fname]
+        staged.append({"filename": fname, "language": block['language']})
+        console.print(f"[green]>> Received {fname}[/green]")
+
+    console.rule("[green]Copilot (streaming)[/green]")
+    try:
+        for chunk in stream_copilot_suggestion(user_query, lang_choice, color_scheme, is_complex, architecture, extras):
+            console.print(chunk, end="", markup=False, highlight=False)
+            for block in extractor.feed(chunk):
+                _stage(block)
+        for block in extractor.close():
+            _stage(block)
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    finally:
+        console.rule()
+
+    try:
+        if not staged:
+            console.print("[yellow]No code found in response.[/yellow]")
+            return
+        if not Confirm.ask("Save this app?"):
+            return
+
+        app_name = Prompt.ask("App Name", default=f"app_{int(time.time())}")
+        os.makedirs(app_name, exist_ok=True)
+        single = not is_complex and len(staged) == 1
+        saved_path = ""
+        for i, item in enumerate(staged):
+            fname = block_filename(item, i, lang_choice, app_name) if single else item["filename"]
+            target = os.path.join(app_name, fname)
+            os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+            shutil.move(os.path.join(staging_dir, item["filename"]), target)
+            if i == 0: saved_path = target
+        finish_saved_app(app_name, saved_path, user_query, lang_choice, color_scheme, architecture, extras)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+def show_candidate_ranking(candidates):
+    table = Table(title="Ranked Candidates", show_header=True, header_style="bold magenta")
+    table.add_column("Rank", justify="right")
+    table.add_column("Candidate", justify="right")
+    table.add_column("Checks")
+    table.add_column("Errors", justify="right")
+    table.add_column("Warnings", justify="right")
+    table.add_column("Time s", justify="right")
+    table.add_column("Notes")
+    for rank, cand in enumerate(candidates, 1):
+        check = cand["check"]
+        if check is None:
+            style = "yellow" if cand["status"] == "cancelled" else "red"
+            table.add_row("-", str(cand["index"] + 1), f"[{style}]{escape(cand['status'][:60])}[/{style}]", "-", "-", "-", "")
+            continue
+        verdict = "[green]pass[/green]" if check["passed"] else "[red]fail[/red]"
+        if check["passed"] and not check["checked"]:
+            verdict += " [dim](compiler unavailable)[/dim]"
+        notes = (check["errors"] + check["warnings"])[:1]
+        table.add_row(
+            str(rank), str(cand["index"] + 1), verdict, str(len(check["errors"])), str(len(check["warnings"])),
+            f"{cand['latency']:.1f}", escape(notes[0][:70]) if notes else ""
+        )
+    console.print(table)
+
+def best_of_n_generation(user_query, lang_choice, color_scheme, is_complex, architecture, extras):
+    """
+    Generates several candidates concurrently, ranks them with local checks
+    and offers them best first. Returns the chosen suggestion or None.
+    """
+    count = ask_int("Number of candidates", min(max(DEFAULT_CANDIDATES, 1), MAX_CANDIDATES), 1, MAX_CANDIDATES)
+    with console.status(f"[cyan]Generating {count} candidates...[/cyan]", spinner="dots") as status:
+        arrived = []
+
+        def on_update(result):
+            arrived.append(result)
+            if result["check"] is not None:
+                verdict = "passes checks" if result["check"]["passed"] else f"{len(result['check']['errors'])} error(s)"
+                console.print(f"[dim]Candidate {result['index'] + 1}: {verdict} ({result['latency']:.1f}s)[/dim]")
+            status.update(f"[cyan]Generating candidates... ({len(arrived)}/{count} finished)[/cyan]")
+
+        candidates = generate_candidates(
+            user_query, lang_choice, color_scheme, is_complex, architecture, extras, count=max(1, count), on_update=on_update
+        )
+
+    show_candidate_ranking(candidates)
+    ranked = [cand for cand in candidates if cand["suggestion"]]
+    if not ranked:
+        raise CopilotError("No candidate was generated")
+    for cand in ranked:
+        blocks = extract_code_blocks_with_filenames(cand["suggestion"])
+        files = ", ".join(block_filename(block, i, lang_choice) for i, block in enumerate(blocks)) or "no code"
+        console.print(f"[bold]Candidate {cand['index'] + 1}[/bold]: {escape(files)}")
+        if Confirm.ask(f"Use candidate {cand['index'] + 1}?", default=True):
+            return cand["suggestion"]
+    return None
+
 def create_new_app():
     console.print("\n[bold green]Describe the app you want to create[/bold green]")
     user_query = Prompt.ask("Query")
@@ -328,7 +501,10 @@ def create_new_app():
     # Mode Selection
     mode = questionary.select(
         "Generation Mode:",
-        choices=["Standard (Single Copilot)", "Multi-Agent Simulation (Slower, Higher Quality)"]
+        choices=[
+            "Standard (Single Copilot)", "Standard (Streaming Output)", "Best-of-N (Ranked Candidates)",
+            "Multi-Agent Simulation (Slower, Higher Quality)",
+        ]
     ).ask()
     
     lang_choice = questionary.select("Select Language:", choices=["Python", "HTML", "C++"]).ask()
@@ -346,7 +522,12 @@ def create_new_app():
         if "Multi-Agent" in mode:
              # We use the simulation but we need to inject the specs into the query
              enhanced_query = f"{user_query} (Language: {lang_choice}, Arch: {architecture}, Style: {color_scheme})"
-             suggestion = multi_copilot_simulation(enhanced_query)
+             suggestion = multi_copilot_simulation(enhanced_query, lang_choice)
+        elif "Best-of-N" in mode:
+             suggestion = best_of_n_generation(user_query, lang_choice, color_scheme, is_complex, architecture, extras)
+        elif "Streaming" in mode:
+             stream_generated_app(user_query, lang_choice, color_scheme, is_complex, architecture, extras)
+             return
         else:
              suggestion = get_copilot_suggestion(user_query, lang_choice, color_scheme, is_complex, architecture, extras)
              
@@ -357,46 +538,69 @@ def create_new_app():
         console.print(f"[bold red]Copilot Error:[/bold red] {e}")
         return
 
-def refine_app():
-    registry = load_apps_registry()
-    if not registry:
-        console.print("[yellow]No apps found to refine.[/yellow]")
-        return
-        
-    choices = []
-    for app in registry:
-        label = f"{app['name']} ({app['language']}) - {app['description'][:30]}"
-        choices.append(questionary.Choice(title=label, value=app))
-    choices.append(questionary.Choice(title="Back", value="back"))
-    
-    selected_app = questionary.select("Select App to Refine:", choices=choices).ask()
-    
-    if selected_app == "back": return
-    
-    # Read existing code
+def refine_with_patch(selected_app, refinement_query):
+    """
+    Asks Copilot for unified diffs against the relevant files and applies them
+    locally. Returns False when the answer has no usable diff or it does not
+    apply, so the caller can fall back to a full rewrite.
+    """
+    app_path = selected_app["path"]
+    app_dir = app_root(app_path)
+    default_path = None if os.path.isdir(app_path) else os.path.basename(app_path)
+
+    code_content = build_context(app_path, query=refinement_query)
+    full_prompt = (
+        f"Here is the relevant code of an app:\n\n{code_content}\n\n"
+        f"User Request: {refinement_query}\n"
+        "Reply with the change as unified diffs in ```diff blocks: '--- a/<file>' and '+++ b/<file>' "
+        "headers using the file names above, '@@ -start,count +start,count @@' hunk headers and 3 lines "
+        "of unchanged context around each change. Use /dev/null as the old file for new files. "
+        "Do not repeat unchanged code."
+    )
+
     try:
-        code_content = ""
-        if os.path.isdir(selected_app["path"]):
-             files = [f for f in os.listdir(selected_app["path"]) if f.endswith(('.py', '.cpp', '.html', '.js', '.css'))]
-             for f in files:
-                 with open(os.path.join(selected_app["path"], f), 'r', encoding='utf-8') as fh:
-                     code_content += f"\n--- {f} ---\n{fh.read()}"
-        else:
-            with open(selected_app["path"], "r", encoding="utf-8") as f:
-                code_content = f.read()
+        suggestion = call_copilot(full_prompt, "Refining App (patch)...")
+    except CopilotError as e:
+        console.print(f"[red]Refinement failed: {e}[/red]")
+        return True
+
+    blocks = extract_code_blocks_with_filenames(suggestion or "")
+    try:
+        patches = patches_from_blocks(blocks, default_path)
+        if not patches:
+            console.print("[yellow]Copilot did not return a diff; falling back to a full rewrite.[/yellow]")
+            return False
+        planned = plan_patches(app_dir, patches)
+    except PatchError as e:
+        console.print(f"[yellow]Patch did not apply ({e}); falling back to a full rewrite.[/yellow]")
+        return False
+
+    for block in blocks:
+        if looks_like_diff(block["code"]):
+            console.print(Syntax(block["code"], "diff", theme="monokai"))
+
+    if Confirm.ask("Apply this patch?"):
+        for path in write_planned(planned):
+            verb = "Deleted" if planned[path] is None else "Updated"
+            console.print(f"[green]{verb} {os.path.relpath(path, app_dir)}[/green]")
+        if Confirm.ask("Run updated app?"):
+            run_app(selected_app)
+    return True
+
+def refine_with_rewrite(selected_app, refinement_query):
+    # Read existing code, ranked by relevance to the request
+    try:
+        code_content = build_context(selected_app["path"], query=refinement_query, budget_tokens=REFINE_TOKEN_BUDGET)
     except Exception as e:
         console.print(f"[red]Could not read app files: {e}[/red]")
         return
 
-    refinement_query = Prompt.ask("Describe the fix or new feature")
-    
-    # Auto Backup
-    create_backup(selected_app["path"])
-    
     full_prompt = (
         f"Here is the existing code for an app:\n\n```\n{code_content}\n```\n\n"
         f"User Request: {refinement_query}\n"
-        "Rewrite the code to incorporate this request. Return the full updated code in markdown blocks."
+        "Rewrite the code to incorporate this request. Return the full updated code in markdown blocks, "
+        "one block per changed file with its filename. Files marked (summary) are abbreviated: "
+        "only return them if you need to change them, and then in full."
     )
     
     try:
@@ -429,6 +633,73 @@ def refine_app():
     except CopilotError as e:
         console.print(f"[red]Refinement failed: {e}[/red]")
 
+def refine_app():
+    if not count_apps():
+        console.print("[yellow]No apps found to refine.[/yellow]")
+        return
+
+    selected_app = pick_app("Select App to Refine:")
+    if selected_app is None: return
+    
+    refinement_query = Prompt.ask("Describe the fix or new feature")
+
+    mode = questionary.select(
+        "Refinement mode:",
+        choices=["Patch (Unified Diff)", "Full Rewrite"]
+    ).ask()
+    if mode is None:
+        return
+
+    # Auto Backup
+    create_backup(selected_app["path"], label=f"before refine: {refinement_query[:60]}")
+
+    if mode == "Patch (Unified Diff)":
+        try:
+            if refine_with_patch(selected_app, refinement_query):
+                return
+        except Exception as e:
+            console.print(f"[yellow]Patch refinement failed ({e}); falling back to a full rewrite.[/yellow]")
+    refine_with_rewrite(selected_app, refinement_query)
+
+STATS_WINDOWS = {"Last hour": 3600, "Last 24 hours": 86400, "Last 7 days": 7 * 86400, "All recorded": None}
+
+def show_stats():
+    """
+    Latency percentiles per traced operation and prompt size, from the trace file.
+    """
+    window = questionary.select("Time window:", choices=list(STATS_WINDOWS)).ask()
+    if window is None:
+        return
+    seconds = STATS_WINDOWS[window]
+    spans = read_spans(since=time.time() - seconds if seconds else None)
+    if not spans:
+        console.print(f"[yellow]No traced operations in this window.[/yellow] [dim]({trace_path()})[/dim]")
+        return
+
+    table = Table(title=f"Latency by Operation ({window.lower()}, {len(spans)} spans)", show_header=True, header_style="bold magenta")
+    table.add_column("Operation", style="cyan")
+    table.add_column("Prompt size")
+    table.add_column("Count", justify="right")
+    table.add_column("Errors", justify="right")
+    table.add_column("p50 ms", justify="right")
+    table.add_column("p95 ms", justify="right")
+    table.add_column("p99 ms", justify="right")
+    table.add_column("Max ms", justify="right")
+    for row in latency_stats(spans):
+        errors = f"[red]{row['errors']}[/red]" if row["errors"] else "0"
+        table.add_row(
+            row["name"], row["prompt_size"], str(row["count"]), errors,
+            f"{row['p50']:.1f}", f"{row['p95']:.1f}", f"{row['p99']:.1f}", f"{row['max']:.1f}"
+        )
+    console.print(table)
+    interactive = sum(is_interactive(record) for record in spans)
+    if interactive:
+        console.print(f"[dim]{interactive} interactive app run(s) not included: they last as long as the app stays open.[/dim]")
+    console.print(f"[dim]Trace file: {trace_path()}[/dim]")
+    if Confirm.ask("Clear recorded traces?", default=False):
+        clear_traces()
+        console.print("[green]Traces cleared.[/green]")
+
 def main_menu():
     while True:
         menu_text = Text("Main Menu", style="bold white on blue", justify="center")
@@ -440,6 +711,7 @@ def main_menu():
                 "Create New App",
                 "View/Run Existing Apps",
                 "Refine/Fix Existing App",
+                "Stats",
                 "Exit"
             ]
         ).ask()
@@ -453,3 +725,5 @@ def main_menu():
             view_run_menu()
         elif choice == "Refine/Fix Existing App":
             refine_app()
+        elif choice == "Stats":
+            show_stats()
@@ -0,0 +1,81 @@
+import questionary
+from prompt_toolkit.completion import Completer, Completion
+from appgen.utils.console import console
+from appgen.core.search import get_search_index
+
+PAGE_SIZE = 15
+
+SEARCH = "__search__"
+NEXT_PAGE = "__next__"
+PREV_PAGE = "__prev__"
+BACK = "__back__"
+
+def app_label(app):
+    return f"{app['name']} ({app['language']}) - {app['description'][:30]}"
+
+class AppCompleter(Completer):
+    """
+    Search-as-you-type suggestions; only the top page of matches is rendered.
+    """
+
+    def __init__(self, index, limit=PAGE_SIZE):
+        self.index = index
+        self.limit = limit
+        self.by_label = {}
+
+    def get_completions(self, document, complete_event):
+        text = document.text_before_cursor
+        for app in self.index.search(text, limit=self.limit):
+            label = app_label(app)
+            self.by_label[label] = app
+            yield Completion(label, start_position=-len(text), display_meta=app.get("created_at", ""))
+
+def pick_app(message="Select an App:"):
+    """
+    Paginated, searchable app picker. Returns the chosen registry entry or None.
+    """
+    index = get_search_index()
+    if not len(index):
+        return None
+
+    query = ""
+    results = index.search(query)
+    page = 0
+    while True:
+        pages = max(1, (len(results) + PAGE_SIZE - 1) // PAGE_SIZE)
+        page = min(page, pages - 1)
+        visible = results[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+
+        choices = [questionary.Choice(title=app_label(app), value=app) for app in visible]
+        choices.append(questionary.Separator())
+        choices.append(questionary.Choice(title="Search...", value=SEARCH))
+        if page + 1 < pages:
+            choices.append(questionary.Choice(title="Next page", value=NEXT_PAGE))
+        if page > 0:
+            choices.append(questionary.Choice(title="Previous page", value=PREV_PAGE))
+        choices.append(questionary.Choice(title="Back", value=BACK))
+
+        status = f" [{len(results)} apps, page {page + 1}/{pages}"
+        status += f", filter '{query}']" if query else "]"
+        selection = questionary.select(message + status, choices=choices).ask()
+
+        if selection is None or selection == BACK:
+            return None
+        if selection == NEXT_PAGE:
+            page += 1
+        elif selection == PREV_PAGE:
+            page -= 1
+        elif selection == SEARCH:
+            completer = AppCompleter(index)
+            typed = questionary.autocomplete("Search apps:", choices=[], completer=completer).ask()
+            if typed is None:
+                continue
+            if typed in completer.by_label:
+                return completer.by_label[typed]
+            query = typed.strip()
+            results = index.search(query)
+            page = 0
+            if not results:
+                console.print(f"[yellow]No apps match '{query}'.[/yellow]")
+        else:
+            return selection
@@ -8,9 +8,32 @@ from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
 from rich.table import Table
 from appgen.utils.console import console
-from appgen.core.registry import load_apps_registry
+from appgen.core.registry import count_apps
+
+def show_status_table():
+    table = Table(title="System Status", show_header=True, header_style="bold magenta")
+    table.add_column("Module", style="cyan")
+    table.add_column("Status", style="green")
+    table.add_column("Details", style="yellow")
+    
+    # Get basic system info
+    os_info = f"{sys.platform} ({os.name})"
+    py_version = sys.version.split()[0]
+    gh_status = "Connected" if shutil.which("gh") else "Not Found"
+    
+    table.add_row("Operating System", "ONLINE", os_info)
+    table.add_row("Python Environment", "ONLINE", f"v{py_version}")
+    table.add_row("GitHub Copilot CLI", "ACTIVE" if "Connected" in gh_status else "ERROR", gh_status)
+    table.add_row("App Registry", "LOADED", f"{count_apps()} apps")
+    
+    console.print(table)
+
+def show_splash_screen(quick=False):
+    if quick:
+        # No animation and no sleeps: straight to the status table
+        show_status_table()
+        return
 
-def show_splash_screen():
     console.clear()
     
     # Advanced System Boot Simulation
@@ -38,22 +61,6 @@ def show_splash_screen():
                 progress.update(task3, advance=random.randint(3, 6))
             time.sleep(0.05)
             
-    # System Status Table
-    table = Table(title="System Status", show_header=True, header_style="bold magenta")
-    table.add_column("Module", style="cyan")
-    table.add_column("Status", style="green")
-    table.add_column("Details", style="yellow")
-    
-    # Get basic system info
-    os_info = f"{sys.platform} ({os.name})"
-    py_version = sys.version.split()[0]
-    gh_status = "Connected" if shutil.which("gh") else "Not Found"
-    
-    table.add_row("Operating System", "ONLINE", os_info)
-    table.add_row("Python Environment", "ONLINE", f"v{py_version}")
-    table.add_row("GitHub Copilot CLI", "ACTIVE" if "Connected" in gh_status else "ERROR", gh_status)
-    table.add_row("App Registry", "LOADED", f"{len(load_apps_registry())} apps")
-    
-    console.print(table)
+    show_status_table()
     console.print("\n[bold green]>> SYSTEM READY. WAITING FOR INPUT...[/bold green]\n")
     time.sleep(1)
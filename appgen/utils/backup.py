@@ -1,18 +1,18 @@
-
-import os
-import shutil
-import time
 from appgen.utils.console import console
+from appgen.utils.snapshots import create_snapshot
 
-def create_backup(app_path):
+def create_backup(app_path, label=""):
+    """
+    Snapshots the app's folder into the deduplicating store under .prompt2app/snapshots.
+    Only files that changed since the last snapshot are read and stored.
+    """
     try:
-        if os.path.isdir(app_path):
-            backup_name = f"{app_path}_backup_{int(time.time())}"
-            shutil.copytree(app_path, backup_name)
-            console.print(f"[green]Backup created: {backup_name}[/green]")
+        snapshot = create_snapshot(app_path, label)
+        if snapshot["unchanged"]:
+            console.print(f"[green]Backup up to date: {snapshot['id']}[/green]")
         else:
-            backup_name = f"{app_path}.bak_{int(time.time())}"
-            shutil.copy(app_path, backup_name)
-            console.print(f"[green]Backup created: {backup_name}[/green]")
+            console.print(f"[green]Backup created: {snapshot['id']} ({snapshot['new_bytes'] / 1024:.1f} KB new data)[/green]")
+        return snapshot
     except Exception as e:
         console.print(f"[red]Backup failed: {e}[/red]")
+        return None
@@ -0,0 +1,254 @@
+import fnmatch
+import hashlib
+import json
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from rich.markup import escape
+from rich.table import Table
+from appgen.utils.console import console
+from appgen.utils.filesystem import STATE_DIR, app_root, state_path
+
+EXPORT_INDEX_DIR = "export_index"
+DEFAULT_EXCLUDES = (
+    "__pycache__", "*.pyc", "*.pyo", ".git", ".venv", "venv", "node_modules", STATE_DIR,
+    "*_backup_*", "*.bak_*", "build", "*.o", "*.obj", "*.exe", ".DS_Store",
+)
+# Formats that are already compressed; deflating them again only costs time
+STORED_EXTENSIONS = {
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".whl", ".jar", ".png", ".jpg", ".jpeg", ".gif",
+    ".webp", ".mp3", ".mp4", ".ogg", ".webm", ".woff", ".woff2", ".pdf",
+}
+COMPRESS_LEVEL = 6
+# Files at least this large are compressed on worker threads (zlib releases the GIL)
+PARALLEL_MIN_BYTES = 256 * 1024
+
+# 1980-01-01 00:00:00, the earliest DOS timestamp: every entry gets it so archives are reproducible
+ZIP_EPOCH_TIME, ZIP_EPOCH_DATE = 0, (1 << 5) | 1
+ZIP_UTF8_FLAG = 0x800
+ZIP_VERSION = 20
+ZIP_MADE_BY = (3 << 8) | ZIP_VERSION  # Unix, so permission bits are kept
+LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+END_RECORD = struct.Struct("<IHHHHIIH")
+
+def is_excluded(rel, excludes):
+    """
+    True when the path or any of its folders matches an exclude glob.
+    """
+    rel = rel.replace(os.sep, "/")
+    parts = rel.split("/")
+    for pattern in excludes:
+        if fnmatch.fnmatch(rel, pattern) or any(fnmatch.fnmatch(part, pattern) for part in parts):
+            return True
+    return False
+
+def collect_entries(app_path, excludes=DEFAULT_EXCLUDES):
+    """
+    Returns [(arcname, path)] sorted by arcname. Entries live under the app's
+    folder name, like the original export.
+    """
+    if os.path.isfile(app_path):
+        return [(os.path.basename(app_path), app_path)]
+    prefix = os.path.basename(os.path.normpath(app_path))
+    entries = []
+    for root, dirs, names in os.walk(app_path):
+        rel_root = os.path.relpath(root, app_path)
+        dirs[:] = [d for d in dirs if not is_excluded(os.path.normpath(os.path.join(rel_root, d)), excludes)]
+        for name in names:
+            rel = os.path.normpath(os.path.join(rel_root, name))
+            if not is_excluded(rel, excludes):
+                entries.append((f"{prefix}/{rel.replace(os.sep, '/')}", os.path.join(root, name)))
+    entries.sort()
+    return entries
+
+def _index_path(app_path):
+    key = hashlib.sha256(os.path.abspath(app_path).encode("utf-8")).hexdigest()[:16]
+    return state_path(EXPORT_INDEX_DIR, f"{key}.json")
+
+def _load_index(app_path):
+    try:
+        with open(_index_path(app_path), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        stat = os.stat(index["archive"])
+        if (stat.st_size, stat.st_mtime_ns) != tuple(index["archive_stat"]):
+            return None
+        return index
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def _compress(path, level):
+    with open(path, "rb") as f:
+        data = f.read()
+    crc = zlib.crc32(data)
+    if os.path.splitext(path)[1].lower() not in STORED_EXTENSIONS and data:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        packed = compressor.compress(data) + compressor.flush()
+        if len(packed) < len(data):
+            return 8, crc, len(data), packed
+    return 0, crc, len(data), data
+
+def _reused(previous, arcname, stat, source):
+    entry = (previous or {}).get("entries", {}).get(arcname)
+    if not entry or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+        return None
+    source.seek(entry["data_offset"])
+    packed = source.read(entry["compressed_size"])
+    if len(packed) != entry["compressed_size"]:
+        return None
+    return entry["method"], entry["crc"], entry["size"], packed
+
+def write_zip(app_path, zip_path, excludes=DEFAULT_EXCLUDES, level=COMPRESS_LEVEL, workers=None, incremental=True):
+    """
+    Writes a byte-reproducible ZIP of an app's folder and returns a stats dict.
+
+    Entries are sorted and carry a fixed timestamp and permissions from the
+    file mode, so identical inputs give identical archives. Already-compressed
+    formats are stored; large files are deflated on worker threads while the
+    archive is streamed to disk in order. With `incremental`, entries of
+    unchanged files (same size and mtime) are copied from the previous export's
+    archive without recompressing.
+    """
+    app_path = app_root(app_path)
+    entries = collect_entries(app_path, excludes)
+    previous = _load_index(app_path) if incremental else None
+    stats = {"path": zip_path, "files": len(entries), "bytes_in": 0, "bytes_out": 0, "reused": 0, "stored": 0, "seconds": 0.0}
+    started = time.perf_counter()
+
+    tmp_path = f"{zip_path}.tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(zip_path)), exist_ok=True)
+    index_entries, central = {}, []
+    source = open(previous["archive"], "rb") if previous else None
+    try:
+        with open(tmp_path, "wb") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+            # Small files are compressed inline; large ones are started on the pool
+            # ahead of time, and the writer collects them in archive order
+            jobs = []
+            for arcname, path in entries:
+                stat = os.stat(path)
+                reused = _reused(previous, arcname, stat, source) if source else None
+                if reused:
+                    jobs.append((arcname, stat, reused, True))
+                elif stat.st_size >= PARALLEL_MIN_BYTES:
+                    jobs.append((arcname, stat, pool.submit(_compress, path, level), False))
+                else:
+                    jobs.append((arcname, stat, (path,), False))
+
+            for arcname, stat, job, was_reused in jobs:
+                if was_reused:
+                    method, crc, size, packed = job
+                    stats["reused"] += 1
+                elif isinstance(job, tuple):
+                    method, crc, size, packed = _compress(job[0], level)
+                else:
+                    method, crc, size, packed = job.result()
+                if method == 0:
+                    stats["stored"] += 1
+
+                name = arcname.encode("utf-8")
+                offset = out.tell()
+                out.write(LOCAL_HEADER.pack(
+                    0x04034B50, ZIP_VERSION, ZIP_UTF8_FLAG, method, ZIP_EPOCH_TIME, ZIP_EPOCH_DATE,
+                    crc, len(packed), size, len(name), 0
+                ))
+                out.write(name)
+                data_offset = out.tell()
+                out.write(packed)
+
+                mode = 0o755 if stat.st_mode & 0o111 else 0o644
+                central.append(CENTRAL_HEADER.pack(
+                    0x02014B50, ZIP_MADE_BY, ZIP_VERSION, ZIP_UTF8_FLAG, method, ZIP_EPOCH_TIME, ZIP_EPOCH_DATE,
+                    crc, len(packed), size, len(name), 0, 0, 0, 0, (0o100000 | mode) << 16, offset
+                ) + name)
+                index_entries[arcname] = {
+                    "size": size, "mtime_ns": stat.st_mtime_ns, "crc": crc, "method": method,
+                    "compressed_size": len(packed), "data_offset": data_offset,
+                }
+                stats["bytes_in"] += size
+
+            cd_offset = out.tell()
+            for record in central:
+                out.write(record)
+            cd_size = out.tell() - cd_offset
+            if cd_offset + cd_size > 0xFFFFFFFF or len(central) > 0xFFFF:
+                raise ValueError("App is too large for a ZIP archive without ZIP64 support.")
+            out.write(END_RECORD.pack(0x06054B50, 0, 0, len(central), len(central), cd_size, cd_offset, 0))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        if source:
+            source.close()
+
+    os.replace(tmp_path, zip_path)
+    archive_stat = os.stat(zip_path)
+    with open(_index_path(app_path), "w", encoding="utf-8") as f:
+        json.dump({
+            "archive": os.path.abspath(zip_path),
+            "archive_stat": [archive_stat.st_size, archive_stat.st_mtime_ns],
+            "entries": index_entries,
+        }, f)
+    stats["bytes_out"] = archive_stat.st_size
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+def _format_stats(stats):
+    return (
+        f"{stats['files']} file(s), {stats['bytes_in'] / 1024:.1f} KB -> {stats['bytes_out'] / 1024:.1f} KB, "
+        f"{stats['reused']} reused, {stats['stored']} stored, {stats['seconds']:.2f}s"
+    )
+
+def export_app_zip(app_path, zip_path=None, excludes=DEFAULT_EXCLUDES):
+    try:
+        zip_name = zip_path or f"app_export_{int(time.time())}.zip"
+        stats = write_zip(app_path, zip_name, excludes)
+        console.print(f"[green]App exported to {zip_name}[/green] [dim]({_format_stats(stats)})[/dim]")
+        return stats
+    except Exception as e:
+        console.print(f"[red]Export failed: {e}[/red]")
+        return None
+
+def export_apps_bulk(apps, out_dir, excludes=DEFAULT_EXCLUDES, workers=None):
+    """
+    Exports many apps into out_dir/<app name>.zip, several at a time. Stable
+    names let every run reuse the entries of the previous one.
+    Returns [(app, stats or error string)].
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    used, jobs = set(), []
+    for app in apps:
+        base = "".join(c if c.isalnum() or c in "-_." else "_" for c in app["name"]) or "app"
+        name, n = base, 2
+        while name in used:
+            name, n = f"{base}_{n}", n + 1
+        used.add(name)
+        jobs.append((app, os.path.join(out_dir, f"{name}.zip")))
+
+    def _export(job):
+        app, zip_path = job
+        if not os.path.exists(app["path"]):
+            return app, "missing"
+        try:
+            # Threads inside one archive would compete with the other exports
+            return app, write_zip(app["path"], zip_path, excludes, workers=1)
+        except Exception as e:
+            return app, str(e)
+
+    with console.status(f"[cyan]Exporting {len(jobs)} app(s)...[/cyan]", spinner="dots"):
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_export, jobs))
+
+    table = Table(title="Bulk Export", show_header=True, header_style="bold magenta")
+    table.add_column("App", style="cyan")
+    table.add_column("Archive")
+    table.add_column("Result")
+    for (app, result), (_, zip_path) in zip(results, jobs):
+        if isinstance(result, dict):
+            table.add_row(app["name"], zip_path, f"[green]{_format_stats(result)}[/green]")
+        else:
+            table.add_row(app["name"], zip_path, f"[red]{escape(result)}[/red]")
+    console.print(table)
+    return results
@@ -1,20 +1,74 @@
-
 import os
-import zipfile
-import time
-from appgen.utils.console import console
-
-def export_app_zip(app_path):
-    try:
-        zip_name = f"app_export_{int(time.time())}.zip"
-        with zipfile.ZipFile(zip_name, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            if os.path.isdir(app_path):
-                for root, dirs, files in os.walk(app_path):
-                    for file in files:
-                        zipf.write(os.path.join(root, file), 
-                                   os.path.relpath(os.path.join(root, file), os.path.join(app_path, '..')))
-            else:
-                zipf.write(app_path, os.path.basename(app_path))
-        console.print(f"[green]App exported to {zip_name}[/green]")
-    except Exception as e:
-        console.print(f"[red]Export failed: {e}[/red]")
+
+# Workspace directory for Prompt2App's own caches and state
+STATE_DIR = ".prompt2app"
+
+def state_path(*parts):
+    """
+    Returns a path inside the state directory, creating its parent folders.
+    """
+    path = os.path.join(STATE_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+# Folders that never belong to an app's own sources
+SKIP_DIRS = {"__pycache__", ".git", ".venv", "venv", "env", "node_modules", "build", STATE_DIR}
+
+def app_root(app_path):
+    """
+    The folder holding an app. Registry entries point at the app's entry
+    file, but the app is everything in that file's folder.
+    """
+    return app_path if os.path.isdir(app_path) else os.path.dirname(os.path.abspath(app_path))
+
+def iter_app_files(app_path, extensions=None):
+    """
+    Yields the files of an app recursively in a stable order, skipping
+    caches, virtualenvs and backup folders. A file path yields just that file.
+    """
+    if os.path.isfile(app_path):
+        if extensions is None or app_path.endswith(tuple(extensions)):
+            yield app_path
+        return
+    for root, dirs, names in os.walk(app_path):
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS and "_backup_" not in d)
+        for name in sorted(names):
+            if extensions is None or name.endswith(tuple(extensions)):
+                yield os.path.join(root, name)
+
+def block_filename(block, index, lang_choice, app_name=None):
+    """
+    Picks the file name for a generated code block.
+    Passing app_name names a single-file app after the app itself.
+    """
+    if app_name:
+        ext = ".py"
+        if "html" in lang_choice.lower(): ext = ".html"
+        elif "c++" in lang_choice.lower(): ext = ".cpp"
+        return f"{app_name}{ext}"
+
+    fname = block['filename']
+    if not fname:
+        ext = ".txt"
+        if "python" in block['language'].lower(): ext = ".py"
+        elif "html" in block['language'].lower(): ext = ".html"
+        fname = f"file_{index}{ext}"
+    return fname
+
+def write_app_file(app_dir, fname, code):
+    full_path = os.path.join(app_dir, fname)
+    os.makedirs(os.path.dirname(full_path) or ".", exist_ok=True)
+    with open(full_path, "w", encoding="utf-8") as f:
+        f.write(code)
+    return full_path
+
+def write_app_blocks(app_name, blocks, lang_choice, is_complex, app_dir=None):
+    """
+    Writes extracted code blocks into the app directory and returns the entry file path.
+    """
+    app_dir = app_dir or app_name
+    os.makedirs(app_dir, exist_ok=True)
+    if is_complex or len(blocks) > 1:
+        paths = [write_app_file(app_dir, block_filename(block, i, lang_choice), block['code']) for i, block in enumerate(blocks)]
+        return paths[0]
+    return write_app_file(app_dir, block_filename(blocks[0], 0, lang_choice, app_name), blocks[0]['code'])
@@ -1,76 +1,435 @@
-
 import ast
+import hashlib
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor
+from rich.markup import escape
 from rich.panel import Panel
 from rich.prompt import Confirm
 from appgen.utils.console import console
+from appgen.utils.filesystem import state_path, app_root, iter_app_files
 
 DANGEROUS_CALLS = {"eval", "exec", "os.system", "subprocess.Popen", "subprocess.call", "subprocess.run"}
 
+HEALTH_CACHE_FILE = "health_cache.json"
+HEALTH_CACHE_MAX_ENTRIES = 5000
+# Bump when rules change so cached findings are recomputed
+ANALYZER_VERSION = 3
+# Fan out to a process pool only when there is enough work to pay for the workers
+PARALLEL_MIN_FILES = 24
+PARALLEL_MIN_BYTES = 1024 * 1024
+
+SEVERITY_ORDER = {"error": 0, "warning": 1, "info": 2}
+SEVERITY_STYLES = {"error": "bold red", "warning": "yellow", "info": "dim"}
+
+def make_finding(rule, severity, message, line=None, file=None):
+    return {"file": file, "line": line, "rule": rule, "severity": severity, "message": message}
+
+def dotted_name(node):
+    """
+    'os.system' for os.system(...), 'eval' for eval(...), None for dynamic callees.
+    """
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+        return ".".join(reversed(parts))
+    return None
+
+class HealthVisitor(ast.NodeVisitor):
+    """
+    Collects every health finding in a single pass over the tree.
+    """
+
+    def __init__(self):
+        self.findings = []
+        self.import_count = 0
+
+    def visit_Import(self, node):
+        self.import_count += 1
+        self.generic_visit(node)
+
+    def visit_ImportFrom(self, node):
+        if node.module:
+            self.import_count += 1
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        name = dotted_name(node.func)
+        if name and (name in DANGEROUS_CALLS or name.split(".")[-1] in DANGEROUS_CALLS):
+            self.findings.append(make_finding("dangerous-call", "warning", f"Dangerous call detected: {name}", node.lineno))
+        self.generic_visit(node)
+
+    def _check_function(self, node):
+        if len(node.body) == 1 and isinstance(node.body[0], ast.Pass):
+            self.findings.append(make_finding("empty-function", "info", f"Function '{node.name}' is empty (pass).", node.lineno))
+        self.generic_visit(node)
+
+    visit_FunctionDef = _check_function
+    visit_AsyncFunctionDef = _check_function
+
 def detect_dangerous_calls(tree):
+    visitor = HealthVisitor()
+    visitor.visit(tree)
+    return [f["message"] for f in visitor.findings if f["rule"] == "dangerous-call"]
+
+def analyze_python_source(source):
+    """
+    Returns the findings for one Python source (without file names).
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        return [make_finding("syntax-error", "error", f"Syntax Error - {e}", e.lineno)]
+
+    visitor = HealthVisitor()
+    visitor.visit(tree)
+    findings = visitor.findings
+    if not visitor.import_count:
+        findings.insert(0, make_finding("no-imports", "info", "No imports found (might be okay for simple scripts)."))
+    return findings
+
+def _analyze_blob(raw):
+    return analyze_python_source(raw.decode("utf-8", errors="replace"))
+
+def _load_cache():
+    try:
+        with open(state_path(HEALTH_CACHE_FILE), "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if cache.get("version") == ANALYZER_VERSION else {"version": ANALYZER_VERSION, "entries": {}}
+    except (OSError, ValueError, AttributeError):
+        return {"version": ANALYZER_VERSION, "entries": {}}
+
+def _save_cache(cache):
+    entries = cache["entries"]
+    # Dicts keep insertion order, so the oldest entries go first
+    while len(entries) > HEALTH_CACHE_MAX_ENTRIES:
+        del entries[next(iter(entries))]
+    try:
+        with open(state_path(HEALTH_CACHE_FILE), "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+    except OSError:
+        pass
+
+def _analyze_files(app_path, analyze, kind, use_cache=True, workers=None):
+    """
+    Runs `analyze(raw_bytes)` on every Python file of an app and returns the
+    findings with app-relative file names. Per-file results are cached by
+    analyzer kind and content hash; large uncached sets go to a process pool.
+    """
+    base = app_root(app_path)
+    files = list(iter_app_files(base, (".py",)))
+    cache = _load_cache() if use_cache else {"version": ANALYZER_VERSION, "entries": {}}
+    entries = cache["entries"]
+
+    per_file, todo = {}, []
+    for path in files:
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+        except OSError as e:
+            per_file[path] = [make_finding("unreadable", "error", f"Could not read file: {e}")]
+            continue
+        key = f"{kind}:{hashlib.sha256(raw).hexdigest()}"
+        if key in entries:
+            per_file[path] = entries[key]
+        else:
+            todo.append((path, key, raw))
+
+    if todo:
+        blobs = [raw for _, _, raw in todo]
+        if len(todo) >= PARALLEL_MIN_FILES or sum(map(len, blobs)) >= PARALLEL_MIN_BYTES:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(analyze, blobs, chunksize=max(1, len(blobs) // 32)))
+        else:
+            results = [analyze(raw) for raw in blobs]
+        for (path, key, _), findings in zip(todo, results):
+            per_file[path] = findings
+            entries[key] = findings
+        if use_cache:
+            _save_cache(cache)
+
+    findings = []
+    for path in files:
+        rel = os.path.relpath(path, base)
+        for item in per_file.get(path, []):
+            findings.append({**item, "file": rel})
+    return findings
+
+def analyze_app_health(app_path, language, use_cache=True, workers=None):
+    """
+    Health findings for every Python file of an app (recursively), as a list
+    of {file, line, rule, severity, message} dicts.
+    """
+    if language.lower() != "python":
+        return []
+    return _analyze_files(app_path, _analyze_blob, "health", use_cache, workers)
+
+# Performance rules: id -> default severity and a short description.
+# Override per rule in .prompt2app/perf_rules.json, e.g.
+# {"string-concat-in-loop": false, "list-pop-front": {"severity": "error"}}
+PERF_RULES = {
+    "uncached-load": {"severity": "warning", "description": "Expensive load in a Streamlit script without @st.cache_data/@st.cache_resource"},
+    "string-concat-in-loop": {"severity": "info", "description": "String built with += inside a loop"},
+    "nested-loop-same-collection": {"severity": "warning", "description": "Nested loops over the same collection (quadratic)"},
+    "list-pop-front": {"severity": "warning", "description": "list.pop(0) / insert(0, ...) used as a queue"},
+    "file-read-in-callback": {"severity": "warning", "description": "File read inside a UI callback, repeated on every event"},
+}
+PERF_RULES_FILE = "perf_rules.json"
+
+# Calls that load data, models or remote resources
+EXPENSIVE_LOADS = {
+    "read_csv", "read_excel", "read_json", "read_parquet", "read_sql", "read_table", "read_feather",
+    "load_dataset", "from_pretrained", "load_model", "requests.get", "requests.post", "urlopen",
+    "sqlite3.connect", "create_engine", "torch.load", "joblib.load", "pickle.load", "np.load",
+    "numpy.load", "np.loadtxt", "numpy.loadtxt", "json.load", "yaml.safe_load",
+}
+FILE_READS = {
+    "open", "read_text", "read_bytes", "read_csv", "read_excel", "read_json", "read_parquet",
+    "json.load", "pickle.load", "yaml.safe_load", "np.load", "numpy.load", "np.loadtxt", "numpy.loadtxt",
+}
+CACHE_DECORATORS = {"cache_data", "cache_resource", "cache", "experimental_memo", "experimental_singleton", "memo", "singleton", "lru_cache"}
+CALLBACK_KEYWORDS = {"on_click", "on_change", "on_submit", "command"}
+
+def _matches(name, names):
+    return name is not None and (name in names or name.split(".")[-1] in names)
+
+def _loop_target(node):
+    """
+    The collection a loop really iterates: x for `x`, `enumerate(x)` and `range(len(x))`.
+    """
+    if isinstance(node, ast.Call) and node.args:
+        name = dotted_name(node.func)
+        if name == "enumerate":
+            return _loop_target(node.args[0])
+        if name == "range" and len(node.args) == 1:
+            inner = node.args[0]
+            if isinstance(inner, ast.Call) and dotted_name(inner.func) == "len" and inner.args:
+                return _loop_target(inner.args[0])
+    return ast.dump(node)
+
+def _is_stringish(node):
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, str)
+    if isinstance(node, ast.JoinedStr):
+        return True
+    if isinstance(node, ast.Call):
+        return dotted_name(node.func) == "str"
+    if isinstance(node, ast.BinOp):
+        return _is_stringish(node.left) or _is_stringish(node.right)
+    return False
+
+class PerformanceVisitor(ast.NodeVisitor):
+    """
+    Collects performance findings for every rule in a single pass.
+    Rule configuration is applied afterwards, so results can be cached.
+    """
+
+    def __init__(self):
+        self.findings = []
+        self.uses_streamlit = False
+        self._loops = []
+        self._functions = []
+        self._string_names = [set()]
+        self._uncached_loads = []
+        self._reads_by_function = {}
+        self._callbacks = set()
+
+    def _add(self, rule, line, message):
+        self.findings.append(make_finding(rule, PERF_RULES[rule]["severity"], message, line))
+
+    def visit_Import(self, node):
+        if any(alias.name.split(".")[0] == "streamlit" for alias in node.names):
+            self.uses_streamlit = True
+        self.generic_visit(node)
+
+    def visit_ImportFrom(self, node):
+        if node.module and node.module.split(".")[0] == "streamlit":
+            self.uses_streamlit = True
+        self.generic_visit(node)
+
+    def _visit_function(self, node):
+        cached = any(
+            _matches(dotted_name(d.func if isinstance(d, ast.Call) else d), CACHE_DECORATORS)
+            for d in node.decorator_list
+        )
+        self._functions.append((node.name, cached))
+        self._string_names.append(set())
+        loops, self._loops = self._loops, []
+        self.generic_visit(node)
+        self._loops = loops
+        self._string_names.pop()
+        self._functions.pop()
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def _visit_loop(self, node):
+        if isinstance(node, (ast.For, ast.AsyncFor)):
+            target = _loop_target(node.iter)
+            if target in self._loops:
+                self._add("nested-loop-same-collection", node.lineno,
+                          "Nested loop over the same collection; consider a set/dict lookup or itertools.combinations.")
+            self.visit(node.iter)
+            self._loops.append(target)
+            for stmt in node.body + node.orelse:
+                self.visit(stmt)
+            self._loops.pop()
+        else:
+            self.visit(node.test)
+            self._loops.append(None)
+            for stmt in node.body + node.orelse:
+                self.visit(stmt)
+            self._loops.pop()
+
+    visit_For = _visit_loop
+    visit_AsyncFor = _visit_loop
+    visit_While = _visit_loop
+
+    def visit_Assign(self, node):
+        if _is_stringish(node.value):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    self._string_names[-1].add(target.id)
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node):
+        if self._loops and isinstance(node.op, ast.Add) and isinstance(node.target, ast.Name):
+            if node.target.id in self._string_names[-1] or _is_stringish(node.value):
+                self._add("string-concat-in-loop", node.lineno,
+                          f"'{node.target.id}' is built with += in a loop; collect parts in a list and ''.join() them.")
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        name = dotted_name(node.func)
+        if isinstance(node.func, ast.Attribute) and node.args:
+            first = node.args[0]
+            is_zero = isinstance(first, ast.Constant) and first.value == 0 and not isinstance(first.value, bool)
+            if is_zero and node.func.attr in ("pop", "insert") and len(node.args) == (1 if node.func.attr == "pop" else 2):
+                self._add("list-pop-front", node.lineno,
+                          f".{node.func.attr}(0) on a list is O(n); use collections.deque (popleft/appendleft).")
+
+        if _matches(name, EXPENSIVE_LOADS) and not any(cached for _, cached in self._functions):
+            self._uncached_loads.append((node.lineno, name))
+        if _matches(name, FILE_READS) and self._functions:
+            self._reads_by_function.setdefault(self._functions[-1][0], []).append((node.lineno, name))
+
+        for keyword in node.keywords:
+            if keyword.arg in CALLBACK_KEYWORDS and isinstance(keyword.value, ast.Name):
+                self._callbacks.add(keyword.value.id)
+        # widget.bind("<Event>", handler)
+        if isinstance(node.func, ast.Attribute) and node.func.attr == "bind" and len(node.args) >= 2:
+            if isinstance(node.args[1], ast.Name):
+                self._callbacks.add(node.args[1].id)
+        self.generic_visit(node)
+
+    def finish(self):
+        if self.uses_streamlit:
+            for line, name in self._uncached_loads:
+                self._add("uncached-load", line,
+                          f"{name}() runs on every Streamlit rerun; move it into a function decorated with @st.cache_data or @st.cache_resource.")
+        for callback in sorted(self._callbacks):
+            for line, name in self._reads_by_function.get(callback, []):
+                self._add("file-read-in-callback", line,
+                          f"{name}() inside callback '{callback}' reads from disk on every event; load once and reuse.")
+        self.findings.sort(key=lambda f: f["line"] or 0)
+        return self.findings
+
+def analyze_python_performance(source):
+    """
+    Returns the performance findings for one Python source, for every rule.
+    Files that do not parse have none; the health check reports them.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return []
+    visitor = PerformanceVisitor()
+    visitor.visit(tree)
+    return visitor.finish()
+
+def _analyze_perf_blob(raw):
+    return analyze_python_performance(raw.decode("utf-8", errors="replace"))
+
+def load_perf_rules():
+    """
+    Rule settings: the defaults merged with .prompt2app/perf_rules.json, where a
+    rule maps to false (disabled) or to {"enabled": ..., "severity": ...}.
+    """
+    rules = {rule: {"enabled": True, **settings} for rule, settings in PERF_RULES.items()}
+    try:
+        with open(state_path(PERF_RULES_FILE), "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+    except (OSError, ValueError):
+        return rules
+    for rule, override in overrides.items():
+        if rule not in rules:
+            continue
+        if isinstance(override, bool):
+            rules[rule]["enabled"] = override
+        elif isinstance(override, dict):
+            rules[rule].update({k: v for k, v in override.items() if k in ("enabled", "severity")})
+    return rules
+
+def analyze_app_performance(app_path, language, rules=None, use_cache=True, workers=None):
+    """
+    Performance findings for every Python file in the app's folder
+    (recursively, whichever file app_path names), filtered and re-graded
+    according to `rules` (see load_perf_rules).
+    """
+    if language.lower() != "python":
+        return []
+    rules = rules or load_perf_rules()
     findings = []
-    for node in ast.walk(tree):
-        if isinstance(node, ast.Call):
-            name = ""
-            if isinstance(node.func, ast.Name):
-                name = node.func.id
-            elif isinstance(node.func, ast.Attribute):
-                name = node.func.attr # This might catch 'system' in 'os.system'
-                # Better check for full path if possible, but simple name check is a start
-            
-            # Simple check for direct usage or attribute usage
-            # This is heuristic.
-            if name in DANGEROUS_CALLS:
-                findings.append(f"Dangerous call detected: {name}")
+    for item in _analyze_files(app_path, _analyze_perf_blob, "perf", use_cache, workers):
+        settings = rules.get(item["rule"])
+        if settings and settings.get("enabled", True):
+            findings.append({**item, "severity": settings.get("severity", item["severity"])})
     return findings
 
+def format_finding(item):
+    location = item["file"] or ""
+    if item.get("line"):
+        location += f":{item['line']}"
+    return f"{location}: {item['message']}" if location else item["message"]
+
+def show_findings(findings, title, passed_title, passed_message):
+    if findings:
+        findings = sorted(findings, key=lambda f: (SEVERITY_ORDER.get(f["severity"], 9), f["file"] or "", f["line"] or 0))
+        lines = [
+            f"[{SEVERITY_STYLES.get(f['severity'], 'white')}]{f['severity'].upper():7}[/] {escape(format_finding(f))}"
+            for f in findings
+        ]
+        console.print(Panel("\n".join(lines), title=title, border_style="red"))
+    else:
+        console.print(Panel(passed_message, title=passed_title, border_style="green"))
+
 def perform_health_check(app_path, language):
     console.print("[bold]Running Health Check...[/bold]")
-    issues = []
-    
+    findings = []
     try:
-        if language.lower() == "python":
-            files = []
-            if os.path.isdir(app_path):
-                files = [os.path.join(app_path, f) for f in os.listdir(app_path) if f.endswith(".py")]
-            elif app_path.endswith(".py"):
-                files = [app_path]
-                
-            for file_p in files:
-                with open(file_p, "r", encoding="utf-8") as f:
-                    code = f.read()
-                try:
-                    tree = ast.parse(code)
-                    
-                    # Check imports
-                    imports = [node.names[0].name for node in ast.walk(tree) if isinstance(node, ast.Import)]
-                    from_imports = [node.module for node in ast.walk(tree) if isinstance(node, ast.ImportFrom) if node.module]
-                    all_imports = imports + from_imports
-                    
-                    if not all_imports:
-                        issues.append(f"{os.path.basename(file_p)}: No imports found (might be okay for simple scripts).")
-                    
-                    # Check dangerous calls
-                    dang = detect_dangerous_calls(tree)
-                    for d in dang:
-                        issues.append(f"{os.path.basename(file_p)}: {d}")
-
-                    # Check for empty functions
-                    for node in ast.walk(tree):
-                        if isinstance(node, ast.FunctionDef):
-                            if len(node.body) == 1 and isinstance(node.body[0], ast.Pass):
-                                issues.append(f"{os.path.basename(file_p)}: Function '{node.name}' is empty (pass).")
-                                
-                except SyntaxError as e:
-                    issues.append(f"{os.path.basename(file_p)}: Syntax Error - {e}")
-                    
+        findings = analyze_app_health(app_path, language)
     except Exception as e:
-        issues.append(f"Analysis failed: {e}")
-        
-    if issues:
-        console.print(Panel("\n".join(issues), title="Health Check Issues", border_style="red"))
-    else:
-        console.print(Panel("No obvious issues found. Code looks healthy!", title="Health Check Passed", border_style="green"))
+        findings = [make_finding("analysis-failed", "error", f"Analysis failed: {e}")]
+
+    show_findings(findings, "Health Check Issues", "Health Check Passed", "No obvious issues found. Code looks healthy!")
+    return findings
+
+def perform_performance_lint(app_path, language):
+    console.print("[bold]Running Performance Lint...[/bold]")
+    if language.lower() != "python":
+        console.print("[yellow]Performance lint is only available for Python apps.[/yellow]")
+        return []
+    findings = []
+    try:
+        findings = analyze_app_performance(app_path, language)
+    except Exception as e:
+        findings = [make_finding("analysis-failed", "error", f"Analysis failed: {e}")]
+
+    show_findings(findings, "Performance Issues", "Performance Lint Passed", "No known performance anti-patterns found.")
+    return findings
 
 def confirm_dangerous_execution():
     console.print(
@@ -0,0 +1,287 @@
+import datetime
+import difflib
+import hashlib
+import json
+import os
+import time
+from appgen.utils.filesystem import STATE_DIR, app_root, iter_app_files
+
+SNAPSHOT_DIR = os.path.join(STATE_DIR, "snapshots")
+BLOB_DIR = os.path.join(SNAPSHOT_DIR, "blobs")
+MANIFEST_DIR = os.path.join(SNAPSHOT_DIR, "manifests")
+
+# Retention: the newest N snapshots, plus the newest snapshot of each of the
+# last H hours and D days
+SNAPSHOT_KEEP_LAST = int(os.environ.get("PROMPT2APP_SNAPSHOT_KEEP_LAST", "10"))
+SNAPSHOT_KEEP_HOURLY = int(os.environ.get("PROMPT2APP_SNAPSHOT_KEEP_HOURLY", "24"))
+SNAPSHOT_KEEP_DAILY = int(os.environ.get("PROMPT2APP_SNAPSHOT_KEEP_DAILY", "7"))
+# Unreferenced blobs younger than this may belong to a snapshot still being written
+BLOB_GC_GRACE_SECONDS = 3600
+
+class SnapshotError(Exception):
+    pass
+
+def app_key(app_path):
+    return hashlib.sha256(os.path.abspath(app_path).encode("utf-8")).hexdigest()[:16]
+
+def _manifest_dir(app_path):
+    return os.path.join(MANIFEST_DIR, app_key(app_path))
+
+def blob_path(digest):
+    return os.path.join(BLOB_DIR, digest[:2], digest)
+
+def _store_blob(data):
+    digest = hashlib.sha256(data).hexdigest()
+    path = blob_path(digest)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return digest
+
+def read_blob(digest):
+    with open(blob_path(digest), "rb") as f:
+        return f.read()
+
+def list_snapshots(app_path):
+    """
+    Snapshot manifests of an app, oldest first.
+    """
+    folder = _manifest_dir(app_path)
+    try:
+        names = sorted(n for n in os.listdir(folder) if n.endswith(".json"))
+    except OSError:
+        return []
+    manifests = []
+    for name in names:
+        try:
+            with open(os.path.join(folder, name), "r", encoding="utf-8") as f:
+                manifests.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    manifests.sort(key=lambda m: (m["timestamp"], m["id"]))
+    return manifests
+
+def get_snapshot(app_path, snapshot_id):
+    for manifest in list_snapshots(app_path):
+        if manifest["id"] == snapshot_id:
+            return manifest
+    raise SnapshotError(f"Snapshot '{snapshot_id}' not found.")
+
+def scan_app(app_path, previous=None):
+    """
+    Returns ({rel: entry}, new_bytes) for every file in the app's folder, so
+    an app registered by its entry file is still backed up whole. Files whose
+    size and mtime match the previous manifest reuse its hash without being
+    read, so the cost follows the changed bytes rather than the app size.
+    """
+    root = app_root(app_path)
+    known = (previous or {}).get("files", {})
+    files, new_bytes = {}, 0
+    for path in iter_app_files(root):
+        rel = os.path.relpath(path, root)
+        stat = os.stat(path)
+        entry = known.get(rel)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns and os.path.exists(blob_path(entry["hash"])):
+            files[rel] = entry
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        try:
+            # An existing blob gets a fresh age so a concurrent gc_blobs leaves it alone
+            os.utime(blob_path(digest))
+        except OSError:
+            _store_blob(data)
+            new_bytes += len(data)
+        files[rel] = {"hash": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "mode": stat.st_mode & 0o777}
+    return files, new_bytes
+
+def _same_content(a, b):
+    return {rel: e["hash"] for rel, e in a.items()} == {rel: e["hash"] for rel, e in b.items()}
+
+def create_snapshot(app_path, label="", retention=True):
+    """
+    Records the current state of an app. Returns the manifest, with
+    "new_bytes" (blob data written) and "unchanged" (True when the app matches
+    the latest snapshot, which is then returned instead of a new one).
+    """
+    if not os.path.exists(app_path):
+        raise SnapshotError(f"{app_path} does not exist.")
+    snapshots = list_snapshots(app_path)
+    previous = snapshots[-1] if snapshots else None
+    files, new_bytes = scan_app(app_path, previous)
+
+    if previous and _same_content(files, previous["files"]):
+        return {**previous, "new_bytes": 0, "unchanged": True}
+
+    now = time.time()
+    content_hash = hashlib.sha256(json.dumps({r: e["hash"] for r, e in sorted(files.items())}).encode("utf-8")).hexdigest()
+    folder = _manifest_dir(app_path)
+    os.makedirs(folder, exist_ok=True)
+    snapshot_id = f"{datetime.datetime.fromtimestamp(now).strftime('%Y%m%d-%H%M%S-%f')[:-3]}-{content_hash[:8]}"
+    # The same content snapshotted twice in one millisecond still gets distinct ids
+    base_id, n = snapshot_id, 2
+    while os.path.exists(os.path.join(folder, f"{snapshot_id}.json")):
+        snapshot_id, n = f"{base_id}-{n}", n + 1
+    manifest = {
+        "id": snapshot_id,
+        "app_path": os.path.abspath(app_path),
+        "timestamp": now,
+        "created_at": datetime.datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S"),
+        "label": label,
+        "files": files,
+        "total_bytes": sum(e["size"] for e in files.values()),
+    }
+    path = os.path.join(folder, f"{manifest['id']}.json")
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(f"{path}.tmp", path)
+
+    if retention:
+        apply_retention(app_path)
+    return {**manifest, "new_bytes": new_bytes, "unchanged": False}
+
+def select_retained(snapshots, keep_last=SNAPSHOT_KEEP_LAST, hourly=SNAPSHOT_KEEP_HOURLY, daily=SNAPSHOT_KEEP_DAILY):
+    """
+    Ids to keep: the newest `keep_last`, plus the newest snapshot in each of
+    the `hourly` most recent hours and `daily` most recent days that have one.
+    """
+    newest_first = sorted(snapshots, key=lambda m: m["timestamp"], reverse=True)
+    keep = {m["id"] for m in newest_first[:keep_last]}
+    for fmt, limit in (("%Y%m%d%H", hourly), ("%Y%m%d", daily)):
+        buckets = []
+        for manifest in newest_first:
+            bucket = datetime.datetime.fromtimestamp(manifest["timestamp"]).strftime(fmt)
+            if bucket not in buckets:
+                if len(buckets) >= limit:
+                    break
+                buckets.append(bucket)
+                keep.add(manifest["id"])
+    return keep
+
+def apply_retention(app_path, keep_last=SNAPSHOT_KEEP_LAST, hourly=SNAPSHOT_KEEP_HOURLY, daily=SNAPSHOT_KEEP_DAILY):
+    """
+    Deletes snapshots outside the retention policy and returns their ids.
+    Blobs no snapshot references any more are garbage collected.
+    """
+    snapshots = list_snapshots(app_path)
+    keep = select_retained(snapshots, keep_last, hourly, daily)
+    removed = []
+    for manifest in snapshots:
+        if manifest["id"] not in keep:
+            try:
+                os.remove(os.path.join(_manifest_dir(app_path), f"{manifest['id']}.json"))
+                removed.append(manifest["id"])
+            except OSError:
+                pass
+    if removed:
+        gc_blobs()
+    return removed
+
+def gc_blobs():
+    """
+    Removes blobs not referenced by any snapshot of any app; returns bytes freed.
+    Blobs younger than BLOB_GC_GRACE_SECONDS are kept, since a snapshot being
+    created may have stored them without having written its manifest yet.
+    """
+    cutoff = time.time() - BLOB_GC_GRACE_SECONDS
+    referenced = set()
+    if os.path.isdir(MANIFEST_DIR):
+        for folder in os.listdir(MANIFEST_DIR):
+            for name in os.listdir(os.path.join(MANIFEST_DIR, folder)):
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(MANIFEST_DIR, folder, name), "r", encoding="utf-8") as f:
+                        referenced.update(e["hash"] for e in json.load(f)["files"].values())
+                except (OSError, ValueError, KeyError):
+                    # An unreadable manifest could reference anything; keep every blob
+                    return 0
+    freed = 0
+    if os.path.isdir(BLOB_DIR):
+        for prefix in os.listdir(BLOB_DIR):
+            for digest in os.listdir(os.path.join(BLOB_DIR, prefix)):
+                if digest in referenced:
+                    continue
+                path = os.path.join(BLOB_DIR, prefix, digest)
+                try:
+                    stat = os.stat(path)
+                    if stat.st_mtime >= cutoff:
+                        continue
+                    os.remove(path)
+                except OSError:
+                    continue
+                freed += stat.st_size
+    return freed
+
+def _working_files(app_path):
+    root = app_root(app_path)
+    return {os.path.relpath(p, root): p for p in iter_app_files(root)}
+
+def diff_snapshots(app_path, old_id, new_id=None):
+    """
+    Compares two snapshots, or a snapshot with the working tree when new_id is
+    None. Returns {"added", "removed", "modified"} lists and "patch", a unified
+    diff of the text files that changed.
+    """
+    old = get_snapshot(app_path, old_id)["files"]
+    if new_id:
+        new = get_snapshot(app_path, new_id)["files"]
+        read_new = lambda rel: read_blob(new[rel]["hash"])
+        new_hashes = {rel: e["hash"] for rel, e in new.items()}
+    else:
+        working = _working_files(app_path)
+        contents = {}
+        for rel, path in working.items():
+            with open(path, "rb") as f:
+                contents[rel] = f.read()
+        read_new = contents.__getitem__
+        new_hashes = {rel: hashlib.sha256(data).hexdigest() for rel, data in contents.items()}
+
+    added = sorted(set(new_hashes) - set(old))
+    removed = sorted(set(old) - set(new_hashes))
+    modified = sorted(rel for rel in set(old) & set(new_hashes) if old[rel]["hash"] != new_hashes[rel])
+
+    chunks = []
+    for rel in sorted(added + removed + modified):
+        before = read_blob(old[rel]["hash"]) if rel in old else b""
+        after = read_new(rel) if rel in new_hashes else b""
+        try:
+            before_text, after_text = before.decode("utf-8"), after.decode("utf-8")
+        except UnicodeDecodeError:
+            chunks.append(f"Binary file {rel} differs")
+            continue
+        chunks.extend(difflib.unified_diff(
+            before_text.splitlines(), after_text.splitlines(),
+            f"a/{rel}" if rel in old else "/dev/null", f"b/{rel}" if rel in new_hashes else "/dev/null", lineterm=""
+        ))
+    return {"added": added, "removed": removed, "modified": modified, "patch": "\n".join(chunks)}
+
+def restore_snapshot(app_path, snapshot_id):
+    """
+    Restores an app to a snapshot. The current state is snapshotted first, so a
+    restore can itself be undone. Returns {"safety", "written", "removed"}.
+    """
+    target = get_snapshot(app_path, snapshot_id)
+    safety = create_snapshot(app_path, label=f"before restore of {snapshot_id}", retention=False)
+    root = app_root(app_path)
+    current = safety["files"]
+
+    written, removed = [], []
+    for rel, entry in target["files"].items():
+        path = os.path.join(root, rel)
+        if rel in current and current[rel]["hash"] == entry["hash"] and os.path.exists(path):
+            continue
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(read_blob(entry["hash"]))
+        os.chmod(path, entry.get("mode", 0o644))
+        written.append(rel)
+    for rel in current:
+        if rel not in target["files"]:
+            os.remove(os.path.join(root, rel))
+            removed.append(rel)
+    return {"safety": safety["id"], "written": written, "removed": removed}
@@ -0,0 +1,138 @@
+import contextlib
+import json
+import os
+import threading
+import time
+from appgen.utils.filesystem import state_path
+from appgen.utils.stats import summarize
+
+TRACE_FILE = "trace.jsonl"
+TRACE_ENABLED = os.environ.get("PROMPT2APP_TRACE", "1").lower() not in ("0", "false", "no")
+TRACE_MAX_BYTES = int(os.environ.get("PROMPT2APP_TRACE_MAX_BYTES", str(5 * 1024 * 1024)))
+# Rotated files kept next to the live one: trace.jsonl.1 (newest) .. trace.jsonl.N
+TRACE_BACKUPS = 3
+# Prompt sizes are grouped into these buckets (upper bounds in characters) in the stats
+PROMPT_SIZE_BUCKETS = ((1000, "<1k"), (4000, "1-4k"), (16000, "4-16k"), (64000, "16-64k"))
+
+_lock = threading.Lock()
+
+def trace_path():
+    return state_path(TRACE_FILE)
+
+def _rotate(path):
+    for i in range(TRACE_BACKUPS, 0, -1):
+        older = f"{path}.{i - 1}" if i > 1 else path
+        if os.path.exists(older):
+            os.replace(older, f"{path}.{i}")
+
+def record_span(record):
+    """
+    Appends one finished span to the trace file, rotating it when full.
+    Tracing never breaks the operation being traced, so I/O errors are ignored.
+    """
+    line = json.dumps(record, default=str) + "\n"
+    with _lock:
+        try:
+            path = trace_path()
+            if os.path.exists(path) and os.path.getsize(path) + len(line) > TRACE_MAX_BYTES:
+                _rotate(path)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError:
+            pass
+
+@contextlib.contextmanager
+def span(name, **attrs):
+    """
+    Times the block and records it as a span. The yielded dict is the span's
+    attributes, so the block can add results (e.g. attrs["returncode"] = 1).
+    Exceptions mark the span as an error and propagate unchanged.
+    """
+    if not TRACE_ENABLED:
+        yield attrs
+        return
+    started_at = time.time()
+    started = time.perf_counter()
+    outcome, error = "ok", None
+    try:
+        yield attrs
+    except BaseException as e:
+        outcome, error = ("cancelled" if e.__class__.__name__ == "CancelledError" else "error"), e.__class__.__name__
+        raise
+    finally:
+        record = {
+            "name": name,
+            "ts": round(started_at, 3),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            "outcome": attrs.pop("outcome", None) or outcome,
+            "attrs": attrs,
+            "pid": os.getpid(),
+        }
+        if error:
+            record["error"] = error
+        record_span(record)
+
+def read_spans(since=None):
+    """
+    Spans from the live and rotated trace files, oldest first. `since` is a
+    UNIX timestamp; older spans are skipped.
+    """
+    path = trace_path()
+    spans = []
+    for candidate in [f"{path}.{i}" for i in range(TRACE_BACKUPS, 0, -1)] + [path]:
+        try:
+            with open(candidate, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if since is None or record.get("ts", 0) >= since:
+                        spans.append(record)
+        except OSError:
+            continue
+    return spans
+
+def prompt_size_bucket(chars):
+    if chars is None:
+        return "-"
+    for limit, label in PROMPT_SIZE_BUCKETS:
+        if chars < limit:
+            return label
+    return f">{PROMPT_SIZE_BUCKETS[-1][0] // 1000}k"
+
+def is_interactive(record):
+    """
+    Spans tagged interactive=True (e.g. app.run) last as long as the user keeps
+    the app open, so they say nothing about Prompt2App's own latency.
+    """
+    return bool(record.get("attrs", {}).get("interactive"))
+
+def latency_stats(spans, include_interactive=False):
+    """
+    Groups spans by (operation, prompt size bucket) and returns rows with the
+    count, error count and latency summary (ms), slowest p95 first.
+    Interactive spans are left out unless include_interactive is set.
+    """
+    groups = {}
+    for record in spans:
+        if is_interactive(record) and not include_interactive:
+            continue
+        key = (record["name"], prompt_size_bucket(record.get("attrs", {}).get("prompt_chars")))
+        group = groups.setdefault(key, {"durations": [], "errors": 0})
+        group["durations"].append(record["duration_ms"])
+        if record.get("outcome") != "ok":
+            group["errors"] += 1
+    rows = [
+        {"name": name, "prompt_size": bucket, "errors": group["errors"], **summarize(group["durations"])}
+        for (name, bucket), group in groups.items()
+    ]
+    rows.sort(key=lambda row: -row["p95"])
+    return rows
+
+def clear_traces():
+    path = trace_path()
+    with _lock:
+        for candidate in [path] + [f"{path}.{i}" for i in range(1, TRACE_BACKUPS + 1)]:
+            if os.path.exists(candidate):
+                os.remove(candidate)
@@ -0,0 +1,89 @@
+"""
+Throughput benchmark for the code-block extractor.
+
+Builds synthetic multi-megabyte Copilot responses and reports MB/s for the
+state-machine parser (whole string and chunked, as when streaming) next to
+the old single-regex extractor.
+
+    python benchmarks/bench_extractor.py --size-mb 8 --repeat 3
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from appgen.core.extractor import CodeBlockParser, extract_code_blocks_with_filenames
+
+LEGACY_PATTERN = re.compile(
+    r"(?:###\s*filename:\s*(?P<file>[^\n]+)\n)?\s*```(?P<lang>\w*)\n(?P<code>.*?)```",
+    re.DOTALL | re.IGNORECASE
+)
+
+def legacy_extract(md):
+    return [
+        {"filename": m.group("file"), "language": m.group("lang") or "text", "code": m.group("code").strip()}
+        for m in LEGACY_PATTERN.finditer(md)
+    ]
+
+def make_response(size_bytes, seed=0):
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    index = 0
+    while total < size_bytes:
+        prose = " ".join(rng.choice(["the", "app", "uses", "a", "simple", "layout", "with", "state"]) for _ in range(40))
+        body = "\n".join(
+            f"    value_{i} = compute({i}, '{rng.random():.6f}')  # step {i}"
+            for i in range(rng.randint(20, 200))
+        )
+        part = f"{prose}\n\n### filename: module_{index}.py\n```python\ndef run():\n{body}\n```\n\n"
+        parts.append(part)
+        total += len(part)
+        index += 1
+    return "".join(parts)
+
+def best_time(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def parse_chunked(md, chunk_size):
+    parser = CodeBlockParser()
+    blocks = []
+    for i in range(0, len(md), chunk_size):
+        blocks.extend(parser.feed(md[i:i + chunk_size]))
+    blocks.extend(parser.close())
+    return blocks
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=float, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--chunk", type=int, default=256, help="chunk size for the streaming run")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'size':>8} {'blocks':>7} {'parser MB/s':>12} {'chunked MB/s':>13} {'legacy MB/s':>12}")
+    for size_mb in args.size_mb:
+        md = make_response(int(size_mb * 1024 * 1024))
+        mb = len(md) / (1024 * 1024)
+
+        t_parser, blocks = best_time(lambda: extract_code_blocks_with_filenames(md), args.repeat)
+        t_chunked, chunked = best_time(lambda: parse_chunked(md, args.chunk), args.repeat)
+        t_legacy, legacy = best_time(lambda: legacy_extract(md), args.repeat)
+
+        if len(blocks) != len(chunked) or len(blocks) != len(legacy):
+            print(f"block count mismatch: parser={len(blocks)} chunked={len(chunked)} legacy={len(legacy)}")
+            return 1
+        print(f"{mb:7.1f}M {len(blocks):7d} {mb / t_parser:12.1f} {mb / t_chunked:13.1f} {mb / t_legacy:12.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
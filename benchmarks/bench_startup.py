@@ -0,0 +1,118 @@
+"""
+Startup budget check.
+
+Spawns fresh interpreters that import everything needed to reach the main
+menu (quick-start path) and compares the median import time with a budget.
+Exits non-zero when the budget is exceeded or when a module that must stay
+lazy (selenium, webdriver_manager, language runners) is imported at startup,
+so it can be used as a regression gate.
+
+    python benchmarks/bench_startup.py --runs 7 --budget-ms 350
+
+--lazy-only skips the timing and only checks that the lazy modules stay
+unimported. That check does not depend on machine speed, so it is the one
+to run on every change.
+
+    python benchmarks/bench_startup.py --lazy-only
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STARTUP_BUDGET_MS = 350
+STARTUP_MODULES = ["main", "appgen.ui.splash", "appgen.ui.menus"]
+LAZY_MODULES = [
+    "selenium",
+    "webdriver_manager",
+    "appgen.runners.cpp_runner",
+    "appgen.runners.python_runner",
+    "appgen.runners.html_runner",
+]
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = (time.perf_counter() - start) * 1000
+loaded = [m for m in {lazy!r} if m in sys.modules]
+print(f"{{elapsed:.2f}}|{{','.join(loaded)}}")
+"""
+
+def measure_once(modules=STARTUP_MODULES, lazy=LAZY_MODULES):
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(modules=modules, lazy=lazy)],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    elapsed, loaded = result.stdout.strip().rsplit("\n", 1)[-1].split("|")
+    return float(elapsed), [m for m in loaded.split(",") if m]
+
+def top_imports(modules=STARTUP_MODULES, count=10):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "; ".join(f"import {m}" for m in modules)],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+def run(runs=5, budget_ms=STARTUP_BUDGET_MS, verbose=True):
+    samples = []
+    eager = set()
+    for _ in range(runs):
+        elapsed, loaded = measure_once()
+        samples.append(elapsed)
+        eager.update(loaded)
+    median = statistics.median(samples)
+    result = {
+        "median_ms": round(median, 2),
+        "min_ms": round(min(samples), 2),
+        "max_ms": round(max(samples), 2),
+        "budget_ms": budget_ms,
+        "eager_heavy_modules": sorted(eager),
+        "ok": median <= budget_ms and not eager,
+    }
+    if verbose:
+        print(f"startup imports: median {median:.1f} ms (min {min(samples):.1f}, max {max(samples):.1f}), budget {budget_ms} ms")
+        if eager:
+            print(f"modules that must stay lazy were imported: {', '.join(sorted(eager))}")
+        if median > budget_ms:
+            print("slowest imports (cumulative ms):")
+            for cumulative, _, name in top_imports():
+                print(f"  {cumulative / 1000:8.1f}  {name}")
+    return result
+
+def check_lazy(verbose=True):
+    """
+    Returns the modules from LAZY_MODULES that importing the startup path pulls in.
+    """
+    _, loaded = measure_once()
+    if verbose:
+        if loaded:
+            print(f"modules that must stay lazy were imported: {', '.join(loaded)}")
+        else:
+            print(f"lazy imports ok: none of {', '.join(LAZY_MODULES)} imported at startup")
+    return loaded
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument("--lazy-only", action="store_true", help="only check that heavy modules are not imported at startup")
+    args = parser.parse_args(argv)
+    if args.lazy_only:
+        return 1 if check_lazy() else 0
+    return 0 if run(args.runs, args.budget_ms)["ok"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
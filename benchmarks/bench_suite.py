@@ -0,0 +1,374 @@
+"""
+Prompt2App overhead benchmark suite.
+
+Puts a stub `gh` (benchmarks/fake_gh.py) on PATH that returns canned
+responses of configurable size and delay, then measures startup, Copilot
+call overhead, extractor throughput, the multi-file save path, registry
+operations at several sizes, health-check throughput, and backup/export
+speed. Everything runs in a temporary workspace. Results are written as
+JSON; with --baseline, metrics are compared against an earlier result file
+and the exit status is non-zero on a regression beyond the tolerance.
+
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --only registry health --registry-sizes 10000
+    python benchmarks/bench_suite.py --baseline baseline.json --tolerance 0.2
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fake_gh
+from bench_extractor import make_response as make_large_response, parse_chunked
+from bench_startup import run as run_startup
+
+RESULTS_SCHEMA = 1
+DEFAULT_OUTPUT_DIR = os.path.join(ROOT, ".prompt2app", "bench")
+DEFAULT_TOLERANCE = 0.15
+# Timing differences smaller than this are noise, whatever the relative change
+MIN_DELTA_MS = 1.0
+# Metric names end in one of these; the suffix says which direction is better
+LOWER_IS_BETTER = ("_ms",)
+HIGHER_IS_BETTER = ("_per_s",)
+
+def best_of(fn, repeat):
+    """
+    Runs fn `repeat` times and returns (best seconds, last result).
+    """
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def ms(seconds):
+    return round(seconds * 1000, 3)
+
+def make_python_app(app_dir, files, lines_per_file=120):
+    """
+    Writes a synthetic Python app with some loops, branches and imports in every file.
+    """
+    os.makedirs(app_dir, exist_ok=True)
+    for index in range(files):
+        body = [f"import os\nimport json\nfrom module_{(index + 1) % files} import helper_{(index + 1) % files}\n"]
+        body.append(f"def helper_{index}(items):\n    total = 0\n")
+        for line in range(lines_per_file):
+            if line % 10 == 0:
+                body.append(f"    if len(items) > {line}:\n        total += sum(x for x in items if x > {line})\n")
+            else:
+                body.append(f"    total += {line} * len(items)  # accumulate step {line}\n")
+        body.append("    return total\n")
+        name = "main.py" if index == 0 else f"module_{index}.py"
+        with open(os.path.join(app_dir, name), "w", encoding="utf-8") as f:
+            f.write("".join(body))
+    return app_dir
+
+def bench_startup(args):
+    result = run_startup(runs=args.repeat, verbose=False)
+    return {"median_ms": result["median_ms"], "min_ms": result["min_ms"], "eager_heavy_modules": len(result["eager_heavy_modules"])}
+
+def bench_copilot(args):
+    from appgen.core.cache import ResponseCache
+    from appgen.core.engine import CopilotEngine
+
+    engine = CopilotEngine(max_concurrency=args.concurrency)
+    prompts = [f"benchmark prompt {i}" for i in range(args.copilot_calls)]
+    single, _ = best_of(lambda: asyncio.run(engine.run(prompts[0])), args.repeat)
+    batch, outputs = best_of(lambda: asyncio.run(engine.run_many(prompts)), args.repeat)
+    failed = sum(not isinstance(output, str) for output in outputs)
+
+    cache = ResponseCache()
+    response = outputs[0] if isinstance(outputs[0], str) else fake_gh.make_response(args.response_bytes, 3)
+    cache.put(prompts[0], response)
+    hit, _ = best_of(lambda: cache.get(prompts[0]), args.repeat)
+
+    # What the batch would take with zero overhead: full waves of stub delays
+    ideal = math.ceil(len(prompts) / args.concurrency) * args.delay_ms / 1000
+    return {
+        "single_call_ms": ms(single),
+        "batch_ms": ms(batch),
+        "batch_overhead_per_call_ms": ms(max(0.0, batch - ideal) / len(prompts)),
+        "cache_hit_ms": ms(hit),
+        "failed_calls": failed,
+    }
+
+def bench_extractor(args):
+    from appgen.core.extractor import extract_code_blocks_with_filenames
+
+    md = make_large_response(int(args.extract_mb * 1024 * 1024))
+    mb = len(md) / (1024 * 1024)
+    whole, blocks = best_of(lambda: extract_code_blocks_with_filenames(md), args.repeat)
+    chunked, _ = best_of(lambda: parse_chunked(md, 256), args.repeat)
+    return {"whole_mb_per_s": round(mb / whole, 2), "chunked_mb_per_s": round(mb / chunked, 2), "blocks": len(blocks)}
+
+def bench_save(args):
+    from appgen.core.extractor import extract_code_blocks_with_filenames
+    from appgen.core.registry import add_app_to_registry
+    from appgen.utils.filesystem import write_app_blocks
+
+    response = fake_gh.make_response(args.response_bytes * 16, args.save_files)
+    counter = [0]
+
+    def save():
+        counter[0] += 1
+        name = f"saved_app_{counter[0]}"
+        blocks = extract_code_blocks_with_filenames(response)
+        path = write_app_blocks(name, blocks, "Python", True, app_dir=os.path.join("save_bench", name))
+        add_app_to_registry(name, "benchmark", "Python", path)
+        return len(blocks)
+
+    seconds, files = best_of(save, args.repeat)
+    return {"save_ms": ms(seconds), "files": files, "files_per_s": round(files / seconds, 1)}
+
+def bench_registry(args):
+    from appgen.core import registry
+    from appgen.core.search import AppSearchIndex
+
+    results = {}
+    for size in args.registry_sizes:
+        work = os.path.abspath(f"registry_{size}")
+        os.makedirs(work, exist_ok=True)
+        os.chdir(work)
+        try:
+            apps = [
+                {
+                    "id": f"app-{i:08d}", "name": f"app_{i}", "description": f"Benchmark app number {i} with a todo list",
+                    "language": ("Python", "HTML", "C++")[i % 3], "path": os.path.join(work, f"app_{i}"),
+                    "features": ["Docker"] if i % 5 == 0 else [], "metadata": {"query": f"todo list {i}"},
+                    "created_at": (datetime.datetime(2024, 1, 1) + datetime.timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"),
+                }
+                for i in range(size)
+            ]
+            bulk = time.perf_counter()
+            registry.save_apps_registry(apps)
+            bulk = time.perf_counter() - bulk
+
+            adds = 100
+            started = time.perf_counter()
+            for i in range(adds):
+                registry.add_app_to_registry(f"extra_{i}", "added", "Python", work)
+            add = (time.perf_counter() - started) / adds
+
+            load, loaded = best_of(registry.load_apps_registry, args.repeat)
+            lookups = [f"app_{(i * 7919) % size}" for i in range(100)]
+            find, _ = best_of(lambda: [registry.find_apps(name=name) for name in lookups], args.repeat)
+            count, _ = best_of(registry.count_apps, args.repeat)
+            build, index = best_of(lambda: AppSearchIndex(loaded), 1)
+            queries = ["todo", "pyth", "benchmrk", "docker list", "app 42"]
+            search, _ = best_of(lambda: [index.search(q, limit=20) for q in queries], args.repeat)
+
+            results[str(size)] = {
+                "bulk_insert_ms": ms(bulk),
+                "add_ms": ms(add),
+                "load_ms": ms(load),
+                "find_by_name_ms": ms(find / len(lookups)),
+                "count_ms": ms(count),
+                "index_build_ms": ms(build),
+                "search_ms": ms(search / len(queries)),
+            }
+        finally:
+            os.chdir(os.path.dirname(work))
+    return results
+
+def bench_health(args):
+    from appgen.utils.filesystem import state_path
+    from appgen.utils.health import HEALTH_CACHE_FILE, analyze_app_health
+
+    app = make_python_app("health_app", args.app_files)
+    cold, findings = best_of(lambda: analyze_app_health(app, "Python", use_cache=False), args.repeat)
+    if os.path.exists(state_path(HEALTH_CACHE_FILE)):
+        os.remove(state_path(HEALTH_CACHE_FILE))
+    analyze_app_health(app, "Python")
+    warm, _ = best_of(lambda: analyze_app_health(app, "Python"), args.repeat)
+    return {
+        "cold_ms": ms(cold),
+        "cold_files_per_s": round(args.app_files / cold, 1),
+        "warm_ms": ms(warm),
+        "findings": len(findings),
+    }
+
+def bench_backup(args):
+    from appgen.utils.export import write_zip
+    from appgen.utils.snapshots import create_snapshot
+
+    app = make_python_app("backup_app", args.app_files)
+    size_mb = sum(os.path.getsize(os.path.join(app, name)) for name in os.listdir(app)) / (1024 * 1024)
+
+    started = time.perf_counter()
+    create_snapshot(app, "bench", retention=False)
+    cold = time.perf_counter() - started
+    unchanged, _ = best_of(lambda: create_snapshot(app, "bench", retention=False), args.repeat)
+    for index in range(0, args.app_files, max(1, args.app_files // 10)):
+        path = os.path.join(app, "main.py" if index == 0 else f"module_{index}.py")
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(f"# touched {time.time()}\n")
+    started = time.perf_counter()
+    create_snapshot(app, "bench", retention=False)
+    changed = time.perf_counter() - started
+
+    export_cold, _ = best_of(lambda: write_zip(app, "bench_export.zip", incremental=False), args.repeat)
+    write_zip(app, "bench_export.zip")
+    export_incremental, stats = best_of(lambda: write_zip(app, "bench_export.zip"), args.repeat)
+    return {
+        "snapshot_cold_ms": ms(cold),
+        "snapshot_cold_mb_per_s": round(size_mb / cold, 2),
+        "snapshot_unchanged_ms": ms(unchanged),
+        "snapshot_10pct_changed_ms": ms(changed),
+        "export_cold_ms": ms(export_cold),
+        "export_cold_mb_per_s": round(size_mb / export_cold, 2),
+        "export_incremental_ms": ms(export_incremental),
+        "export_reused_entries": stats["reused"],
+    }
+
+BENCHMARKS = {
+    "startup": bench_startup,
+    "copilot": bench_copilot,
+    "extractor": bench_extractor,
+    "save": bench_save,
+    "registry": bench_registry,
+    "health": bench_health,
+    "backup": bench_backup,
+}
+
+def flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        else:
+            flat[name] = value
+    return flat
+
+def compare(current, baseline, tolerance, min_delta_ms=MIN_DELTA_MS):
+    """
+    Returns [(metric, baseline, current, change, regressed)] for every metric
+    with a known direction that exists in both result sets.
+    """
+    rows = []
+    old = flatten(baseline.get("results", {}))
+    for metric, value in flatten(current["results"]).items():
+        if metric not in old or not isinstance(value, (int, float)) or not old[metric]:
+            continue
+        change = (value - old[metric]) / old[metric]
+        if metric.endswith(LOWER_IS_BETTER):
+            regressed = change > tolerance and value - old[metric] >= min_delta_ms
+        elif metric.endswith(HIGHER_IS_BETTER):
+            regressed = change < -tolerance
+        else:
+            continue
+        rows.append((metric, old[metric], value, change, regressed))
+    return rows
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+def run_suite(args):
+    bin_dir = tempfile.mkdtemp(prefix="p2a_fake_gh_")
+    workspace = tempfile.mkdtemp(prefix="p2a_bench_")
+    saved_env = {key: os.environ.get(key) for key in ("PATH", "FAKE_GH_DELAY_MS", "FAKE_GH_BYTES", "FAKE_GH_FILES")}
+    cwd = os.getcwd()
+    results = {}
+    try:
+        fake_gh.install(bin_dir)
+        os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+        os.environ["FAKE_GH_DELAY_MS"] = str(args.delay_ms)
+        os.environ["FAKE_GH_BYTES"] = str(args.response_bytes)
+        os.environ["FAKE_GH_FILES"] = "3"
+        os.chdir(workspace)
+        for name in args.only or BENCHMARKS:
+            print(f"running {name}...", flush=True)
+            started = time.perf_counter()
+            results[name] = BENCHMARKS[name](args)
+            print(f"  done in {time.perf_counter() - started:.1f}s", flush=True)
+    finally:
+        os.chdir(cwd)
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(bin_dir, ignore_errors=True)
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    return {
+        "schema": RESULTS_SCHEMA,
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "tolerance", "min_delta_ms")},
+        "results": results,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the best is kept")
+    parser.add_argument("--delay-ms", type=float, default=50, help="stub gh response delay")
+    parser.add_argument("--response-bytes", type=int, default=4096, help="stub gh response size")
+    parser.add_argument("--copilot-calls", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--extract-mb", type=float, default=4)
+    parser.add_argument("--save-files", type=int, default=40, help="files in the multi-file save benchmark")
+    parser.add_argument("--registry-sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--app-files", type=int, default=200, help="files in the health and backup apps")
+    parser.add_argument("--output", help="result file (default: .prompt2app/bench/results_<time>.json and latest.json)")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed relative slowdown (default 0.15)")
+    parser.add_argument("--min-delta-ms", type=float, default=MIN_DELTA_MS, help="ignore slowdowns smaller than this (default 1.0)")
+    args = parser.parse_args(argv)
+    output = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    report = run_suite(args)
+
+    if output is None:
+        os.makedirs(DEFAULT_OUTPUT_DIR, exist_ok=True)
+        output = os.path.join(DEFAULT_OUTPUT_DIR, f"results_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        latest = os.path.join(DEFAULT_OUTPUT_DIR, "latest.json")
+    else:
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        latest = None
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    if latest:
+        shutil.copyfile(output, latest)
+
+    print()
+    for metric, value in flatten(report["results"]).items():
+        print(f"{metric:50} {value}")
+    print(f"\nresults written to {output}")
+
+    if not baseline_path:
+        return 0
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare(report, baseline, args.tolerance, args.min_delta_ms)
+    print(f"\ncompared with {baseline_path} (commit {baseline.get('commit') or '?'}), tolerance {args.tolerance:.0%}:")
+    for metric, old, new, change, regressed in rows:
+        flag = "REGRESSION" if regressed else ""
+        print(f"{metric:50} {old:>12} -> {new:>12} {change:+8.1%} {flag}")
+    regressions = [row for row in rows if row[4]]
+    print(f"\n{len(regressions)} regression(s) in {len(rows)} compared metric(s)")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Stand-in for the GitHub CLI used by the benchmark suite.
+
+Answers `gh copilot -p <prompt> --silent` with a canned multi-file Markdown
+response after a fixed delay, so Prompt2App's own overhead can be measured
+without the network. Shaped by environment variables:
+
+    FAKE_GH_DELAY_MS   delay before answering (default 0)
+    FAKE_GH_BYTES      approximate response size (default 4096)
+    FAKE_GH_FILES      number of code blocks (default 3)
+    FAKE_GH_FAIL_RATE  fraction of prompts that fail, chosen by prompt hash (default 0)
+
+`install(bin_dir)` writes a `gh` launcher for this script into bin_dir.
+"""
+import hashlib
+import os
+import stat
+import sys
+import time
+
+def make_response(size_bytes, files):
+    """
+    Deterministic Markdown with `files` '### filename:' code blocks totalling about size_bytes.
+    """
+    files = max(1, files)
+    per_file = max(64, size_bytes // files)
+    parts = ["Here is the complete application.\n"]
+    for index in range(files):
+        name = "main.py" if index == 0 else f"module_{index}.py"
+        lines, used = [f"def run_{index}():"], 0
+        step = 0
+        while used < per_file:
+            line = f"    value_{step} = compute({step}, 'payload-{index}-{step}')  # step {step}"
+            lines.append(line)
+            used += len(line) + 1
+            step += 1
+        lines.append(f"    return value_{step - 1}")
+        parts.append(f"### filename: {name}\n```python\n" + "\n".join(lines) + "\n```\n")
+    return "\n".join(parts)
+
+def install(bin_dir):
+    """
+    Writes a `gh` launcher running this script with the current interpreter.
+    Returns the launcher path; prepend bin_dir to PATH to use it.
+    """
+    os.makedirs(bin_dir, exist_ok=True)
+    script = os.path.abspath(__file__)
+    if sys.platform == "win32":
+        path = os.path.join(bin_dir, "gh.cmd")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f'@"{sys.executable}" "{script}" %*\n')
+    else:
+        path = os.path.join(bin_dir, "gh")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n')
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return path
+
+def main(argv):
+    if "--version" in argv:
+        print("gh version 0.0.0 (prompt2app benchmark stub)")
+        return 0
+    if "-p" not in argv:
+        sys.stderr.write("fake gh: only 'gh copilot -p <prompt>' is supported\n")
+        return 2
+    prompt = argv[argv.index("-p") + 1]
+
+    delay_ms = float(os.environ.get("FAKE_GH_DELAY_MS", "0"))
+    if delay_ms:
+        time.sleep(delay_ms / 1000)
+
+    fail_rate = float(os.environ.get("FAKE_GH_FAIL_RATE", "0"))
+    if fail_rate and int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF < fail_rate:
+        sys.stderr.write("fake gh: simulated failure\n")
+        return 1
+
+    size = int(os.environ.get("FAKE_GH_BYTES", "4096"))
+    files = int(os.environ.get("FAKE_GH_FILES", "3"))
+    sys.stdout.write(make_response(size, files))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
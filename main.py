@@ -1,6 +1,5 @@
-
-from appgen.ui.splash import show_splash_screen
-from appgen.ui.menus import main_menu
+import argparse
+import os
 import shutil
 import sys
 from appgen.utils.console import console
@@ -12,10 +11,104 @@ def check_dependencies():
         console.print("Please install it from https://cli.github.com/")
         sys.exit(1)
 
-def main():
-    show_splash_screen()
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="prompt2app", description="Turn your ideas into running applications.")
+    parser.add_argument("--no-splash", action="store_true", help="skip the splash screen entirely")
+    parser.add_argument("--quick", action="store_true", help="quick start: compact status table instead of the animated splash")
+    parser.add_argument("--profile", nargs="?", const="", default=None, metavar="FILE",
+                        help="profile the whole session with cProfile and write the stats to FILE (default: .prompt2app/profiles/)")
+
+    subparsers = parser.add_subparsers(dest="command")
+    generate = subparsers.add_parser("generate", help="generate apps headlessly from a JSONL spec file")
+    generate.add_argument("spec_file", help="JSONL file, one spec per line (query, language, color_scheme, complex_app, architecture, extras)")
+    generate.add_argument("--workers", type=int, default=4, help="concurrent Copilot requests (default: 4)")
+    generate.add_argument("--out-dir", default=".", help="directory to create the apps in")
+    generate.add_argument("--manifest", default="generate_manifest.jsonl", help="results manifest (JSONL)")
+    generate.add_argument("--no-resume", action="store_true", help="regenerate specs already marked ok in the manifest")
+    generate.add_argument("--no-cache", action="store_true", help="bypass the Copilot response cache")
+
+    export = subparsers.add_parser("export", help="export apps from the registry to reproducible ZIP archives")
+    export.add_argument("names", nargs="*", help="app names to export (default: all apps)")
+    export.add_argument("--out-dir", default="exports", help="directory for the archives (default: exports)")
+    export.add_argument("--exclude", action="append", default=[], help="extra exclude glob (repeatable)")
+    export.add_argument("--workers", type=int, default=None, help="apps exported in parallel")
+    return parser.parse_args(argv)
+
+def run_generate(args):
     check_dependencies()
+    from appgen.core.batch import run_batch
+    try:
+        return run_batch(
+            args.spec_file,
+            workers=args.workers,
+            out_dir=args.out_dir,
+            manifest_path=args.manifest,
+            resume=not args.no_resume,
+            use_cache=not args.no_cache
+        )
+    except (OSError, ValueError) as e:
+        console.print(f"[bold red]Error:[/bold red] {e}")
+        return 2
+
+def run_export(args):
+    from appgen.core.registry import load_apps_registry
+    from appgen.utils.export import export_apps_bulk, DEFAULT_EXCLUDES
+    apps = load_apps_registry()
+    if args.names:
+        wanted = set(args.names)
+        apps = [app for app in apps if app["name"] in wanted]
+        missing = wanted - {app["name"] for app in apps}
+        if missing:
+            console.print(f"[yellow]Not in the registry: {', '.join(sorted(missing))}[/yellow]")
+    if not apps:
+        console.print("[yellow]No apps to export.[/yellow]")
+        return 1
+    results = export_apps_bulk(apps, args.out_dir, (*DEFAULT_EXCLUDES, *args.exclude), args.workers)
+    return 0 if all(isinstance(result, dict) for _, result in results) else 1
+
+def run_profiled(args, target):
+    """
+    Runs target() under cProfile, then saves the stats and prints the top entries.
+    """
+    import cProfile
+    import pstats
+    import time
+    from appgen.utils.filesystem import state_path
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        return target()
+    finally:
+        profiler.disable()
+        out = args.profile or state_path("profiles", f"session_{time.strftime('%Y%m%d_%H%M%S')}.prof")
+        profiler.dump_stats(out)
+        console.print(f"[dim]Profile written to {out} (view with: python -m pstats {out})[/dim]")
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(25)
+
+def dispatch(args):
+    if args.command == "generate":
+        sys.exit(run_generate(args))
+    if args.command == "export":
+        sys.exit(run_export(args))
+
+    quick = args.quick or os.environ.get("PROMPT2APP_QUICK_START", "").lower() in ("1", "true", "yes")
+
+    # UI modules are imported here, not at module level, so `--help` and the
+    # startup benchmark only pay for what they use
+    if not args.no_splash:
+        from appgen.ui.splash import show_splash_screen
+        show_splash_screen(quick=quick)
+    check_dependencies()
+
+    from appgen.ui.menus import main_menu
     main_menu()
 
+def main(argv=None):
+    args = parse_args(argv)
+    if args.profile is not None:
+        return run_profiled(args, lambda: dispatch(args))
+    return dispatch(args)
+
 if __name__ == "__main__":
     main()
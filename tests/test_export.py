@@ -0,0 +1,55 @@
+import os
+import zipfile
+import pytest
+from appgen.core import registry
+from appgen.utils.export import export_apps_bulk, write_zip
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    # The registry database and state folder live in the working directory
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path
+    with registry._lock:
+        if registry._connection is not None:
+            registry._connection.close()
+            registry._connection = None
+
+def make_app(root):
+    app_dir = root / "todo"
+    (app_dir / "lib").mkdir(parents=True)
+    (app_dir / "main.py").write_text("from lib import store\nstore.run()\n")
+    (app_dir / "lib" / "store.py").write_text("def run():\n    return []\n")
+    (app_dir / "__pycache__").mkdir()
+    (app_dir / "__pycache__" / "main.cpython-311.pyc").write_bytes(b"\0")
+    return app_dir
+
+def test_registry_entry_exports_whole_app_folder(workspace):
+    app_dir = make_app(workspace)
+    app = registry.add_app_to_registry("Todo", "", "Python", str(app_dir / "main.py"))
+    assert app["path"].endswith("main.py")
+
+    results = export_apps_bulk(registry.find_apps(name="Todo"), str(workspace / "exports"))
+
+    assert [stats["files"] for _, stats in results] == [2]
+    with zipfile.ZipFile(workspace / "exports" / "Todo.zip") as archive:
+        assert archive.namelist() == ["todo/lib/store.py", "todo/main.py"]
+
+def test_entry_file_and_folder_give_the_same_archive(workspace):
+    app_dir = make_app(workspace)
+    write_zip(str(app_dir / "main.py"), "from_file.zip", incremental=False)
+    write_zip(str(app_dir), "from_folder.zip", incremental=False)
+    with open("from_file.zip", "rb") as a, open("from_folder.zip", "rb") as b:
+        assert a.read() == b.read()
+    assert os.path.getsize("from_file.zip") > 0
+
+def test_cpp_executables_are_left_out_of_exports(workspace):
+    from appgen.runners.cpp_build import BUILD_PROFILES, executable_path
+    from appgen.utils.export import DEFAULT_EXCLUDES, is_excluded
+
+    app_dir = workspace / "calc"
+    app_dir.mkdir()
+    (app_dir / "calc.cpp").write_text("int main() { return 0; }\n")
+    for app_path in (str(app_dir / "calc.cpp"), str(app_dir)):
+        for profile in BUILD_PROFILES:
+            exe = executable_path(app_path, str(app_dir), profile)
+            assert is_excluded(os.path.relpath(exe, app_dir), DEFAULT_EXCLUDES)
@@ -0,0 +1,33 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Needed only once an app runs or a menu is shown; `import main` (used by
+# --help, generate and export) must not pay for them
+RUNNER_MODULES = [
+    "selenium", "webdriver_manager",
+    "appgen.runners.cpp_runner", "appgen.runners.python_runner", "appgen.runners.html_runner",
+]
+UI_MODULES = ["questionary", "prompt_toolkit", "pygments", "rich.markdown", "rich.syntax", "rich.table", "appgen.ui.menus"]
+
+def loaded_after(statement):
+    """
+    Heavy modules present in sys.modules after running statement in a fresh interpreter.
+    """
+    probe = (
+        f"import json, sys\n{statement}\n"
+        f"print(json.dumps([m for m in {RUNNER_MODULES + UI_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_import_main_stays_light():
+    assert loaded_after("import main") == []
+
+def test_main_menu_imports_leave_runners_lazy():
+    loaded = loaded_after("import main, appgen.ui.splash, appgen.ui.menus")
+    assert [m for m in loaded if m in RUNNER_MODULES] == []